@@ -1,25 +1,47 @@
-from typing import List
-from fastapi import Depends, HTTPException, status
+import functools
+import hashlib
+import json
+from typing import Any, Callable, List, Optional
+from fastapi import Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
 from back.core import settings
+from back.core.executors import BoundedExecutor, ExecutorSaturatedError, Reserva
+from back.core.token_cache import token_cache
+from back.storage.versions import version_tablas
+from back.storage.idempotency_repo import (
+	IdempotencyStore,
+	IdempotencyConflictError,
+	IdempotencyInProgressError,
+	fingerprint,
+)
 
 # OAuth2 scheme (used by FastAPI to parse the Authorization header)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
 
 
 def decodificar_jwt(token: str) -> dict:
+	# Token ya verificado y vigente: una búsqueda en el caché
+	payload = token_cache.get(token)
+	if payload is not None:
+		return payload
 	try:
 		payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-		return payload
 	except JWTError:
 		raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido o expirado")
+	token_cache.put(token, payload)
+	return payload
 
 
 def verificar_rol(permisos_requeridos: List[str]):
-	def wrapper(token: str = Depends(oauth2_scheme)):
-		data = decodificar_jwt(token)
+	def wrapper(request: Request, token: str = Depends(oauth2_scheme)):
+		# AuthMiddleware ya decodificó este mismo Authorization header
+		data = getattr(request.state, "user", None)
+		if data is None:
+			data = decodificar_jwt(token)
 		rol = data.get("role") or data.get("rol") or data.get("role")
 		if rol is None:
 			raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token sin rol")
@@ -28,3 +50,183 @@ def verificar_rol(permisos_requeridos: List[str]):
 		return data
 
 	return wrapper
+
+
+# ---------------- Ejecutores ----------------
+def en_ejecutor(executor: BoundedExecutor, max_concurrent: Optional[int] = None, route: Optional[str] = None):
+	"""
+	Decorador para endpoints sync con IO/CPU pesado: el endpoint pasa a ser
+	async y su cuerpo corre en `executor` (no en el threadpool por defecto).
+
+	- max_concurrent: tope de peticiones en vuelo de esta ruta.
+	- route: nombre para métricas (por defecto, el nombre de la función).
+	- Pool o ruta saturados -> 503 con Retry-After.
+
+	Uso (debajo del decorador del router):
+		@router.get("/reporte")
+		@en_ejecutor(reports_executor, max_concurrent=2)
+		def reporte(...): ...
+	"""
+	def decorator(fn: Callable[..., Any]):
+		nombre = route or fn.__name__
+
+		# functools.wraps conserva la firma: FastAPI sigue resolviendo
+		# parámetros y dependencias del endpoint original.
+		@functools.wraps(fn)
+		async def wrapper(*args, **kwargs):
+			reserva = reservar_ejecutor(executor, nombre, max_concurrent)
+			try:
+				return await reserva.run(fn, *args, **kwargs)
+			finally:
+				reserva.liberar()
+
+		return wrapper
+
+	return decorator
+
+
+def reservar_ejecutor(executor: BoundedExecutor, route: str, max_concurrent: Optional[int] = None) -> Reserva:
+	"""
+	Toma un lugar en `executor` para la ruta (503 con Retry-After si está
+	saturado). Para respuestas en streaming que deben retener el lugar hasta
+	el último bloque: StreamingResponse(reserva.iterar(generador)).
+	"""
+	try:
+		return executor.reservar(route, max_concurrent)
+	except ExecutorSaturatedError:
+		raise HTTPException(
+			status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+			detail="Servidor ocupado procesando otras solicitudes. Intente nuevamente en unos segundos",
+			headers={"Retry-After": "2"},
+		)
+
+
+# ---------------- ETag / GET condicional ----------------
+def calcular_etag(request: Request, tablas: tuple) -> str:
+	"""
+	ETag fuerte: hash de ruta + query normalizada (ordenada) + versión de
+	las tablas que lee el endpoint + usuario (los reportes llevan generated_by).
+	"""
+	user = getattr(request.state, "user", None) or {}
+	base = [
+		request.url.path,
+		sorted(request.query_params.multi_items()),
+		version_tablas(*tablas),
+		user.get("username"),
+	]
+	digest = hashlib.sha256(json.dumps(base, default=str).encode("utf-8")).hexdigest()
+	return f'"{digest[:32]}"'
+
+
+def _etags_de(if_none_match: Optional[str]) -> List[str]:
+	"""Valores de If-None-Match (sin prefijo W/: comparación débil, RFC 9110)."""
+	if not if_none_match:
+		return []
+	return [v.strip().removeprefix("W/") for v in if_none_match.split(",")]
+
+
+def etag_de_tablas(*tablas: str):
+	"""
+	Dependencia para GET de lectura. Si If-None-Match coincide con el ETag
+	actual responde 304 SIN ejecutar el endpoint (ni leer CSVs); si no,
+	agrega la cabecera ETag a la respuesta.
+
+	Declararla como parámetro DESPUÉS de verificar_rol, así la autenticación
+	se resuelve antes:
+		user=Depends(verificar_rol([...])),
+		_etag=Depends(etag_de_tablas("machines")),
+	"""
+	async def dependencia(request: Request, response: Response):
+		etag = calcular_etag(request, tablas)
+		enviados = _etags_de(request.headers.get("If-None-Match"))
+		if etag in enviados or "*" in enviados:
+			raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+		response.headers["ETag"] = etag
+
+	return dependencia
+
+
+# ---------------- Sparse fieldsets (?fields=) ----------------
+def campos_param(*permitidos: str):
+	"""
+	Dependencia del parámetro `fields` (p. ej. ?fields=id,serial,casino_id).
+	Retorna la lista pedida (sin duplicados, en el orden pedido) o None si no
+	se envió; 400 si trae campos fuera de `permitidos`.
+
+		fields: Optional[List[str]] = Depends(campos_param(*MachineOut.model_fields)),
+	"""
+	def dependencia(
+		fields: Optional[str] = Query(None, description=f"Campos separados por coma. Permitidos: {', '.join(permitidos)}"),
+	) -> Optional[List[str]]:
+		if fields is None:
+			return None
+		pedidos = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+		desconocidos = [f for f in pedidos if f not in permitidos]
+		if desconocidos or not pedidos:
+			raise HTTPException(
+				status_code=status.HTTP_400_BAD_REQUEST,
+				detail=f"Campos no válidos: {', '.join(desconocidos) or fields}. Permitidos: {', '.join(permitidos)}",
+			)
+		return pedidos
+
+	return dependencia
+
+
+# ---------------- Idempotency-Key ----------------
+# Un solo almacén compartido por todos los routers (memoria + sidecar en data/).
+idempotency_store = IdempotencyStore()
+
+
+def idempotency_key_header(
+	idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+) -> Optional[str]:
+	"""Lee la cabecera opcional Idempotency-Key (vacía = sin idempotencia)."""
+	if idempotency_key is None or not idempotency_key.strip():
+		return None
+	return idempotency_key.strip()
+
+
+def idempotency_scope(route: str, user: Optional[dict]) -> str:
+	"""Ámbito de la key: ruta + usuario del token, para no mezclar clientes."""
+	sub = (user or {}).get("sub") or (user or {}).get("username") or "anon"
+	return f"{route}:{sub}"
+
+
+def idempotent_replay(scope: str, key: Optional[str], payload: Any) -> Optional[JSONResponse]:
+	"""
+	Si la petición ya se procesó con esta key, devuelve la respuesta guardada
+	(sin tocar CSVs). Si la key se reutiliza con otro cuerpo -> 422.
+
+	Si no hay respuesta guardada, la key queda reservada para esta petición
+	(atómicamente): un duplicado concurrente recibe 409 hasta que esta termine.
+	El handler debe cerrar con idempotent_save() o, si falla, idempotent_release().
+	"""
+	if key is None:
+		return None
+	try:
+		cached = idempotency_store.reserve(scope, key, fingerprint(payload))
+	except IdempotencyConflictError as e:
+		raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+	except IdempotencyInProgressError as e:
+		raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e), headers={"Retry-After": "1"})
+	if cached is None:
+		return None
+	return JSONResponse(
+		status_code=cached["status_code"],
+		content=cached["body"],
+		headers={"Idempotent-Replayed": "true"},
+	)
+
+
+def idempotent_save(scope: str, key: Optional[str], payload: Any, status_code: int, result: Any) -> None:
+	"""Guarda la respuesta exitosa para futuros reintentos con la misma key (y libera la reserva)."""
+	if key is None:
+		return
+	idempotency_store.put(scope, key, fingerprint(payload), status_code, jsonable_encoder(result))
+
+
+def idempotent_release(scope: str, key: Optional[str]) -> None:
+	"""Libera la reserva de la key cuando el handler falla (el cliente puede reintentar)."""
+	if key is None:
+		return
+	idempotency_store.release(scope, key)
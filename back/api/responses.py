@@ -0,0 +1,187 @@
+# -------------------------------------------
+# back/api/responses.py
+# Propósito:
+#   - Respuestas JSON rápidas para payloads grandes (reporte detallado de
+#     casino, reporte con filtros, consulta de contadores).
+#   - Compresión gzip de respuestas por encima de un umbral.
+#
+# Por qué:
+#   - Con response_model, FastAPI vuelve a validar lo que el endpoint ya
+#     validó, lo pasa a dicts (jsonable_encoder / serialize) y recién ahí
+#     json.dumps. En reportes de varios MB eso domina el tiempo de respuesta.
+#
+# Diseño:
+#   - respuesta_json(data, modelo): valida UNA vez (nada si data ya es del
+#     tipo) y serializa directo a bytes con pydantic-core (TypeAdapter.dump_json).
+#     Sin modelo: dicts/listas con orjson (si está instalado; si no, json).
+#   - Devuelve un Response ya serializado: FastAPI no lo vuelve a procesar.
+#     Las cabeceras puestas en la Response inyectada del endpoint (ETag,
+#     X-Next-Cursor) se copian a la respuesta final.
+#   - CompresionMiddleware: GZipMiddleware que no recomprime formatos ya
+#     comprimidos (PDF, XLSX) y marca el ETag como débil cuando comprime
+#     (la representación gzip no es idéntica byte a byte).
+#   - validar_lista(modelo, registros): valida un listado completo en una sola
+#     pasada (TypeAdapter(List[modelo])) en vez de construir modelo por fila.
+#   - Brotli no está entre las dependencias; gzip lo entienden todos los clientes.
+#   - StreamingEnEjecutor: streaming cuyo generador síncrono se recorre en un
+#     BoundedExecutor con el lugar reservado hasta el último bloque (y que lo
+#     devuelve aunque el cliente corte antes de empezar).
+# -------------------------------------------
+
+import json
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Optional, get_args, get_origin
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+
+from back.core.executors import Reserva
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+
+# Tipos de contenido que ya vienen comprimidos: gzip solo gasta CPU
+YA_COMPRIMIDOS = {
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/zip",
+    "application/gzip",
+}
+
+
+def _default(obj: Any) -> Any:
+    """Tipos que orjson no conoce (Timestamp de pandas, Decimal, modelos...)."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "isoformat"):  # date/datetime/pd.Timestamp
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return jsonable_encoder(obj)
+
+
+def dumps(data: Any) -> bytes:
+    """JSON compacto en bytes (orjson si está disponible)."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _adapter(modelo: Any) -> TypeAdapter:
+    return TypeAdapter(modelo)
+
+
+def _ya_validado(data: Any, modelo: Any) -> bool:
+    """True si data ya es una instancia (o lista de instancias) del modelo."""
+    if isinstance(modelo, type):
+        return isinstance(data, modelo)
+    if get_origin(modelo) is list:
+        (item,) = get_args(modelo)
+        return isinstance(data, list) and isinstance(item, type) and all(isinstance(x, item) for x in data)
+    return False
+
+
+def validar_lista(modelo: Any, registros: Iterable[Any], omitir_invalidos: bool = False) -> List[Any]:
+    """
+    Valida todos los registros (dicts) como List[modelo] en una sola pasada.
+
+    - omitir_invalidos=True: descarta las filas que no validan (las que antes
+      se saltaban con try/except por fila) en vez de fallar todo el listado.
+    """
+    adapter = _adapter(List[modelo])
+    registros = registros if isinstance(registros, list) else list(registros)
+    try:
+        return adapter.validate_python(registros)
+    except ValidationError as e:
+        if not omitir_invalidos:
+            raise
+        malas = {err["loc"][0] for err in e.errors() if err["loc"]}
+        return adapter.validate_python([r for i, r in enumerate(registros) if i not in malas])
+
+
+def respuesta_json(
+    data: Any,
+    modelo: Any = None,
+    response: Optional[Response] = None,
+    status_code: int = 200,
+) -> Response:
+    """
+    Serializa `data` una sola vez y devuelve la respuesta lista.
+
+    - modelo: clase pydantic o tipo (p. ej. List[CounterOut]); se valida solo
+      si data no es ya de ese tipo.
+    - response: la Response inyectada del endpoint, para conservar sus cabeceras.
+    """
+    if modelo is not None:
+        adapter = _adapter(modelo)
+        if not _ya_validado(data, modelo):
+            data = adapter.validate_python(data)
+        body = adapter.dump_json(data)
+    else:
+        body = dumps(data)
+    out = Response(content=body, status_code=status_code, media_type="application/json")
+    if response is not None:
+        out.headers.raw.extend(response.headers.raw)
+    return out
+
+
+class _GZipResponderSelectivo(GZipResponder):
+    async def __call__(self, scope, receive, send) -> None:
+        async def send_etag_debil(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                etag = headers.get("etag")
+                if etag and headers.get("content-encoding") == "gzip" and not etag.startswith("W/"):
+                    headers["etag"] = f"W/{etag}"
+            await send(message)
+
+        await super().__call__(scope, receive, send_etag_debil)
+
+    async def send_with_gzip(self, message) -> None:
+        if message["type"] == "http.response.start":
+            tipo = Headers(raw=message["headers"]).get("content-type", "")
+            await super().send_with_gzip(message)
+            # Mismo camino que una respuesta que ya trae Content-Encoding: se pasa tal cual
+            if tipo.split(";")[0].strip() in YA_COMPRIMIDOS:
+                self.content_encoding_set = True
+            return
+        await super().send_with_gzip(message)
+
+
+class CompresionMiddleware(GZipMiddleware):
+    """gzip por encima de minimum_size, salvo formatos ya comprimidos."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _GZipResponderSelectivo(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class StreamingEnEjecutor(StreamingResponse):
+    """
+    StreamingResponse(reserva.iterar(content)) que además cierra el iterador
+    y libera la reserva al terminar la respuesta, aunque el generador nunca
+    haya arrancado (cliente desconectado antes del primer bloque).
+    """
+
+    def __init__(self, reserva: Reserva, content: Iterator[Any], **kwargs):
+        self.reserva = reserva
+        super().__init__(reserva.iterar(content), **kwargs)
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+            self.reserva.liberar()
@@ -30,6 +30,7 @@ from back.api.v1.places import router as places_router
 from back.api.v1.machines import router as machines_router
 from back.api.v1.counters import router as counters_router
 from back.api.v1.balances import router as balances_router
+from back.api.v1.logs import router as logs_router
 
 # Prefijo /v1 (main.py agregará /api)
 api_router = APIRouter(prefix="/v1")
@@ -40,3 +41,4 @@ api_router.include_router(places_router, prefix="/places", tags=["places"])
 api_router.include_router(machines_router, prefix="/machines", tags=["machines"])
 api_router.include_router(counters_router, prefix="/counters", tags=["counters"])
 api_router.include_router(balances_router, prefix="/balances", tags=["balances"])
+api_router.include_router(logs_router, prefix="/logs", tags=["logs"])
@@ -1,10 +1,12 @@
 # back/api/v1/auth.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, status
 # Importamos los modelos que definimos usando Pydantic
 from back.models.auth import LoginIn, LoginOut
 # Importa la función de dominio que creamos
 from back.domain.users.login import login_user
+# Pool acotado para bcrypt (no bloquear el event loop)
+from back.core.executors import ExecutorSaturatedError, login_executor
 
 # Creamos un objeto enrutador. Este objeto agrupará todas las rutas de autenticación.
 router = APIRouter()
@@ -22,6 +24,15 @@ async def login(user_data: LoginIn):
     username = user_data.username
     password = user_data.password
 
-    auth_result = login_user(username, password)
+    # bcrypt (y el re-hash de contraseñas planas) corre en el pool de login;
+    # el event loop queda libre para atender otras peticiones mientras tanto.
+    try:
+        auth_result = await login_executor.run(login_user, username, password)
+    except ExecutorSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Demasiados inicios de sesión simultáneos. Intente nuevamente en unos segundos",
+            headers={"Retry-After": "1"},
+        )
 
     return auth_result
\ No newline at end of file
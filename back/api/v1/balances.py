@@ -20,7 +20,12 @@ from back.models.balances import (
     CasinoDetailedReport,
     ReportFilters,
     ParticipationReportIn,
-    ParticipationReportOut
+    ParticipationReportOut,
+    CounterAnomalyOut,
+    AnomalyScanOut,
+    TimeSeriesOut,
+    ComparativeReport,
+    LeaderboardOut
 )
 
 from back.domain.balances.casino_balance import (
@@ -30,6 +35,7 @@ from back.domain.balances.casino_balance import (
 )
 
 from back.domain.balances.machine_balance import calcular_cuadre_maquina
+from back.domain.balances.machine_balance import NotFoundError as MachineNotFoundError
 
 from back.domain.balances.report import (
     generar_reporte_consolidado_casino,
@@ -37,11 +43,23 @@ from back.domain.balances.report import (
     generar_reporte_participacion
 )
 from back.domain.balances.export import generar_pdf_reporte, generar_excel_reporte
+from back.domain.balances.timeseries import serie_utilidad
+from back.domain.balances.comparison import generar_reporte_comparativo, periodos_de_comparacion
+from back.domain.balances.leaderboard import ranking_maquinas
+from back.domain.counters.anomalies import escanear_anomalias
 
+from back.storage.anomalies_repo import AnomaliesRepo
 from back.storage.balances_repo import BalancesRepo
 from back.storage.counters_repo import CountersRepo
 from back.storage.machines_repo import MachinesRepo
 from back.storage.places_repo import PlaceStorage
+from back.storage.pagination import decode_cursor
+from back.core import settings
+from back.core.executors import reports_executor
+from back.core.singleflight import clave_peticion, report_flights
+from back.storage.versions import version_tablas
+from back.api.responses import respuesta_json, validar_lista
+from back.models.parciales import modelo_parcial
 
 
 # Instanciar repositorios
@@ -49,10 +67,21 @@ repo_balances = BalancesRepo()
 repo_counters = CountersRepo()
 repo_machines = MachinesRepo()
 repo_places = PlaceStorage()
+repo_anomalies = AnomaliesRepo()
 
 router = APIRouter()
 
-from back.api.deps import verificar_rol
+from back.api.deps import (
+    verificar_rol,
+    en_ejecutor,
+    etag_de_tablas,
+    campos_param,
+    idempotency_key_header,
+    idempotency_scope,
+    idempotent_release,
+    idempotent_replay,
+    idempotent_save,
+)
 
 
 def get_current_time():
@@ -60,6 +89,27 @@ def get_current_time():
     return datetime.now()
 
 
+# Tablas que leen los reportes: su versión entra en la clave del single-flight
+TABLAS_REPORTES = ("counters", "machines", "places", "machine_balances")
+# Argumentos que no identifican la petición (repos, reloj, usuario)
+_FUERA_DE_CLAVE = {"counters_repo", "machines_repo", "places_repo", "balances_repo", "clock", "actor"}
+
+
+def _reporte_compartido(fn, **kwargs):
+    """
+    Llama a la función de dominio `fn` con single-flight: peticiones idénticas
+    concurrentes (mismos parámetros y misma versión de los datos) comparten
+    un único cálculo. generated_by se ajusta al usuario de cada petición.
+    """
+    actor = kwargs.get("actor")
+    params = {k: v for k, v in kwargs.items() if k not in _FUERA_DE_CLAVE}
+    clave = clave_peticion(fn.__name__, params, version_tablas(*TABLAS_REPORTES))
+    report = report_flights.do(clave, lambda: fn(**kwargs))
+    if isinstance(report, dict) and actor is not None and report.get("generated_by") != actor:
+        report = {**report, "generated_by": actor}
+    return report
+
+
 # ============ ENDPOINTS PARA CASINO BALANCES ============
 
 @router.post(
@@ -69,6 +119,7 @@ def get_current_time():
     summary="Generar cuadre de casino",
     description="Calcula el cuadre consolidado de un casino para un periodo específico"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_ROUTE_MAX_CONCURRENCY)
 def generar_cuadre_casino(data: CasinoBalanceIn, user=Depends(verificar_rol(["admin", "soporte"]))):
     """
     Genera un cuadre general del casino consolidando todas sus máquinas activas.
@@ -125,6 +176,16 @@ def generar_cuadre_casino(data: CasinoBalanceIn, user=Depends(verificar_rol(["ad
         )
 
 
+def _validar_cursor(cursor: Optional[str]) -> None:
+    """Un cursor mal formado es error del cliente (400), no del servidor."""
+    if cursor is None:
+        return
+    try:
+        decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get(
     "/casinos",
     response_model=List[CasinoBalanceOut],
@@ -133,11 +194,15 @@ def generar_cuadre_casino(data: CasinoBalanceIn, user=Depends(verificar_rol(["ad
     description="Obtiene la lista de cuadres de casinos con filtros opcionales"
 )
 def listar_cuadres_casinos(
+    response: Response,
     place_id: Optional[int] = Query(None, ge=1, description="Filtrar por ID de casino"),
     date_from: Optional[str] = Query(None, description="Fecha inicial (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Fecha final (YYYY-MM-DD)"),
     limit: Optional[int] = Query(100, ge=1, le=500, description="Límite de resultados"),
-    offset: int = Query(0, ge=0, description="Offset para paginación")
+    offset: int = Query(0, ge=0, description="Offset para paginación"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor"),
+    fields: Optional[List[str]] = Depends(campos_param(*CasinoBalanceOut.model_fields)),
+    _etag=Depends(etag_de_tablas("casino_balances"))
 ):
     """
     Lista los cuadres de casinos con filtros opcionales.
@@ -147,17 +212,35 @@ def listar_cuadres_casinos(
     - **date_to**: Filtra balances hasta esta fecha
     - **limit**: Cantidad máxima de resultados (default 100)
     - **offset**: Posición inicial para paginación (default 0)
+    - **cursor**: Paginación por cursor (preferida); la cabecera `X-Next-Cursor`
+      trae el valor para pedir la siguiente página
+    - **fields**: Solo esos campos por cuadre (ej: id,period_start,utilidad_total)
     """
+    _validar_cursor(cursor)
     try:
-        balances = repo_balances.listar_casino_balances(
-            place_id=place_id,
-            date_from=date_from,
-            date_to=date_to,
-            limit=limit,
-            offset=offset
-        )
+        if offset == 0:
+            balances, next_cursor = repo_balances.listar_casino_balances_page(
+                place_id=place_id,
+                date_from=date_from,
+                date_to=date_to,
+                cursor=cursor,
+                limit=limit or 100,
+                fields=fields
+            )
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+        else:
+            balances = repo_balances.listar_casino_balances(
+                place_id=place_id,
+                date_from=date_from,
+                date_to=date_to,
+                limit=limit,
+                offset=offset,
+                fields=fields
+            )
         
-        return [CasinoBalanceOut(**b) for b in balances]
+        modelo = modelo_parcial(CasinoBalanceOut, fields)
+        return respuesta_json(validar_lista(modelo, balances), List[modelo], response)
         
     except Exception as e:
         raise HTTPException(
@@ -174,7 +257,8 @@ def listar_cuadres_casinos(
     description="Obtiene los detalles de un cuadre específico de casino"
 )
 def obtener_cuadre_casino(
-    balance_id: int = Path(..., ge=1, description="ID del balance")
+    balance_id: int = Path(..., ge=1, description="ID del balance"),
+    _etag=Depends(etag_de_tablas("casino_balances"))
 ):
     """
     Obtiene un cuadre de casino específico por su ID.
@@ -248,11 +332,14 @@ def bloquear_cuadre_casino(
     summary="Generar reporte consolidado detallado",
     description="Genera un reporte completo con desglose por máquina y totales por categoría"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_ROUTE_MAX_CONCURRENCY)
 def generar_reporte_detallado_casino(
+    response: Response,
     place_id: int = Path(..., ge=1, description="ID del casino"),
     period_start: str = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
     period_end: str = Query(..., description="Fecha final (YYYY-MM-DD)"),
-    user=Depends(verificar_rol(["admin", "soporte"]))
+    user=Depends(verificar_rol(["admin", "soporte"])),
+    _etag=Depends(etag_de_tablas(*TABLAS_REPORTES))
 ):
     """
     Genera un reporte consolidado detallado del casino.
@@ -272,7 +359,7 @@ def generar_reporte_detallado_casino(
     actor = user.get("username", "api_user")
     
     try:
-        report = generar_reporte_consolidado_casino(
+        report = _reporte_compartido(generar_reporte_consolidado_casino,
             place_id=place_id,
             period_start=period_start,
             period_end=period_end,
@@ -283,7 +370,8 @@ def generar_reporte_detallado_casino(
             actor=actor
         )
         
-        return CasinoDetailedReport(**report)
+        # Reporte grande: una validación y serialización directa a bytes
+        return respuesta_json(report, CasinoDetailedReport, response)
         
     except NotFoundError as e:
         raise HTTPException(
@@ -302,6 +390,278 @@ def generar_reporte_detallado_casino(
         )
 
 
+# ============ SERIES DE TIEMPO ============
+
+@router.get(
+    "/timeseries",
+    response_model=TimeSeriesOut,
+    status_code=status.HTTP_200_OK,
+    summary="Serie de tiempo de cuadres",
+    description="Totales IN/OUT/JACKPOT/BILLETERO/UTILIDAD por día, semana o mes"
+)
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_ROUTE_MAX_CONCURRENCY)
+def serie_de_tiempo(
+    period_start: str = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
+    period_end: str = Query(..., description="Fecha final (YYYY-MM-DD)"),
+    machine_id: Optional[int] = Query(None, ge=1, description="Serie de una máquina"),
+    casino_id: Optional[int] = Query(None, ge=1, description="Serie de un casino"),
+    marca: Optional[str] = Query(None, description="Grupo por marca"),
+    modelo: Optional[str] = Query(None, description="Grupo por modelo"),
+    granularidad: str = Query("day", pattern="^(day|week|month)$", description="day | week | month"),
+    user=Depends(verificar_rol(["admin", "soporte"])),
+    _etag=Depends(etag_de_tablas(*TABLAS_REPORTES))
+):
+    """
+    Curva para dashboards, calculada en una sola pasada por los contadores.
+    
+    Cada tramo usa la misma fórmula del cuadre por máquina
+    ((FINAL - INICIAL) × DENOMINACION) y suma las máquinas activas del alcance.
+    Los filtros casino_id y marca/modelo se pueden combinar.
+    """
+    try:
+        return TimeSeriesOut(**_reporte_compartido(serie_utilidad,
+            period_start=period_start,
+            period_end=period_end,
+            counters_repo=repo_counters,
+            machines_repo=repo_machines,
+            places_repo=repo_places,
+            machine_id=machine_id,
+            casino_id=casino_id,
+            marca=marca,
+            modelo=modelo,
+            granularidad=granularidad,
+        ))
+    except (NotFoundError, MachineNotFoundError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+# ============ RANKING DE MÁQUINAS ============
+
+@router.get(
+    "/leaderboard",
+    response_model=LeaderboardOut,
+    status_code=status.HTTP_200_OK,
+    summary="Ranking de máquinas",
+    description="Top o bottom N máquinas por utilidad, jackpot, billetero, in u out en un periodo"
+)
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_ROUTE_MAX_CONCURRENCY)
+def ranking_de_maquinas(
+    period_start: str = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
+    period_end: str = Query(..., description="Fecha final (YYYY-MM-DD)"),
+    metric: str = Query("utilidad", pattern="^(utilidad|jackpot|billetero|in|out)$", description="Métrica del ranking"),
+    n: int = Query(20, ge=1, le=500, description="Cantidad de máquinas a devolver"),
+    orden: str = Query("top", pattern="^(top|bottom)$", description="top (mayores) | bottom (menores)"),
+    casino_id: Optional[int] = Query(None, ge=1, description="Filtrar por casino"),
+    marca: Optional[str] = Query(None, description="Filtrar por marca"),
+    modelo: Optional[str] = Query(None, description="Filtrar por modelo"),
+    fuente: str = Query("auto", pattern="^(auto|daily|counters)$", description="auto | daily | counters"),
+    user=Depends(verificar_rol(["admin", "soporte"])),
+    _etag=Depends(etag_de_tablas(*TABLAS_REPORTES))
+):
+    """
+    Devuelve solo las N máquinas pedidas (no el reporte completo).
+    
+    Con **fuente=auto** o **daily** los totales salen del agregado diario de
+    contadores (primera y última lectura por máquina y día, precalculado);
+    **counters** recorre todas las lecturas. Ambas fuentes dan el mismo total.
+    """
+    try:
+        return LeaderboardOut(**_reporte_compartido(ranking_maquinas,
+            period_start=period_start,
+            period_end=period_end,
+            counters_repo=repo_counters,
+            machines_repo=repo_machines,
+            places_repo=repo_places,
+            metrica=metric,
+            n=n,
+            orden=orden,
+            casino_id=casino_id,
+            marca=marca,
+            modelo=modelo,
+            fuente=fuente,
+        ))
+    except (NotFoundError, MachineNotFoundError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+# ============ REPORTE COMPARATIVO ENTRE PERIODOS ============
+
+def _reporte_comparativo(casino_id, machine_id, period_start, period_end, comparar, actor):
+    """Arma el reporte comparativo traduciendo errores de dominio a HTTP."""
+    try:
+        periodos = periodos_de_comparacion(period_start, period_end, comparar)
+        return _reporte_compartido(generar_reporte_comparativo,
+            periodos=periodos,
+            counters_repo=repo_counters,
+            machines_repo=repo_machines,
+            places_repo=repo_places,
+            clock=get_current_time,
+            actor=actor,
+            casino_id=casino_id,
+            machine_id=machine_id,
+        )
+    except (NotFoundError, MachineNotFoundError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get(
+    "/comparativo",
+    response_model=ComparativeReport,
+    status_code=status.HTTP_200_OK,
+    summary="Reporte comparativo entre periodos",
+    description="Compara un periodo contra el anterior y/o el mismo periodo del año pasado"
+)
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_ROUTE_MAX_CONCURRENCY)
+def reporte_comparativo(
+    response: Response,
+    period_start: str = Query(..., description="Fecha inicial del periodo actual (YYYY-MM-DD)"),
+    period_end: str = Query(..., description="Fecha final del periodo actual (YYYY-MM-DD)"),
+    casino_id: Optional[int] = Query(None, ge=1, description="Comparar un casino"),
+    machine_id: Optional[int] = Query(None, ge=1, description="Comparar una máquina"),
+    comparar: List[str] = Query(["anterior"], description="anterior | anio_anterior (repetible)"),
+    user=Depends(verificar_rol(["admin", "soporte"])),
+    _etag=Depends(etag_de_tablas(*TABLAS_REPORTES))
+):
+    """
+    Calcula todos los periodos con una sola carga de contadores y devuelve
+    deltas y variación porcentual por máquina y por categoría.
+    
+    - **comparar=anterior**: periodo anterior de igual duración (mes calendario anterior si el actual es un mes completo)
+    - **comparar=anio_anterior**: mismas fechas un año antes
+    """
+    report = _reporte_comparativo(
+        casino_id, machine_id, period_start, period_end, comparar,
+        user.get("username", "api_user")
+    )
+    return respuesta_json(report, ComparativeReport, response)
+
+
+@router.get(
+    "/comparativo/{formato}",
+    status_code=status.HTTP_200_OK,
+    summary="Exportar reporte comparativo",
+    description="Descarga el reporte comparativo en PDF o Excel"
+)
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_EXPORT_MAX_CONCURRENCY)
+def exportar_reporte_comparativo(
+    formato: str = Path(..., pattern="^(pdf|excel)$", description="pdf | excel"),
+    period_start: str = Query(..., description="Fecha inicial del periodo actual (YYYY-MM-DD)"),
+    period_end: str = Query(..., description="Fecha final del periodo actual (YYYY-MM-DD)"),
+    casino_id: Optional[int] = Query(None, ge=1, description="Comparar un casino"),
+    machine_id: Optional[int] = Query(None, ge=1, description="Comparar una máquina"),
+    comparar: List[str] = Query(["anterior"], description="anterior | anio_anterior (repetible)"),
+    user=Depends(verificar_rol(["admin", "soporte"]))
+):
+    """Mismo reporte que /comparativo, exportado con el módulo de exportación."""
+    report = _reporte_comparativo(
+        casino_id, machine_id, period_start, period_end, comparar,
+        user.get("username", "api_user")
+    )
+    alcance = f"casino_{casino_id}" if casino_id else f"maquina_{machine_id}"
+    try:
+        if formato == "pdf":
+            content = generar_pdf_reporte(report)
+            media_type = "application/pdf"
+            extension = "pdf"
+        else:
+            content = generar_excel_reporte(report)
+            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            extension = "xlsx"
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error: {str(e)}"
+        )
+    
+    filename = f"reporte_comparativo_{alcance}_{period_start}_{period_end}.{extension}"
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
+
+
+# ============ ENDPOINTS PARA ANOMALÍAS DE CONTADORES ============
+
+@router.post(
+    "/anomalies/scan",
+    response_model=AnomalyScanOut,
+    status_code=status.HTTP_200_OK,
+    summary="Escanear anomalías de contadores",
+    description="Recorre todo el historial de contadores y regenera la tabla de hallazgos"
+)
+@en_ejecutor(reports_executor, max_concurrent=1)
+def escanear_anomalias_contadores(user=Depends(verificar_rol(["admin"]))):
+    """
+    Calcula los saltos entre lecturas consecutivas de cada máquina y marca:
+    - **negative**: el medidor bajó (reinicio, dígitos intercambiados, error de captura)
+    - **outlier**: salto muy superior a los habituales de la máquina
+    
+    El historial se procesa por bloques, con memoria acotada.
+    """
+    return AnomalyScanOut(**escanear_anomalias(
+        counters_repo=repo_counters,
+        anomalies_repo=repo_anomalies,
+        clock=get_current_time,
+    ))
+
+
+@router.get(
+    "/anomalies",
+    response_model=List[CounterAnomalyOut],
+    status_code=status.HTTP_200_OK,
+    summary="Consultar anomalías de contadores",
+    description="Hallazgos del último escaneo, filtrables por máquina, casino, fechas y tipo"
+)
+def listar_anomalias_contadores(
+    machine_id: Optional[int] = Query(None, ge=1, description="Filtrar por máquina"),
+    casino_id: Optional[int] = Query(None, ge=1, description="Filtrar por casino"),
+    date_from: Optional[str] = Query(None, description="Fecha inicial (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Fecha final (YYYY-MM-DD)"),
+    kind: Optional[str] = Query(None, pattern="^(negative|outlier)$", description="Tipo de hallazgo"),
+    user=Depends(verificar_rol(["admin", "soporte", "operador"])),
+    _etag=Depends(etag_de_tablas("counter_anomalies"))
+):
+    """
+    Útil antes de generar o al revisar un cuadre: si el periodo tiene
+    hallazgos, los totales del cuadre probablemente no son confiables.
+    """
+    rows = repo_anomalies.listar(
+        machine_id=machine_id,
+        casino_id=casino_id,
+        date_from=date_from,
+        date_to=date_to,
+        kind=kind,
+    )
+    return [CounterAnomalyOut(**r) for r in rows]
+
+
 # ============ ENDPOINTS PARA MACHINE BALANCES ============
 
 @router.post(
@@ -311,7 +671,12 @@ def generar_reporte_detallado_casino(
     summary="Generar cuadre de máquina",
     description="Calcula el cuadre de una máquina individual para un periodo específico"
 )
-def generar_cuadre_maquina(data: MachineBalanceIn, user=Depends(verificar_rol(["admin", "soporte", "operador"]))):
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_ROUTE_MAX_CONCURRENCY)
+def generar_cuadre_maquina(
+    data: MachineBalanceIn,
+    user=Depends(verificar_rol(["admin", "soporte", "operador"])),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header)
+):
     """
     Genera un cuadre de una máquina individual basándose en sus contadores.
     
@@ -332,8 +697,28 @@ def generar_cuadre_maquina(data: MachineBalanceIn, user=Depends(verificar_rol(["
     - **period_end**: Fecha final (YYYY-MM-DD)
     - **locked**: Si True, marca el balance como bloqueado (opcional)
     
+    Con la cabecera `Idempotency-Key`, un reintento devuelve el cuadre ya
+    generado sin recalcularlo (409 si el primero todavía está en curso).
+    
     Retorna el balance generado con todos los totales calculados.
     """
+    payload = data.model_dump()
+    scope = idempotency_scope("POST /balances/machines/generate", user)
+    replay = idempotent_replay(scope, idempotency_key, payload)
+    if replay is not None:
+        return replay
+    
+    try:
+        response = _generar_cuadre_maquina(data, user)
+    except BaseException:
+        idempotent_release(scope, idempotency_key)
+        raise
+    idempotent_save(scope, idempotency_key, payload, status.HTTP_201_CREATED, response)
+    return response
+
+
+def _generar_cuadre_maquina(data: MachineBalanceIn, user: dict) -> MachineBalanceOut:
+    """Cálculo y persistencia del cuadre (generar_cuadre_maquina sin la parte de Idempotency-Key)."""
     try:
         # Obtener username del usuario autenticado
         actor = user.get("username", "api_user")
@@ -365,7 +750,10 @@ def generar_cuadre_maquina(data: MachineBalanceIn, user=Depends(verificar_rol(["
             'utilidad_total': result['utilidad_total'],
             'generated_at': result['generated_at'],
             'generated_by': result['generated_by'],
-            'locked': result['locked']
+            'locked': result['locked'],
+            'anomalias': repo_anomalies.contar_maquina(
+                result['machine_id'], result['period_start'], result['period_end']
+            )
         }
         
         return MachineBalanceOut(**response_data)
@@ -400,25 +788,48 @@ def generar_cuadre_maquina(data: MachineBalanceIn, user=Depends(verificar_rol(["
     description="Obtiene la lista de cuadres de máquinas con filtros opcionales"
 )
 def listar_cuadres_maquinas(
+    response: Response,
     machine_id: Optional[int] = Query(None, ge=1, description="Filtrar por ID de máquina"),
     date_from: Optional[str] = Query(None, description="Fecha inicial (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Fecha final (YYYY-MM-DD)"),
     limit: Optional[int] = Query(100, ge=1, le=500, description="Límite de resultados"),
-    offset: int = Query(0, ge=0, description="Offset para paginación")
+    offset: int = Query(0, ge=0, description="Offset para paginación"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor"),
+    fields: Optional[List[str]] = Depends(campos_param(*MachineBalanceOut.model_fields)),
+    _etag=Depends(etag_de_tablas("machine_balances"))
 ):
     """
     Lista los cuadres de máquinas con filtros opcionales.
+    
+    Con `offset=0` (por defecto) se pagina por cursor: la cabecera
+    `X-Next-Cursor` trae el valor para pedir la siguiente página.
+    Con `fields` cada cuadre trae solo esos campos.
     """
+    _validar_cursor(cursor)
     try:
-        balances = repo_balances.listar_machine_balances(
-            machine_id=machine_id,
-            date_from=date_from,
-            date_to=date_to,
-            limit=limit,
-            offset=offset
-        )
+        if offset == 0:
+            balances, next_cursor = repo_balances.listar_machine_balances_page(
+                machine_id=machine_id,
+                date_from=date_from,
+                date_to=date_to,
+                cursor=cursor,
+                limit=limit or 100,
+                fields=fields
+            )
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+        else:
+            balances = repo_balances.listar_machine_balances(
+                machine_id=machine_id,
+                date_from=date_from,
+                date_to=date_to,
+                limit=limit,
+                offset=offset,
+                fields=fields
+            )
         
-        return [MachineBalanceOut(**b) for b in balances]
+        modelo = modelo_parcial(MachineBalanceOut, fields)
+        return respuesta_json(validar_lista(modelo, balances), List[modelo], response)
         
     except Exception as e:
         raise HTTPException(
@@ -435,7 +846,8 @@ def listar_cuadres_maquinas(
     description="Obtiene los detalles de un cuadre específico de máquina"
 )
 def obtener_cuadre_maquina(
-    balance_id: int = Path(..., ge=1, description="ID del balance")
+    balance_id: int = Path(..., ge=1, description="ID del balance"),
+    _etag=Depends(etag_de_tablas("machine_balances"))
 ):
     """
     Obtiene un cuadre de máquina específico por su ID.
@@ -504,6 +916,7 @@ def bloquear_cuadre_maquina(
     summary="Exportar reporte a PDF",
     description="Genera y descarga el reporte consolidado en formato PDF"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_EXPORT_MAX_CONCURRENCY)
 def exportar_reporte_pdf(
     place_id: int = Path(..., ge=1, description="ID del casino"),
     period_start: str = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
@@ -523,7 +936,7 @@ def exportar_reporte_pdf(
     """
     try:
         # Generar el reporte
-        report = generar_reporte_consolidado_casino(
+        report = _reporte_compartido(generar_reporte_consolidado_casino,
             place_id=place_id,
             period_start=period_start,
             period_end=period_end,
@@ -576,6 +989,7 @@ def exportar_reporte_pdf(
     summary="Exportar reporte a Excel",
     description="Genera y descarga el reporte consolidado en formato Excel"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_EXPORT_MAX_CONCURRENCY)
 def exportar_reporte_excel(
     place_id: int = Path(..., ge=1, description="ID del casino"),
     period_start: str = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
@@ -595,7 +1009,7 @@ def exportar_reporte_excel(
     """
     try:
         # Generar el reporte
-        report = generar_reporte_consolidado_casino(
+        report = _reporte_compartido(generar_reporte_consolidado_casino,
             place_id=place_id,
             period_start=period_start,
             period_end=period_end,
@@ -650,13 +1064,16 @@ def exportar_reporte_excel(
     summary="Generar reporte con filtros avanzados",
     description="Genera reportes personalizados con filtros por marca, modelo y tipo de reporte"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_ROUTE_MAX_CONCURRENCY)
 def generar_reporte_filtros(
+    response: Response,
     period_start: str = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
     period_end: str = Query(..., description="Fecha final (YYYY-MM-DD)"),
     casino_id: Optional[int] = Query(None, ge=1, description="ID del casino (opcional)"),
     marca: Optional[str] = Query(None, description="Marca de máquina (ej: IGT, Aristocrat)"),
     modelo: Optional[str] = Query(None, description="Modelo de máquina (ej: Sphinx, Buffalo)"),
-    tipo_reporte: str = Query("detallado", description="Tipo: 'detallado', 'consolidado', 'resumen'")
+    tipo_reporte: str = Query("detallado", description="Tipo: 'detallado', 'consolidado', 'resumen'"),
+    _etag=Depends(etag_de_tablas(*TABLAS_REPORTES))
 ):
     """
     Genera reportes personalizados con filtros avanzados.
@@ -672,7 +1089,7 @@ def generar_reporte_filtros(
     - **resumen**: Solo estadísticas generales
     """
     try:
-        report = generar_reporte_con_filtros(
+        report = _reporte_compartido(generar_reporte_con_filtros,
             period_start=period_start,
             period_end=period_end,
             counters_repo=repo_counters,
@@ -686,7 +1103,7 @@ def generar_reporte_filtros(
             tipo_reporte=tipo_reporte
         )
         
-        return report
+        return respuesta_json(report, response=response)
         
     except NotFoundError as e:
         raise HTTPException(
@@ -711,6 +1128,7 @@ def generar_reporte_filtros(
     summary="Exportar reporte filtrado a PDF",
     description="Genera y descarga un reporte con filtros en formato PDF"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_EXPORT_MAX_CONCURRENCY)
 def exportar_reporte_filtros_pdf(
     period_start: str = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
     period_end: str = Query(..., description="Fecha final (YYYY-MM-DD)"),
@@ -731,7 +1149,7 @@ def exportar_reporte_filtros_pdf(
     """
     try:
         # Generar el reporte
-        report = generar_reporte_con_filtros(
+        report = _reporte_compartido(generar_reporte_con_filtros,
             period_start=period_start,
             period_end=period_end,
             counters_repo=repo_counters,
@@ -793,6 +1211,7 @@ def exportar_reporte_filtros_pdf(
     summary="Exportar reporte filtrado a Excel",
     description="Genera y descarga un reporte con filtros en formato Excel"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_EXPORT_MAX_CONCURRENCY)
 def exportar_reporte_filtros_excel(
     period_start: str = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
     period_end: str = Query(..., description="Fecha final (YYYY-MM-DD)"),
@@ -812,7 +1231,7 @@ def exportar_reporte_filtros_excel(
     """
     try:
         # Generar el reporte
-        report = generar_reporte_con_filtros(
+        report = _reporte_compartido(generar_reporte_con_filtros,
             period_start=period_start,
             period_end=period_end,
             counters_repo=repo_counters,
@@ -879,6 +1298,7 @@ def exportar_reporte_filtros_excel(
     summary="Generar reporte por participación",
     description="Genera un reporte de participación para máquinas seleccionadas con un porcentaje específico"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_ROUTE_MAX_CONCURRENCY)
 def generar_reporte_participacion_endpoint(
     report_data: ParticipationReportIn
 ):
@@ -910,7 +1330,7 @@ def generar_reporte_participacion_endpoint(
     ```
     """
     try:
-        report = generar_reporte_participacion(
+        report = _reporte_compartido(generar_reporte_participacion,
             machine_ids=report_data.machine_ids,
             period_start=report_data.period_start,
             period_end=report_data.period_end,
@@ -947,6 +1367,7 @@ def generar_reporte_participacion_endpoint(
     summary="Exportar reporte de participación a PDF",
     description="Genera y descarga el reporte de participación en formato PDF"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_EXPORT_MAX_CONCURRENCY)
 def exportar_reporte_participacion_pdf(
     report_data: ParticipationReportIn
 ):
@@ -965,7 +1386,7 @@ def exportar_reporte_participacion_pdf(
     """
     try:
         # Generar el reporte
-        report = generar_reporte_participacion(
+        report = _reporte_compartido(generar_reporte_participacion,
             machine_ids=report_data.machine_ids,
             period_start=report_data.period_start,
             period_end=report_data.period_end,
@@ -1020,6 +1441,7 @@ def exportar_reporte_participacion_pdf(
     summary="Exportar reporte de participación a Excel",
     description="Genera y descarga el reporte de participación en formato Excel"
 )
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_EXPORT_MAX_CONCURRENCY)
 def exportar_reporte_participacion_excel(
     report_data: ParticipationReportIn
 ):
@@ -1038,7 +1460,7 @@ def exportar_reporte_participacion_excel(
     """
     try:
         # Generar el reporte
-        report = generar_reporte_participacion(
+        report = _reporte_compartido(generar_reporte_participacion,
             machine_ids=report_data.machine_ids,
             period_start=report_data.period_start,
             period_end=report_data.period_end,
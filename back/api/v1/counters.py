@@ -1,12 +1,25 @@
 from datetime import datetime, date
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Path, status, Body
+from fastapi import APIRouter, HTTPException, Query, Path, status, Body, Response
+from pydantic import ValidationError
 
-from back.models.counters import CounterIn, CounterOut, CounterOutWithMachine, MachineSimple, CounterUpdateBatch
+from back.models.counters import (
+	CounterIn,
+	CounterOut,
+	CounterOutWithMachine,
+	MachineSimple,
+	MachineLatestReading,
+	CounterUpdateBatch,
+)
 
-from back.domain.counters.create import create_counter, NotFoundError
+from back.core import settings
+from back.domain.counters.create import create_counter, verificar_monotonia, NotFoundError
 from back.domain.counters.update import modificar_contadores_batch
-from back.domain.counters.read import consultar_contadores_reporte
+from back.domain.counters.read import (
+	consultar_contadores_reporte,
+	consultar_contadores_reporte_paginado,
+	exportar_contadores_stream,
+)
 
 from back.storage.counters_repo import CountersRepo
 from fastapi import Depends
@@ -20,10 +33,36 @@ repo_machines = MachinesRepo()
 repo_places = PlaceStorage()
 
 router = APIRouter()
-from back.api.deps import verificar_rol
+from back.core.executors import lookups_executor, reports_executor
+from back.api.responses import StreamingEnEjecutor, respuesta_json, validar_lista
+from back.models.parciales import modelo_parcial
+from back.api.deps import (
+	verificar_rol,
+	en_ejecutor,
+	reservar_ejecutor,
+	campos_param,
+	idempotency_key_header,
+	idempotency_scope,
+	idempotent_release,
+	idempotent_replay,
+	idempotent_save,
+)
+
+
+def _validar_casino_activo(casino_id: int) -> None:
+	"""404 si el casino no existe o no está activo."""
+	casino = repo_places.obtener_por_id(casino_id)
+	if casino is None:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Casino con id {casino_id} no encontrado")
+	
+	is_active_val = casino.get("estado")
+	is_active = str(is_active_val).lower() == "true" if is_active_val else False
+	if not is_active:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Casino {casino_id} no está activo")
 
 
 @router.get("/machines-by-casino/{casino_id}", response_model=list[MachineSimple], status_code=status.HTTP_200_OK)
+@en_ejecutor(lookups_executor)
 def get_machines_by_casino(
 	casino_id: int = Path(..., ge=1, description="ID del casino"),
 	user=Depends(verificar_rol(["admin", "operador", "soporte"]))
@@ -32,16 +71,7 @@ def get_machines_by_casino(
 	Obtener todas las máquinas de un casino específico (activas e inactivas).
 	Este endpoint se usa antes de crear un contador para seleccionar la máquina.
 	"""
-	# Validar que el casino existe
-	casino = repo_places.obtener_por_id(casino_id)
-	if casino is None:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Casino con id {casino_id} no encontrado")
-	
-	# Validar que el casino esté activo
-	is_active_val = casino.get("estado")
-	is_active = str(is_active_val).lower() == "true" if is_active_val else False
-	if not is_active:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Casino {casino_id} no está activo")
+	_validar_casino_activo(casino_id)
 	
 	# Obtener todas las máquinas del casino (activas e inactivas)
 	machines = repo_machines.listar(only_active=None, casino_id=casino_id)
@@ -49,21 +79,62 @@ def get_machines_by_casino(
 	if not machines:
 		return []
 	
-	# Convertir a MachineSimple
-	result = []
+	# Convertir a MachineSimple en una sola validación (las filas inválidas se omiten)
+	result = validar_lista(MachineSimple, machines, omitir_invalidos=True)
+	return respuesta_json(result, List[MachineSimple])
+
+@router.get(
+	"/machines-by-casino/{casino_id}/latest",
+	response_model=List[MachineLatestReading],
+	status_code=status.HTTP_200_OK,
+)
+@en_ejecutor(lookups_executor)
+def get_latest_by_casino(
+	casino_id: int = Path(..., ge=1, description="ID del casino"),
+	user=Depends(verificar_rol(["admin", "operador", "soporte"]))
+):
+	"""
+	Máquinas de un casino con su última lectura de contadores.
+
+	La última lectura sale del mapa que mantiene el repo de contadores, así
+	que el costo es proporcional al número de máquinas y no al de lecturas.
+	"""
+	_validar_casino_activo(casino_id)
+
+	machines = repo_machines.listar(only_active=None, casino_id=casino_id)
+	# Sin id numérico no hay máquina que listar (ni lectura que buscar)
+	ids, validas = [], []
 	for m in machines:
 		try:
-			result.append(MachineSimple(
-				id=int(m.get("id")),
-				marca=m.get("marca"),
-				modelo=m.get("modelo"),
-				serial=m.get("serial"),
-				asset=m.get("asset"),
-			))
-		except Exception:
+			ids.append(int(float(m.get("id"))))
+		except (TypeError, ValueError):
 			continue
-	
-	return result
+		validas.append(m)
+	latest = repo_counters.latest_by_machines(ids)
+
+	registros = [
+		{
+			"id": machine_id,
+			"marca": m.get("marca"),
+			"modelo": m.get("modelo"),
+			"serial": m.get("serial"),
+			"asset": m.get("asset"),
+			"is_active": str(m.get("is_active") or m.get("estado")).lower() == "true",
+			"latest": latest.get(machine_id) or None,
+		}
+		for machine_id, m in zip(ids, validas)
+	]
+	# Todo el listado se valida en una pasada; si la última lectura de una
+	# máquina no valida como CounterOut, la máquina se lista con latest=None.
+	try:
+		result = validar_lista(MachineLatestReading, registros)
+	except ValidationError as e:
+		malas = {err["loc"][0] for err in e.errors() if err["loc"][1:2] == ("latest",)}
+		for i in malas:
+			registros[i]["latest"] = None
+		result = validar_lista(MachineLatestReading, registros)
+	return respuesta_json(result, List[MachineLatestReading])
+
 
 def local_clock() -> datetime:
     """Reloj local que retorna datetime."""
@@ -75,6 +146,7 @@ def _clock_local() -> str:
 
 
 @router.get("/{counter_id}", response_model=CounterOut, status_code=status.HTTP_200_OK)
+@en_ejecutor(lookups_executor)
 def get_counter(counter_id: int = Path(..., ge=1)):
 	"""Obtener un contador por su id."""
 	row = repo_counters.get_by_id(counter_id)
@@ -84,11 +156,36 @@ def get_counter(counter_id: int = Path(..., ge=1)):
 
 
 @router.post("", response_model=CounterOutWithMachine, status_code=status.HTTP_201_CREATED)
-def post_counter(body: CounterIn, user=Depends(verificar_rol(["admin", "operador"]))):
+def post_counter(
+	body: CounterIn,
+	user=Depends(verificar_rol(["admin", "operador"])),
+	idempotency_key: Optional[str] = Depends(idempotency_key_header),
+):
 	"""
 	Crear un nuevo contador. Valida campos obligatorios y unicidad por casino-fecha-máquina.
 	El casino_id debe coincidir con el casino_id de la máquina seleccionada.
+
+	Si llega la cabecera `Idempotency-Key` y la petición ya se procesó, se
+	devuelve la respuesta guardada sin volver a leer ni escribir counters.csv;
+	si la primera todavía está en curso, el reintento recibe 409.
 	"""
+	payload = body.model_dump()
+	scope = idempotency_scope("POST /counters", user)
+	replay = idempotent_replay(scope, idempotency_key, payload)
+	if replay is not None:
+		return replay
+
+	try:
+		result = _crear_contador(body)
+	except BaseException:
+		idempotent_release(scope, idempotency_key)
+		raise
+	idempotent_save(scope, idempotency_key, payload, status.HTTP_201_CREATED, result)
+	return result
+
+
+def _crear_contador(body: CounterIn) -> CounterOutWithMachine:
+	"""Validaciones y alta del contador (post_counter sin la parte de Idempotency-Key)."""
 	# Validar que el casino existe
 	casino = repo_places.obtener_por_id(body.casino_id)
 	if casino is None:
@@ -138,26 +235,29 @@ def post_counter(body: CounterIn, user=Depends(verificar_rol(["admin", "operador
 	# Validar unicidad: no debe existir ya un registro para casino-fecha-hora-máquina exactos
 	# Permite múltiples contadores en el mismo día pero en diferentes horas
 	at_completo = body.at if body.at else _clock_local()
-	casino_id = body.casino_id
 	
-	# Buscar si existe un contador con la misma fecha-hora exacta
-	existentes = repo_counters.list_counters(
-		machine_id=body.machine_id,
-		date_from=at_completo,
-		date_to=at_completo,
-		limit=10
-	)
-	for ex in existentes:
-		# Coincidencia exacta de casino, fecha-hora completa y máquina
-		if str(ex.get("casino_id")) == str(casino_id) and str(ex.get("at", "")) == at_completo:
-			raise HTTPException(
-				status_code=status.HTTP_409_CONFLICT, 
-				detail=f"Ya existe un registro para esta máquina en la fecha-hora {at_completo}. Use una hora diferente."
-			)
+	# Buscar si existe un contador con la misma fecha-hora exacta (índice O(1) del repo).
+	# La máquina ya se validó contra el casino, así que (machine_id, at) basta.
+	if repo_counters.has_reading(body.machine_id, at_completo):
+		raise HTTPException(
+			status_code=status.HTTP_409_CONFLICT, 
+			detail=f"Ya existe un registro para esta máquina en la fecha-hora {at_completo}. Use una hora diferente."
+		)
+
+	# Monotonía: los medidores son acumulados y no deberían bajar respecto a
+	# la última lectura de la máquina (consulta O(1) al mapa del repo).
+	avisos = []
+	if settings.COUNTERS_MONOTONIC_MODE != "off":
+		avisos = verificar_monotonia(
+			{**body.model_dump(), "at": at_completo},
+			repo_counters.latest_reading(body.machine_id),
+		)
+		if avisos and settings.COUNTERS_MONOTONIC_MODE == "reject":
+			raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="; ".join(avisos))
 
 	try:
 		created = create_counter(
-			data=body.model_dump(),
+			data={**body.model_dump(), "at": at_completo},
 			clock=_clock_local,
 			counters_repo=repo_counters,
 			machines_repo=repo_machines,
@@ -177,7 +277,8 @@ def post_counter(body: CounterIn, user=Depends(verificar_rol(["admin", "operador
 				)
 			except Exception:
 				machine_simple = None
-		return CounterOutWithMachine(**{**created, "machine": machine_simple})
+		result = CounterOutWithMachine(**{**created, "machine": machine_simple, "warnings": avisos})
+		return result
 	except NotFoundError as e:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 	except ValueError as e:
@@ -210,23 +311,88 @@ def modificar_contadores(
 
 
 @router.get("/reportes/consulta", response_model=List[CounterOut])
+@en_ejecutor(reports_executor, max_concurrent=settings.REPORTS_ROUTE_MAX_CONCURRENCY)
 def consultar_reportes(
+    response: Response,
     casino_id: int = Query(..., description="ID del Casino"),
     start_date: date = Query(..., description="Fecha Inicio (YYYY-MM-DD)"),
-    end_date: date = Query(..., description="Fecha Fin (YYYY-MM-DD)")
+    end_date: date = Query(..., description="Fecha Fin (YYYY-MM-DD)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Tamaño de página (activa paginación por cursor)"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor"),
+    fields: Optional[List[str]] = Depends(campos_param(*CounterOut.model_fields))
 ):
     """
     Endpoint para integración con el Módulo de Reportes.
     Filtra registros por rango de fechas y casino.
+
+    Sin `limit` ni `cursor` devuelve todo el rango (comportamiento original).
+    Con `limit` (y luego `cursor`) devuelve páginas ordenadas por (at, id);
+    la cabecera `X-Next-Cursor` trae el cursor de la siguiente página.
+    Con `fields` (p. ej. at,in_amount) cada registro trae solo esos campos.
     """
     try:
-        return consultar_contadores_reporte(
-            casino_id=casino_id,
-            start_date=start_date,
-            end_date=end_date,
-            counters_repo=repo_counters
-        )
+        if limit is not None or cursor is not None:
+            items, next_cursor = consultar_contadores_reporte_paginado(
+                casino_id=casino_id,
+                start_date=start_date,
+                end_date=end_date,
+                counters_repo=repo_counters,
+                limit=limit or 100,
+                cursor=cursor,
+                fields=fields
+            )
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+        else:
+            items = consultar_contadores_reporte(
+                casino_id=casino_id,
+                start_date=start_date,
+                end_date=end_date,
+                counters_repo=repo_counters,
+                fields=fields
+            )
+        # Listados grandes: se serializan directo a bytes, sin revalidar
+        return respuesta_json(items, List[modelo_parcial(CounterOut, fields)], response)
     except HTTPException:
         raise
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Error interno: {exc}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error interno: {exc}")
+
+
+@router.get("/reportes/exportar")
+async def exportar_reportes(
+    casino_id: int = Query(..., description="ID del Casino"),
+    start_date: date = Query(..., description="Fecha Inicio (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="Fecha Fin (YYYY-MM-DD)"),
+    formato: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson o csv"),
+    fields: Optional[List[str]] = Depends(campos_param(*CounterOut.model_fields))
+):
+    """
+    Exportación masiva (auditoría) de contadores crudos.
+
+    Mismo filtro que `/reportes/consulta`, pero la respuesta se envía en
+    streaming (NDJSON: un objeto por línea, o CSV) leyendo el archivo por
+    bloques, así la memoria no crece con el tamaño del histórico.
+
+    Los bloques se leen en reports_executor y el lugar de la ruta se retiene
+    hasta terminar la descarga (no solo mientras se arma la respuesta).
+    """
+    # Solo valida y arma el generador: la lectura empieza al iterarlo
+    stream = exportar_contadores_stream(
+        casino_id=casino_id,
+        start_date=start_date,
+        end_date=end_date,
+        counters_repo=repo_counters,
+        formato=formato,
+        fields=fields
+    )
+    ext = "csv" if formato == "csv" else "ndjson"
+    media_type = "text/csv" if formato == "csv" else "application/x-ndjson"
+    filename = f"contadores_casino_{casino_id}_{start_date}_{end_date}.{ext}"
+    reserva = reservar_ejecutor(reports_executor, "exportar_reportes", settings.REPORTS_EXPORT_MAX_CONCURRENCY)
+    return StreamingEnEjecutor(
+        reserva,
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
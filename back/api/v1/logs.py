@@ -0,0 +1,62 @@
+# -------------------------------------------
+# back/api/v1/logs.py
+# Propósito:
+#   Consulta de la bitácora de auditoría (activaciones, inactivaciones,
+#   intentos fallidos) sin leer todo el historial.
+#
+# Endpoints:
+#   1) GET /
+#      - Query: machine_id, serial, actor, action, date_from, date_to,
+#        limit, cursor.
+#      - Orden: de la entrada más reciente a la más antigua.
+#      - Paginación por cursor: la cabecera `X-Next-Cursor` trae el valor
+#        para pedir la siguiente página.
+#      - Salida (200): lista AuditLogOut.
+# -------------------------------------------
+
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from back.api.deps import verificar_rol
+from back.models.logs import AuditLogOut
+from back.storage.audit_log import audit_log
+
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[AuditLogOut])
+def listar_logs(
+    response: Response,
+    machine_id: Optional[int] = Query(None, ge=1, description="Filtrar por ID de máquina"),
+    serial: Optional[str] = Query(None, description="Filtrar por serial"),
+    actor: Optional[str] = Query(None, description="Filtrar por usuario que realizó la acción"),
+    action: Optional[str] = Query(None, description="Filtrar por tipo de acción"),
+    date_from: Optional[date] = Query(None, description="Fecha inicial (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, description="Fecha final (YYYY-MM-DD)"),
+    limit: int = Query(50, ge=1, le=500, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor"),
+    user=Depends(verificar_rol(["admin", "soporte"]))
+):
+    """
+    Lista la bitácora de auditoría con filtros opcionales.
+    Solo se leen los segmentos que, según el índice, pueden contener el filtro.
+    """
+    try:
+        entries, next_cursor = audit_log.query(
+            machine_id=machine_id,
+            serial=serial,
+            actor=actor,
+            action=action,
+            date_from=date_from.strftime("%Y-%m-%d") if date_from else None,
+            date_to=date_to.strftime("%Y-%m-%d") if date_to else None,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
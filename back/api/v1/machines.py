@@ -72,28 +72,101 @@
 # -------------------------------------------
 # back/api/v1/machines.py
 # back/api/v1/machines.py
-from fastapi import APIRouter, HTTPException, Query, Depends
+import json
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 from back.models.machines import MachineIn, MachineOut, MachineUpdate
+from back.models.parciales import modelo_parcial
 from back.storage.machines_repo import MachinesRepo
 from back.storage.places_repo import PlaceStorage
 from back.domain.machines.inativation import inactivar_maquina_por_serial
 from back.domain.machines.activation import activar_maquina_por_serial
+from back.domain.machines.bulk_status import cambiar_estado_masivo
+from back.domain.machines.bulk_create import (
+    registrar_maquinas_masivo,
+    leer_lote_maquinas,
+    CargaMasivaError,
+)
 from back.domain.machines.update import actualizar_maquina, ActualizacionMaquinaError
 
 repo = MachinesRepo()
 repo_places = PlaceStorage()
-from back.api.deps import verificar_rol
+from back.api.deps import campos_param, en_ejecutor, etag_de_tablas, verificar_rol
+from back.api.responses import respuesta_json, validar_lista
+from back.core.executors import lookups_executor
 router = APIRouter()
 
 
+def _fila_salida(m: dict) -> dict:
+    """
+    Fila del CSV -> campos de MachineOut. Solo se corrigen los valores que
+    pydantic no interpretaría igual (denominación vacía/inválida = 0.0 y
+    estado distinto de "true" = False); el resto lo convierte la validación.
+    Con una fila proyectada (?fields=) solo se tocan las columnas presentes.
+    """
+    m = dict(m)
+    if "denominacion" in m:
+        try:
+            m["denominacion"] = float(m["denominacion"]) if m.get("denominacion") else 0.0
+        except (ValueError, TypeError):
+            m["denominacion"] = 0.0
+    if "estado" in m:
+        m["estado"] = str(m["estado"]).lower() == "true"
+    return m
+
+
 class SerialAction(BaseModel):
     serial: str
     actor: Optional[str] = "system"
     motivo: Optional[str] = None
 
+
+class BulkSerialAction(BaseModel):
+    """Lote de máquinas: lista de seriales O todas las de un casino."""
+    serials: Optional[List[str]] = None
+    casino_id: Optional[int] = None
+    actor: Optional[str] = "system"
+    motivo: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _uno_solo(self):
+        if (self.serials is None) == (self.casino_id is None):
+            raise ValueError("Debe indicar 'serials' o 'casino_id' (solo uno)")
+        if self.serials is not None and not self.serials:
+            raise ValueError("La lista de seriales no puede estar vacía")
+        return self
+
+
+class BulkSerialResult(BaseModel):
+    serial: str
+    machine_id: Optional[int] = None
+    status: str
+    is_active: Optional[bool] = None
+
+
+class BulkStatusOut(BaseModel):
+    action: str
+    batch_token: str
+    changed: int
+    results: List[BulkSerialResult]
+
+
+class BulkCreateRow(BaseModel):
+    row: int
+    serial: str
+    status: str
+    id: Optional[int] = None
+    detail: str = ""
+
+
+class BulkCreateOut(BaseModel):
+    created: int
+    rejected: int
+    results: List[BulkCreateRow]
+
 @router.post("/", response_model=MachineOut, status_code=201)
 def registrar_maquina(machine: MachineIn, actor: str = "system", user=Depends(verificar_rol(["admin", "soporte"]))):
     # Validar unicidad de serial
@@ -153,59 +226,69 @@ def registrar_maquina(machine: MachineIn, actor: str = "system", user=Depends(ve
     )
 
 
+@router.post("/bulk", response_model=BulkCreateOut)
+async def registrar_maquinas_bulk(request: Request, actor: str = "system", user=Depends(verificar_rol(["admin", "soporte"]))):
+    """
+    Alta masiva de máquinas (apertura de un casino).
+
+    El cuerpo puede ser:
+    - JSON: lista de objetos MachineIn (Content-Type: application/json).
+    - CSV o XLSX: el archivo tal cual en el cuerpo (Content-Type: text/csv o
+      application/vnd.openxmlformats-officedocument.spreadsheetml.sheet), con
+      columnas marca, modelo, serial, asset, place_id, denominacion, is_active.
+
+    Se valida unicidad de serial/asset contra lo existente y dentro del lote,
+    y se guarda todo con una sola escritura. Devuelve el resultado por fila.
+    """
+    content_type = request.headers.get("content-type", "application/json")
+    body = await request.body()
+    try:
+        if content_type.split(";")[0].strip().lower() == "application/json":
+            rows = json.loads(body or b"[]")
+            if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+                raise CargaMasivaError("El cuerpo JSON debe ser una lista de máquinas")
+        else:
+            rows = await run_in_threadpool(leer_lote_maquinas, body, content_type)
+    except (CargaMasivaError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="El lote no contiene máquinas")
+
+    # El trabajo con CSV es bloqueante: fuera del event loop
+    return await run_in_threadpool(
+        registrar_maquinas_masivo, rows, machines_repo=repo, places_repo=repo_places, actor=actor
+    )
+
+
 @router.get("/", response_model=List[MachineOut])
+@en_ejecutor(lookups_executor)
 def listar_maquinas(
+    response: Response,
     only_active: Optional[bool] = Query(None),
-    casino_id: Optional[int] = Query(None, description="ID del casino para filtrar máquinas")
+    casino_id: Optional[int] = Query(None, description="ID del casino para filtrar máquinas"),
+    fields: Optional[List[str]] = Depends(campos_param(*MachineOut.model_fields)),
+    _etag=Depends(etag_de_tablas("machines"))
 ):
     """
     Lista máquinas, permitiendo filtrar por casino y estado.
+    Con `fields` (p. ej. id,serial,casino_id) cada máquina trae solo esos campos.
     """
-    data = repo.listar(only_active=only_active)
-    if casino_id is not None:
-        data = [m for m in data if str(m.get("casino_id")) == str(casino_id)]
+    data = repo.listar(only_active=only_active, casino_id=casino_id, fields=fields)
 
-    result = []
-    for m in data:
-        try:
-            denominacion_val = float(m["denominacion"]) if m.get("denominacion") else 0.0
-        except (ValueError, TypeError):
-            denominacion_val = 0.0
-        
-        result.append(MachineOut(
-            id=int(m["id"]),
-            marca=m["marca"],
-            modelo=m["modelo"],
-            serial=m["serial"],
-            asset=m["asset"],
-            denominacion=denominacion_val,
-            estado=str(m.get("estado", "True")).lower() == "true",
-            casino_id=int(m["casino_id"])
-        ))
-    return result
+    # Un solo paso de validación para todo el listado; la respuesta ya no se revalida
+    modelo = modelo_parcial(MachineOut, fields)
+    result = validar_lista(modelo, [_fila_salida(m) for m in data])
+    return respuesta_json(result, List[modelo], response)
 
 
 @router.get("/{machine_id}", response_model=MachineOut)
-def obtener_maquina(machine_id: int):
+@en_ejecutor(lookups_executor)
+def obtener_maquina(machine_id: int, _etag=Depends(etag_de_tablas("machines"))):
     m = repo.get_by_id(machine_id)
     if not m:
         raise HTTPException(status_code=404, detail="Machine not found")
-
-    try:
-        denominacion_val = float(m["denominacion"]) if m.get("denominacion") else 0.0
-    except (ValueError, TypeError):
-        denominacion_val = 0.0
-
-    return MachineOut(
-        id=int(m["id"]),
-        marca=m["marca"],
-        modelo=m["modelo"],
-        serial=m["serial"],
-        asset=m["asset"],
-        denominacion=denominacion_val,
-        estado=str(m["estado"]).lower() == "true",
-        casino_id=int(m["casino_id"])
-    )
+    return MachineOut.model_validate(_fila_salida(m))
 
 
 @router.put("/{machine_id}", response_model=MachineOut)
@@ -240,21 +323,7 @@ def actualizar_maquina_endpoint(machine_id: int, cambios: MachineUpdate, actor:
         )
         
         # Convertir resultado al modelo de salida
-        try:
-            denominacion_val = float(maquina_actualizada["denominacion"]) if maquina_actualizada.get("denominacion") else 0.0
-        except (ValueError, TypeError):
-            denominacion_val = 0.0
-        
-        return MachineOut(
-            id=int(maquina_actualizada["id"]),
-            marca=maquina_actualizada["marca"],
-            modelo=maquina_actualizada["modelo"],
-            serial=maquina_actualizada["serial"],
-            asset=maquina_actualizada["asset"],
-            denominacion=denominacion_val,
-            estado=str(maquina_actualizada.get("estado", "True")).lower() == "true",
-            casino_id=int(maquina_actualizada["casino_id"])
-        )
+        return MachineOut.model_validate(_fila_salida(maquina_actualizada))
     
     except ActualizacionMaquinaError as e:
         # Distinguir entre máquina no encontrada y otros errores
@@ -284,3 +353,28 @@ def activate_machine(payload: SerialAction, user=Depends(verificar_rol(["admin",
         return result
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
+
+
+def _cambio_masivo(payload: BulkSerialAction, activar: bool):
+    try:
+        return cambiar_estado_masivo(
+            activar,
+            serials=payload.serials,
+            casino_id=payload.casino_id,
+            actor=payload.actor or "system",
+            motivo=payload.motivo,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+
+
+@router.post("/inactivate/bulk", response_model=BulkStatusOut)
+def inactivate_machines_bulk(payload: BulkSerialAction, user=Depends(verificar_rol(["admin","soporte"]))):
+    """Inactiva varias máquinas (por seriales o por casino) en una sola pasada."""
+    return _cambio_masivo(payload, activar=False)
+
+
+@router.post("/activate/bulk", response_model=BulkStatusOut)
+def activate_machines_bulk(payload: BulkSerialAction, user=Depends(verificar_rol(["admin","soporte"]))):
+    """Activa varias máquinas (por seriales o por casino) en una sola pasada."""
+    return _cambio_masivo(payload, activar=True)
@@ -58,13 +58,15 @@
 #   - pydantic (modelos)
 # -------------------------------------------
 
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException
 from back.models.places import PlaceUpdate
 from back.domain.places.create import PlaceDomain
 from back.domain.places.management import CasinoManagement
-from back.storage.places_repo import PlaceStorage
+from back.storage.places_repo import PLACES_COLUMNS, PlaceStorage
 from back.models.places import PlaceIn, PlaceOut
-from back.api.deps import verificar_rol
+from back.api.deps import campos_param, en_ejecutor, etag_de_tablas, verificar_rol
+from back.core.executors import lookups_executor
 from fastapi import Depends
 
 router = APIRouter()
@@ -76,12 +78,26 @@ router = APIRouter()
 def inactivar_casino(
 	casino_id: int,
 	actor: str = "system",
+	cascada: bool = False,
 	user=Depends(verificar_rol(["admin","soporte"]))
 ):
     """
     Marca un casino como inactivo usando la capa de dominio.
+
+    Con `cascada=true` también inactiva todas sus máquinas (una escritura por
+    archivo y una entrada de auditoría); se puede revertir con
+    `PUT /casino/{casino_id}/activar?restaurar_maquinas=true`. Si el casino
+    ya está inactivo, la cascada responde 409.
     """
     try:
+        if cascada:
+            resultado = CasinoManagement.inactivar_casino_en_cascada(casino_id, actor=actor)
+            return {
+                "mensaje": "Casino y sus máquinas inactivados correctamente",
+                "id": casino_id,
+                "actor": actor,
+                **resultado
+            }
         PlaceDomain.inactivar_casino(casino_id, actor)
         return {
             "mensaje": "Casino inactivado correctamente",
@@ -90,6 +106,8 @@ def inactivar_casino(
         }
     except KeyError:
         raise HTTPException(status_code=404, detail="Casino no encontrado")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -101,12 +119,28 @@ def inactivar_casino(
 def activar_casino(
 	casino_id: int,
 	actor: str = "system",
+	restaurar_maquinas: bool = False,
+	batch_token: Optional[str] = None,
 	user=Depends(verificar_rol(["admin","soporte"]))
 ):
     """
     Marca un casino como activo usando la capa de storage
+
+    Con `restaurar_maquinas=true` revierte la inactivación en cascada: las
+    máquinas vuelven al estado que tenían antes (según la bitácora). Por
+    defecto la última; `batch_token` permite elegir una específica.
     """
     try:
+        if restaurar_maquinas:
+            resultado = CasinoManagement.revertir_inactivacion_en_cascada(
+                casino_id, actor=actor, batch_token=batch_token
+            )
+            return {
+                "mensaje": "Casino activado y máquinas restauradas correctamente",
+                "id": casino_id,
+                "actor": actor,
+                **resultado
+            }
         PlaceDomain.activar_casino(casino_id, actor)
         return {
             "mensaje": "Casino activado correctamente",
@@ -115,6 +149,8 @@ def activar_casino(
         }
     except KeyError:
         raise HTTPException(status_code=404, detail="Casino no encontrado")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -144,9 +180,16 @@ def crear_casino(
 # LISTAR CASINOS
 # --------------------------------------
 @router.get("/casino")
-def listar_casinos(only_active: bool = True, limit: int | None = None, offset: int = 0):
+@en_ejecutor(lookups_executor)
+def listar_casinos(
+    only_active: bool = True,
+    limit: int | None = None,
+    offset: int = 0,
+    fields: Optional[List[str]] = Depends(campos_param(*PLACES_COLUMNS)),
+    _etag=Depends(etag_de_tablas("places")),
+):
     try:
-        places = PlaceStorage.listar(only_active=only_active, limit=limit, offset=offset)
+        places = PlaceStorage.listar(only_active=only_active, limit=limit, offset=offset, fields=fields)
         return places
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -179,7 +222,8 @@ def modificar_casino(
 # LISTAR MÁQUINAS DE UN CASINO
 # --------------------------------------
 @router.get("/casino/{casino_id}/maquinas")
-def listar_maquinas_casino(casino_id: int, only_active: bool = True):
+@en_ejecutor(lookups_executor)
+def listar_maquinas_casino(casino_id: int, only_active: bool = True, _etag=Depends(etag_de_tablas("places", "machines"))):
     try:
         machines = CasinoManagement.listar_maquinas(casino_id, only_active=only_active)
         return machines
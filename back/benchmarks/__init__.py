@@ -0,0 +1,6 @@
+# -------------------------------------------
+# back/benchmarks/__init__.py
+# Propósito:
+#   - Scripts de medición (no son pruebas; se corren a mano):
+#       python -m back.benchmarks.<script>
+# -------------------------------------------
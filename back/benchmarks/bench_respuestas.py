@@ -0,0 +1,95 @@
+# -------------------------------------------
+# back/benchmarks/bench_respuestas.py
+# Propósito:
+#   - Comparar el camino de serialización de reportes grandes antes y después
+#     de back/api/responses.py: tiempo de serialización y bytes en el cable.
+#
+# Uso:
+#   python -m back.benchmarks.bench_respuestas [máquinas] [repeticiones]
+#
+# Caminos medidos (mismo reporte sintético de casino):
+#   - antes: Model(**report) en el endpoint + lo que hace FastAPI con
+#     response_model (revalidar, serializar a dicts) + JSONResponse (json.dumps).
+#   - después: respuesta_json(report, Model) (una validación + dump_json).
+#   - bytes: cuerpo sin comprimir y con gzip (nivel de settings).
+# -------------------------------------------
+
+import asyncio
+import gzip
+import json
+import sys
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from back.api.responses import respuesta_json
+from back.core import settings
+from back.models.balances import CasinoDetailedReport
+
+
+def reporte_sintetico(maquinas: int) -> dict:
+    summary = []
+    for i in range(1, maquinas + 1):
+        inicial = {"at": "2025-11-01 08:00:00", "in_amount": 1000.0 * i, "out_amount": 800.0 * i,
+                   "jackpot_amount": 50.0 * i, "billetero_amount": 300.0 * i}
+        final = {"at": "2025-11-30 22:00:00", "in_amount": 1500.0 * i, "out_amount": 1100.0 * i,
+                 "jackpot_amount": 70.0 * i, "billetero_amount": 420.0 * i}
+        summary.append({
+            "machine_id": i, "machine_marca": "IGT", "machine_modelo": "S2000",
+            "machine_serial": f"SER-{i:06d}", "machine_asset": f"AS-{i:06d}", "denominacion": 0.01,
+            "contador_inicial": inicial, "contador_final": final,
+            "in_total": 5.0 * i, "out_total": 3.0 * i, "jackpot_total": 0.2 * i,
+            "billetero_total": 1.2 * i, "utilidad": 1.8 * i, "has_data": True, "error": None,
+        })
+    return {
+        "casino_id": 1, "casino_nombre": "CASINO", "period_start": "2025-11-01", "period_end": "2025-11-30",
+        "machines_summary": summary,
+        "category_totals": {"in_total": 1.0, "out_total": 1.0, "jackpot_total": 1.0,
+                            "billetero_total": 1.0, "utilidad_final": 1.0},
+        "total_machines": maquinas, "machines_processed": maquinas, "machines_with_data": maquinas,
+        "machines_without_data": 0, "generated_at": "2025-12-01 08:00:00", "generated_by": "bench",
+    }
+
+
+def camino_antes(report: dict, field) -> bytes:
+    model = CasinoDetailedReport(**report)
+    content = asyncio.run(serialize_response(field=field, response_content=model))
+    return JSONResponse(content).body
+
+
+def camino_despues(report: dict) -> bytes:
+    return respuesta_json(report, CasinoDetailedReport).body
+
+
+def medir(fn, repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor * 1000
+
+
+def main(maquinas: int = 5000, repeticiones: int = 5) -> None:
+    report = reporte_sintetico(maquinas)
+    field = create_model_field(name="Response_bench", type_=CasinoDetailedReport, mode="serialization")
+
+    antes = camino_antes(report, field)
+    despues = camino_despues(report)
+    assert json.loads(antes) == json.loads(despues), "Los dos caminos deben producir el mismo JSON"
+
+    t_antes = medir(lambda: camino_antes(report, field), repeticiones)
+    t_despues = medir(lambda: camino_despues(report), repeticiones)
+    gz = len(gzip.compress(despues, compresslevel=settings.RESPONSE_GZIP_LEVEL))
+
+    print(f"Reporte sintético: {maquinas} máquinas (mejor de {repeticiones})")
+    print(f"  antes   : {t_antes:8.1f} ms  {len(antes):>10,} bytes")
+    print(f"  después : {t_despues:8.1f} ms  {len(despues):>10,} bytes  ({t_antes / t_despues:.1f}x)")
+    print(f"  gzip    :             {gz:>10,} bytes  ({len(antes) / gz:.1f}x menos en el cable)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,223 @@
+# -------------------------------------------
+# back/core/executors.py
+# Propósito:
+#   - Ejecutores acotados para sacar trabajo bloqueante (CPU o disco) del
+#     event loop de los endpoints async.
+#
+# Diseño:
+#   - BoundedExecutor = ThreadPoolExecutor con max_workers fijo (límite de
+#     concurrencia real) + tope de trabajos en vuelo (corriendo + en cola).
+#   - Si el tope se alcanza, run() lanza ExecutorSaturatedError en vez de
+#     encolar sin límite; la API lo traduce a 503 con Retry-After.
+#   - run_limited() agrega un tope por ruta (p. ej. exportar PDF) dentro del
+#     mismo pool, para que una sola ruta no acapare todos los hilos.
+#   - El lugar (in_flight) se toma con reservar() y se devuelve recién cuando
+#     termina el trabajo en el hilo: si la petición se cancela (cliente que
+#     corta), el hilo sigue ocupado y el lugar también, hasta que termine.
+#   - Reserva.iterar(): respuestas en streaming; cada next() del generador
+#     corre en el pool y el lugar se mantiene hasta el último bloque.
+#   - Métricas: submitted, completed, rejected, in_flight, running, queued
+#     (= in_flight - running, profundidad de cola) y max_in_flight, en total
+#     y por ruta.
+#
+# Instancias:
+#   - login_executor: verificación/re-hash bcrypt del login.
+#   - reports_executor: reportes, exportaciones y cuadres (CSV pesados).
+#   - lookups_executor: consultas livianas (máquinas, casinos, contadores),
+#     para que no esperen detrás de los reportes.
+# -------------------------------------------
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from back.core import settings
+
+
+class ExecutorSaturatedError(Exception):
+    """El ejecutor ya tiene el máximo de trabajos en vuelo."""
+
+
+class BoundedExecutor:
+    """Pool de hilos con concurrencia y cola acotadas."""
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._total = self._new_counters()
+        self._routes: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _new_counters() -> Dict[str, int]:
+        return {"submitted": 0, "completed": 0, "rejected": 0, "in_flight": 0, "running": 0, "max_in_flight": 0}
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Ejecuta fn(*args, **kwargs) en el pool y espera su resultado sin
+        bloquear el event loop. Las excepciones de fn se propagan tal cual.
+
+        Raises:
+            ExecutorSaturatedError: si ya hay max_pending trabajos en vuelo
+        """
+        return await self.run_limited(None, None, fn, *args, **kwargs)
+
+    async def run_limited(
+        self,
+        route: Optional[str],
+        route_limit: Optional[int],
+        fn: Callable[..., Any],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """
+        Igual que run(), con un tope adicional de trabajos en vuelo para `route`.
+
+        Raises:
+            ExecutorSaturatedError: pool o ruta al máximo
+        """
+        reserva = self.reservar(route, route_limit)
+        try:
+            return await reserva.run(fn, *args, **kwargs)
+        finally:
+            reserva.liberar()
+
+    def reservar(self, route: Optional[str] = None, route_limit: Optional[int] = None) -> "Reserva":
+        """
+        Toma un lugar en el pool (y en `route`) sin ejecutar nada todavía.
+        Quien reserva debe llamar a Reserva.liberar() (o agotar Reserva.iterar()).
+
+        Raises:
+            ExecutorSaturatedError: pool o ruta al máximo
+        """
+        with self._lock:
+            grupos = [self._total]
+            if route is not None:
+                grupos.append(self._routes.setdefault(route, self._new_counters()))
+            saturado = self._total["in_flight"] >= self.max_pending
+            if route is not None and route_limit is not None:
+                saturado = saturado or grupos[1]["in_flight"] >= route_limit
+            if saturado:
+                for g in grupos:
+                    g["rejected"] += 1
+                destino = f"'{self.name}'" + (f" (ruta {route})" if route else "")
+                raise ExecutorSaturatedError(f"Ejecutor {destino} saturado")
+            for g in grupos:
+                g["in_flight"] += 1
+                g["submitted"] += 1
+                g["max_in_flight"] = max(g["max_in_flight"], g["in_flight"])
+        return Reserva(self, grupos)
+
+    def _submit(self, grupos: List[Dict[str, int]], fn: Callable[..., Any], *args, **kwargs) -> Future:
+        def _job():
+            with self._lock:
+                for g in grupos:
+                    g["running"] += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    for g in grupos:
+                        g["running"] -= 1
+
+        return self._pool.submit(_job)
+
+    def _liberar(self, grupos: List[Dict[str, int]]) -> None:
+        with self._lock:
+            for g in grupos:
+                g["in_flight"] -= 1
+                g["completed"] += 1
+
+    @staticmethod
+    def _snapshot(counters: Dict[str, int]) -> Dict[str, int]:
+        return {**counters, "queued": max(counters["in_flight"] - counters["running"], 0)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                **self._snapshot(self._total),
+                "routes": {r: self._snapshot(c) for r, c in sorted(self._routes.items())},
+            }
+
+
+class Reserva:
+    """Lugar tomado en un BoundedExecutor; se devuelve una sola vez con liberar()."""
+
+    def __init__(self, executor: BoundedExecutor, grupos: List[Dict[str, int]]):
+        self._executor = executor
+        self._grupos = grupos
+        self._pendiente: Optional[Future] = None
+        self._liberada = False
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Ejecuta fn en el pool con este lugar (sin soltarlo)."""
+        self._pendiente = self._executor._submit(self._grupos, fn, *args, **kwargs)
+        return await asyncio.wrap_future(self._pendiente)
+
+    async def iterar(self, iterator: Iterator[Any]) -> AsyncIterator[Any]:
+        """
+        Recorre un iterador síncrono en el pool (cada next() en un hilo del
+        ejecutor) y libera el lugar al terminar, con error o si se corta.
+        """
+        fin = object()
+        try:
+            while True:
+                bloque = await self.run(next, iterator, fin)
+                if bloque is fin:
+                    break
+                yield bloque
+        finally:
+            self.liberar(al_terminar=getattr(iterator, "close", None))
+
+    def liberar(self, al_terminar: Optional[Callable[[], Any]] = None) -> None:
+        """
+        Devuelve el lugar. Si el último trabajo sigue corriendo (la espera se
+        canceló), se devuelve cuando ese trabajo termina. al_terminar corre
+        justo antes (p. ej. cerrar el generador, que no puede cerrarse mientras
+        un hilo lo está recorriendo).
+        """
+        if self._liberada:
+            return
+        self._liberada = True
+
+        def _liberar(_=None):
+            try:
+                if al_terminar is not None:
+                    al_terminar()
+            finally:
+                self._executor._liberar(self._grupos)
+
+        pendiente = self._pendiente
+        if pendiente is not None and not pendiente.done():
+            pendiente.add_done_callback(_liberar)
+        else:
+            _liberar()
+
+
+# bcrypt es intencionalmente caro (~100-300 ms): pocos hilos para no
+# acaparar la CPU y una cola corta para responder 503 antes que colgarse.
+login_executor = BoundedExecutor(
+    "login",
+    max_workers=settings.LOGIN_HASH_WORKERS,
+    max_pending=settings.LOGIN_HASH_MAX_PENDING,
+)
+
+# Reportes/exportaciones: leen y agregan CSV completos; pool propio y acotado
+# para que no agoten el threadpool por defecto de FastAPI.
+reports_executor = BoundedExecutor(
+    "reports",
+    max_workers=settings.REPORTS_WORKERS,
+    max_pending=settings.REPORTS_MAX_PENDING,
+)
+
+# Consultas livianas con capacidad reservada
+lookups_executor = BoundedExecutor(
+    "lookups",
+    max_workers=settings.LOOKUPS_WORKERS,
+    max_pending=settings.LOOKUPS_MAX_PENDING,
+)
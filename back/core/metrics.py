@@ -0,0 +1,254 @@
+# -------------------------------------------
+# back/core/metrics.py
+# Propósito:
+#   - Métricas en proceso (sin colector externo) expuestas en GET /metrics
+#     con el formato de texto de Prometheus (text/plain; version=0.0.4).
+#
+# Diseño:
+#   - Counter / Gauge / Histogram con etiquetas; cada uno con su lock (las
+#     actualizaciones llegan desde el event loop y desde los pools de hilos).
+#   - registry.render() arma el texto; los componentes que ya llevan sus
+#     propias estadísticas (token_cache, ejecutores, single-flight) se leen
+#     al momento de exportar mediante "recolectores", sin duplicar contadores.
+#   - HTTP (middleware en back/main.py): peticiones por ruta/método/estado,
+#     histograma de latencia y peticiones en vuelo. La ruta es la plantilla
+#     (/api/v1/machines/{machine_id}), nunca la URL concreta.
+#   - Storage (back/storage): lecturas/escrituras por tabla, bytes leídos,
+#     tiempo de lectura+parseo, aciertos/fallos de cachés y espera de locks.
+# -------------------------------------------
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from back.core import settings
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas(nombres: Sequence[str], valores: Sequence, extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    def _clave(self, labels: Dict[str, object]) -> Tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _lineas(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_etiquetas(self.labelnames, k)} {_numero(v)}" for k, v in sorted(self._values.items())]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.tipo}", *self._lineas()]
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._clave(labels), 0)
+
+
+class Counter(_Metrica):
+    """Valor que solo crece (peticiones, bytes, lecturas...)."""
+    tipo = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        clave = self._clave(labels)
+        with self._lock:
+            self._values[clave] = self._values.get(clave, 0) + amount
+
+
+class Gauge(_Metrica):
+    """Valor que sube y baja (peticiones en vuelo)."""
+    tipo = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        clave = self._clave(labels)
+        with self._lock:
+            self._values[clave] = self._values.get(clave, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metrica):
+    """Distribución por buckets acumulados + suma + conteo."""
+    tipo = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = ()):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple, List[float]] = {}  # clave -> [conteos por bucket..., suma]
+
+    def observe(self, value: float, **labels) -> None:
+        clave = self._clave(labels)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [0] * len(self.buckets) + [0.0]
+            for i, limite in enumerate(self.buckets):
+                if value <= limite:
+                    serie[i] += 1
+                    break
+            serie[-1] += value
+
+    def value(self, **labels) -> float:
+        """Cantidad de observaciones de la serie."""
+        with self._lock:
+            serie = self._series.get(self._clave(labels))
+            return sum(serie[:-1]) if serie else 0
+
+    def _lineas(self) -> List[str]:
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        lineas = []
+        for clave, serie in series:
+            acumulado = 0
+            for limite, n in zip(self.buckets, serie):
+                acumulado += n
+                le = f'le="{_numero(limite)}"'
+                lineas.append(f"{self.name}_bucket{_etiquetas(self.labelnames, clave, le)} {acumulado}")
+            base = _etiquetas(self.labelnames, clave)
+            lineas.append(f"{self.name}_sum{base} {repr(float(serie[-1]))}")
+            lineas.append(f"{self.name}_count{base} {acumulado}")
+        return lineas
+
+
+# (nombre, tipo, ayuda, [(etiquetas, valor), ...])
+Familia = Tuple[str, str, str, List[Tuple[Dict[str, object], float]]]
+
+
+class Registry:
+    """Métricas registradas + recolectores que se consultan al exportar."""
+
+    def __init__(self):
+        self._metricas: List[_Metrica] = []
+        self._recolectores: List[Callable[[], Iterable[Familia]]] = []
+
+    def register(self, metrica: _Metrica) -> _Metrica:
+        self._metricas.append(metrica)
+        return metrica
+
+    def add_collector(self, fn: Callable[[], Iterable[Familia]]) -> None:
+        self._recolectores.append(fn)
+
+    def render(self) -> str:
+        lineas: List[str] = []
+        for m in self._metricas:
+            lineas.extend(m.render())
+        for fn in self._recolectores:
+            for nombre, tipo, ayuda, muestras in fn():
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+                for etiquetas, valor in muestras:
+                    lineas.append(f"{nombre}{_etiquetas(list(etiquetas), list(etiquetas.values()))} {_numero(valor)}")
+        return "\n".join(lineas) + "\n"
+
+
+registry = Registry()
+
+# ---------------- HTTP ----------------
+http_requests = registry.register(Counter(
+    "http_requests_total", "Peticiones HTTP atendidas.", ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP (segundos).", ("method", "route"),
+    buckets=settings.METRICS_LATENCY_BUCKETS))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Peticiones HTTP en curso.", ("method", "route")))
+
+# ---------------- Storage ----------------
+storage_reads = registry.register(Counter(
+    "storage_reads_total", "Lecturas de archivos de datos por tabla.", ("table",)))
+storage_writes = registry.register(Counter(
+    "storage_writes_total", "Escrituras de archivos de datos por tabla.", ("table",)))
+storage_bytes_read = registry.register(Counter(
+    "storage_bytes_parsed_total", "Bytes de CSV leídos y parseados por tabla.", ("table",)))
+storage_bytes_written = registry.register(Counter(
+    "storage_bytes_written_total", "Bytes de CSV escritos por tabla.", ("table",)))
+storage_parse_seconds = registry.register(Histogram(
+    "storage_parse_seconds", "Tiempo de lectura y parseo de CSV por tabla (segundos).", ("table",),
+    buckets=settings.METRICS_STORAGE_BUCKETS))
+storage_cache = registry.register(Counter(
+    "storage_cache_requests_total", "Consultas a cachés en memoria del storage.", ("cache", "result")))
+storage_lock_wait = registry.register(Histogram(
+    "storage_lock_wait_seconds", "Espera para adquirir locks del storage (segundos).", ("lock",),
+    buckets=settings.METRICS_STORAGE_BUCKETS))
+
+
+def registrar_lectura(tabla: str, nbytes: int, segundos: float) -> None:
+    storage_reads.inc(table=tabla)
+    storage_bytes_read.inc(nbytes, table=tabla)
+    storage_parse_seconds.observe(segundos, table=tabla)
+
+
+def registrar_escritura(tabla: str, nbytes: int) -> None:
+    storage_writes.inc(table=tabla)
+    storage_bytes_written.inc(nbytes, table=tabla)
+
+
+def registrar_cache(cache: str, hit: bool) -> None:
+    storage_cache.inc(cache=cache, result="hit" if hit else "miss")
+
+
+@contextmanager
+def lock_medido(lock, nombre: str) -> Iterator[None]:
+    """`with lock_medido(_write_lock, "users"):` igual que `with _write_lock:`, midiendo la espera."""
+    inicio = time.perf_counter()
+    lock.acquire()
+    storage_lock_wait.observe(time.perf_counter() - inicio, lock=nombre)
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+# ---------------- Componentes con estadísticas propias ----------------
+def _componentes() -> Iterable[Familia]:
+    # Import diferido: estos módulos no deben depender de metrics al cargarse
+    from back.core.executors import lookups_executor, login_executor, reports_executor
+    from back.core.singleflight import report_flights
+    from back.core.token_cache import token_cache
+
+    tc = token_cache.stats()
+    yield ("jwt_cache_requests_total", "counter", "Consultas al caché de tokens JWT.",
+           [({"result": "hit"}, tc["hits"]), ({"result": "miss"}, tc["misses"])])
+    yield ("jwt_cache_evictions_total", "counter", "Tokens desalojados del caché (LRU).", [({}, tc["evictions"])])
+    yield ("jwt_cache_size", "gauge", "Tokens en el caché.", [({}, tc["size"])])
+
+    ejecutores = [login_executor.stats(), reports_executor.stats(), lookups_executor.stats()]
+    nombres = [login_executor.name, reports_executor.name, lookups_executor.name]
+    for campo, tipo, ayuda in (
+        ("submitted", "counter", "Trabajos enviados al ejecutor."),
+        ("rejected", "counter", "Trabajos rechazados por saturación (503)."),
+        ("running", "gauge", "Trabajos corriendo en el ejecutor."),
+        ("queued", "gauge", "Trabajos esperando un hilo libre."),
+    ):
+        nombre = f"executor_{campo}_total" if tipo == "counter" else f"executor_{campo}"
+        yield (nombre, tipo, ayuda, [({"executor": n}, st[campo]) for n, st in zip(nombres, ejecutores)])
+
+    sf = report_flights.stats()
+    yield ("singleflight_calls_total", "counter", "Llamadas a reportes con single-flight.", [({}, sf["calls"])])
+    yield ("singleflight_deduplicated_total", "counter", "Llamadas que compartieron un cálculo en vuelo.",
+           [({}, sf["deduplicated"])])
+
+
+registry.add_collector(_componentes)
@@ -22,6 +22,51 @@
 #   4) Enumeraciones/Constantes de dominio:
 #      - ROLES_PERMITIDOS = {'admin','operador','soporte'}  (para validaciones sencillas)
 #
+#   5) Idempotencia (cabecera Idempotency-Key en POST de contadores/cuadres):
+#      - IDEMPOTENCY_TTL_SECONDS: vigencia de una respuesta guardada.
+#      - IDEMPOTENCY_MAX_ENTRIES: tope de entradas en memoria/sidecar.
+#
+#   6) Bitácora de auditoría (data/audit/*.jsonl):
+#      - AUDIT_SEGMENT_MAX_BYTES: tamaño a partir del cual se rota el segmento.
+#      - AUDIT_SEGMENT_MAX_AGE_SECONDS: antigüedad máxima de un segmento abierto.
+#
+#   7) Contadores:
+#      - COUNTERS_MONOTONIC_MODE: qué hacer cuando una lectura nueva trae un
+#        medidor menor que la última lectura de la máquina:
+#        "warn" (se acepta y se avisa), "reject" (409) u "off" (sin revisar).
+#
+#   8) Escaneo de anomalías de contadores (data/counter_anomalies.csv):
+#      - ANOMALY_OUTLIER_FACTOR: un salto es atípico si supera este múltiplo
+#        de la mediana de saltos positivos de la máquina en ese medidor.
+#      - ANOMALY_MIN_SAMPLES: saltos positivos mínimos para estimar la mediana.
+#      - ANOMALY_SCAN_CHUNKSIZE: filas por bloque al leer counters.csv.
+#      - ANOMALY_SCAN_BUCKET_BYTES: tamaño aproximado de cada partición por
+#        máquina (acota la memoria del escaneo).
+#
+#   9) Autenticación:
+#      - JWT_CACHE_MAX_ENTRIES: tokens verificados que se guardan en memoria
+#        (LRU) para no repetir la verificación HS256 en cada petición.
+#      - LOGIN_HASH_WORKERS: hilos dedicados a bcrypt (verificación/re-hash).
+#      - LOGIN_HASH_MAX_PENDING: logins en vuelo (corriendo + en cola); por
+#        encima se responde 503 para proteger la CPU.
+#
+#   10) Ejecutores de la API (back/core/executors.py):
+#      - REPORTS_WORKERS / REPORTS_MAX_PENDING: hilos y trabajos en vuelo
+#        del pool de reportes/exportaciones.
+#      - REPORTS_ROUTE_MAX_CONCURRENCY: tope por ruta de reporte;
+#        REPORTS_EXPORT_MAX_CONCURRENCY para PDF/Excel (más caros).
+#      - LOOKUPS_WORKERS / LOOKUPS_MAX_PENDING: pool de consultas livianas.
+#
+#   11) Respuestas:
+#      - RESPONSE_GZIP_MIN_BYTES: tamaño mínimo para comprimir con gzip.
+#      - RESPONSE_GZIP_LEVEL: nivel de compresión (1-9; 6 equilibra CPU y tamaño).
+#
+#   12) Métricas (GET /metrics, back/core/metrics.py):
+#      - METRICS_ENABLED: middleware de métricas HTTP y endpoint /metrics.
+#      - METRICS_LATENCY_BUCKETS: límites (segundos) del histograma de latencia
+#        por ruta; METRICS_STORAGE_BUCKETS para lectura/parseo de CSV y
+#        espera de locks.
+#
 # Notas:
 #   - No incluir secretos ni credenciales.
 #   - Evitar leer variables de entorno para mantenerlo simple (académico).
@@ -52,3 +97,42 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 8  # 8 hours
 
 # Convenience
 ACCESS_TOKEN_EXPIRE = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+# Caché de tokens verificados (LRU)
+JWT_CACHE_MAX_ENTRIES = 10_000
+# Login: bcrypt en un pool acotado fuera del event loop
+LOGIN_HASH_WORKERS = 4
+LOGIN_HASH_MAX_PENDING = 64
+
+# Ejecutores de la API: reportes pesados vs consultas livianas
+REPORTS_WORKERS = 4
+REPORTS_MAX_PENDING = 32
+REPORTS_ROUTE_MAX_CONCURRENCY = 4
+REPORTS_EXPORT_MAX_CONCURRENCY = 2
+LOOKUPS_WORKERS = 8
+LOOKUPS_MAX_PENDING = 128
+
+# Compresión de respuestas
+RESPONSE_GZIP_MIN_BYTES = 1024
+RESPONSE_GZIP_LEVEL = 6
+
+# Métricas en proceso (formato Prometheus en /metrics)
+METRICS_ENABLED = True
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_STORAGE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Idempotency-Key (reintentos de POST)
+IDEMPOTENCY_TTL_SECONDS = 60 * 60 * 24  # 24 horas
+IDEMPOTENCY_MAX_ENTRIES = 5000
+
+# Bitácora de auditoría (rotación de segmentos)
+AUDIT_SEGMENT_MAX_BYTES = 5 * 1024 * 1024  # 5 MB
+AUDIT_SEGMENT_MAX_AGE_SECONDS = 60 * 60 * 24 * 30  # 30 días
+
+# Contadores: revisión de monotonía contra la última lectura ("warn" | "reject" | "off")
+COUNTERS_MONOTONIC_MODE = "warn"
+
+# Escaneo de anomalías de contadores
+ANOMALY_OUTLIER_FACTOR = 20.0
+ANOMALY_MIN_SAMPLES = 5
+ANOMALY_SCAN_CHUNKSIZE = 200_000
+ANOMALY_SCAN_BUCKET_BYTES = 64 * 1024 * 1024  # 64 MB
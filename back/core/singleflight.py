@@ -0,0 +1,104 @@
+# -------------------------------------------
+# back/core/singleflight.py
+# Propósito:
+#   - Coalescer peticiones idénticas concurrentes ("single-flight"): si un
+#     cálculo con la misma clave ya está en curso, los demás llamadores
+#     esperan ese mismo resultado en vez de repetirlo.
+#
+# Diseño:
+#   - Mapa clave -> concurrent.futures.Future del cálculo en vuelo. El Future
+#     es thread-safe y se puede esperar tanto desde hilos (do) como desde
+#     el event loop (do_async, vía asyncio.wrap_future).
+#   - La entrada se borra apenas termina el cálculo: NO es un caché; una
+#     petición posterior vuelve a calcular (con datos frescos).
+#   - Si el cálculo falla, todos los que esperaban reciben la misma excepción.
+#   - El resultado es compartido: los llamadores no deben modificarlo.
+#   - Métricas: calls, executions, deduplicated, in_flight.
+# -------------------------------------------
+
+import asyncio
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+def clave_peticion(ruta: str, params: Dict[str, Any], version: Hashable = None) -> Tuple[str, str, Hashable]:
+    """
+    Clave normalizada: ruta + parámetros (orden de claves estable, sin los
+    None) + versión de los datos.
+    """
+    normalizados = {k: v for k, v in params.items() if v is not None}
+    return (ruta, json.dumps(normalizados, sort_keys=True, default=str), version)
+
+
+class SingleFlight:
+    """Un cálculo en vuelo por clave; los duplicados comparten el resultado."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """Future de la clave y si este llamador es quien debe calcular."""
+        with self._lock:
+            self.calls += 1
+            future = self._flights.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self.executions += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Versión sync (hilos): calcula fn() o espera al cálculo en vuelo."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Versión async: await fn() o espera (sin bloquear el loop) al cálculo en vuelo."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "deduplicated": self.deduplicated,
+                "in_flight": len(self._flights),
+            }
+
+
+# Compartido por los endpoints de reportes y cuadres
+report_flights = SingleFlight()
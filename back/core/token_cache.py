@@ -0,0 +1,81 @@
+# -------------------------------------------
+# back/core/token_cache.py
+# Propósito:
+#   - Caché de tokens JWT ya verificados, para no repetir la verificación
+#     HS256 en cada petición del mismo usuario.
+#
+# Diseño:
+#   - OrderedDict acotado (LRU, máx. JWT_CACHE_MAX_ENTRIES).
+#   - Clave: sha256 del token (no se guarda el token en claro).
+#   - Valor: payload verificado. Se respeta el claim `exp`: una entrada
+#     vencida se descarta y el token se vuelve a verificar (y falla).
+#   - Solo se guardan tokens válidos; los inválidos siempre se verifican.
+#   - Métricas simples: hits, misses, evictions, size.
+# -------------------------------------------
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from back.core import settings
+
+
+class TokenCache:
+    """LRU acotado de payloads JWT verificados."""
+
+    def __init__(self, max_entries: Optional[int] = None, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries or settings.JWT_CACHE_MAX_ENTRIES
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Payload verificado del token, o None si no está (o ya venció)."""
+        key = self._key(token)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                exp = payload.get("exp")
+                if exp is None or float(exp) > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                # Vencido: fuera del caché
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+
+# Instancia compartida por el middleware y las dependencias de la API
+token_cache = TokenCache()
@@ -0,0 +1,252 @@
+# -------------------------------------------
+# back/domain/balances/comparison.py
+# Propósito:
+#   - Reporte comparativo periodo contra periodo ("este mes vs el anterior",
+#     "este mes vs el mismo mes del año pasado") por casino o por máquina.
+#
+# Cálculo (mismo criterio que calcular_cuadre_maquina en cada periodo):
+#   - CONTADOR INICIAL: primera lectura con at >= period_start.
+#   - CONTADOR FINAL: última lectura con at <= period_end 23:59:59.
+#   - TOTAL = (FINAL - INICIAL) × DENOMINACION; UTILIDAD = IN - (OUT + JACKPOT).
+#
+# Rendimiento:
+#   - Las lecturas de TODOS los periodos se cargan en una sola pasada.
+#   - Se ordenan por (máquina, at) y las lecturas frontera de cada pareja
+#     (máquina, periodo) se ubican con UNA búsqueda binaria vectorizada
+#     (np.searchsorted) sobre una clave compuesta.
+#
+# Salida:
+#   - El primer periodo es el "actual"; los demás se comparan contra él.
+#   - Deltas y variación porcentual por máquina y por categoría.
+#   - Incluye machines_summary/category_totals del periodo actual, así el
+#     módulo de exportación (PDF/Excel) lo puede renderizar.
+# -------------------------------------------
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from back.domain.balances.machine_balance import NotFoundError
+from back.domain.balances.timeseries import MEDIDORES, denominacion_efectiva, leer_lecturas
+
+
+# Medidor -> campo de total (mismo nombre que en los cuadres)
+TOTALES = {
+    "in_amount": "in_total",
+    "out_amount": "out_total",
+    "jackpot_amount": "jackpot_total",
+    "billetero_amount": "billetero_total",
+}
+CATEGORIAS = ["in_total", "out_total", "jackpot_total", "billetero_total", "utilidad"]
+
+# Comparaciones predefinidas contra el periodo actual
+PERIODO_ANTERIOR = "anterior"
+ANIO_ANTERIOR = "anio_anterior"
+
+
+def periodos_de_comparacion(period_start: str, period_end: str, comparar: List[str]) -> List[Tuple[str, str]]:
+    """
+    Periodo actual seguido de los periodos con los que se compara.
+
+    - "anterior": el periodo inmediatamente anterior de igual duración (si el
+      actual es un mes calendario completo, el mes calendario anterior).
+    - "anio_anterior": las mismas fechas un año antes.
+    """
+    try:
+        inicio = pd.Timestamp(period_start)
+        fin = pd.Timestamp(period_end)
+    except ValueError:
+        raise ValueError("Las fechas deben tener formato YYYY-MM-DD")
+    if inicio > fin:
+        raise ValueError(
+            f"La fecha inicial ({period_start}) debe ser menor o igual a la fecha final ({period_end})"
+        )
+
+    periodos = [(inicio, fin)]
+    for tipo in comparar:
+        if tipo == PERIODO_ANTERIOR:
+            mes_completo = inicio.day == 1 and fin == inicio + pd.offsets.MonthEnd(0)
+            if mes_completo:
+                previo_inicio = inicio - pd.offsets.MonthBegin(1)
+                periodos.append((previo_inicio, previo_inicio + pd.offsets.MonthEnd(0)))
+            else:
+                duracion = fin - inicio + pd.Timedelta(days=1)
+                periodos.append((inicio - duracion, fin - duracion))
+        elif tipo == ANIO_ANTERIOR:
+            periodos.append((inicio - pd.DateOffset(years=1), fin - pd.DateOffset(years=1)))
+        else:
+            raise ValueError(f"Comparación inválida: {tipo} (use anterior o anio_anterior)")
+    return [(a.strftime("%Y-%m-%d"), b.strftime("%Y-%m-%d")) for a, b in periodos]
+
+
+def _totales_por_periodo(df: pd.DataFrame, ids: List[int], periodos: List[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+    """
+    Diferencias (final - inicial) por máquina y periodo, SIN denominación.
+    Retorna arrays de forma (máquinas, periodos) por medidor, más 'has_data'.
+    """
+    n_m, n_p = len(ids), len(periodos)
+    if df.empty or n_m == 0:
+        vacio = np.zeros((n_m, n_p))
+        return {**{m: vacio.copy() for m in MEDIDORES}, "has_data": np.zeros((n_m, n_p), dtype=bool)}
+
+    # Clave compuesta ordenable: "0000000001|2025-11-01 08:00:00"
+    df = df.assign(_k=df["machine_id"].map("{:010d}".format) + "|" + df["at"].astype(str))
+    df = df.sort_values("_k", kind="mergesort").reset_index(drop=True)
+    claves = df["_k"].to_numpy(dtype=str)
+
+    # Fronteras de todas las parejas (máquina, periodo) en un solo searchsorted
+    pref = np.repeat(np.array([f"{m:010d}|" for m in ids]), n_p)
+    desde = np.char.add(pref, np.tile(np.array([p[0] for p in periodos]), n_m))
+    hasta = np.char.add(pref, np.tile(np.array([p[1] + " 23:59:59" for p in periodos]), n_m))
+    lo = np.searchsorted(claves, desde, side="left")
+    hi = np.searchsorted(claves, hasta, side="right") - 1
+    has_data = lo <= hi
+
+    valores = df[MEDIDORES].to_numpy(dtype=float)
+    lo_ok = np.where(has_data, lo, 0)
+    hi_ok = np.where(has_data, hi, 0)
+    diffs = np.where(has_data[:, None], valores[hi_ok] - valores[lo_ok], 0.0)
+
+    result = {m: diffs[:, i].reshape(n_m, n_p) for i, m in enumerate(MEDIDORES)}
+    result["has_data"] = has_data.reshape(n_m, n_p)
+    return result
+
+
+def _variacion(actual: float, previo: float) -> Dict[str, Optional[float]]:
+    delta = round(actual - previo, 2)
+    pct = round(delta / abs(previo) * 100, 2) if previo else None
+    return {"delta": delta, "pct": pct}
+
+
+def generar_reporte_comparativo(
+    periodos: List[Tuple[str, str]],
+    counters_repo,
+    machines_repo,
+    places_repo,
+    clock: Callable[[], datetime],
+    actor: str,
+    casino_id: Optional[int] = None,
+    machine_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Compara el primer periodo de `periodos` contra cada uno de los demás.
+
+    Alcance: todas las máquinas activas de `casino_id`, o una sola máquina.
+
+    Raises:
+        NotFoundError: casino/máquina inexistente o inactivo
+        ValueError: parámetros inválidos
+    """
+    if (casino_id is None) == (machine_id is None):
+        raise ValueError("Debe indicar casino_id o machine_id (solo uno)")
+    if len(periodos) < 2:
+        raise ValueError("Se necesitan al menos dos periodos para comparar")
+    for start, end in periodos:
+        if start > end:
+            raise ValueError(
+                f"La fecha inicial ({start}) debe ser menor o igual a la fecha final ({end})"
+            )
+
+    # 1. Máquinas del alcance (mismas reglas que los reportes de casino/máquina)
+    place = None
+    if casino_id is not None:
+        place = places_repo.get_by_id(casino_id)
+        if not place:
+            raise NotFoundError(f"Casino con id {casino_id} no encontrado")
+        if str(place.get('estado', '')).lower() != 'true':
+            raise NotFoundError(f"Casino con id {casino_id} está inactivo")
+        machines = machines_repo.listar(only_active=True, casino_id=casino_id)
+    else:
+        machine = machines_repo.get_by_id(machine_id)
+        if not machine:
+            raise NotFoundError(f"Máquina con id {machine_id} no encontrada")
+        if str(machine.get('estado', '')).lower() != 'true':
+            raise NotFoundError(f"Máquina con id {machine_id} está inactiva")
+        machines = [machine]
+
+    machines = sorted(machines, key=lambda m: int(m['id']))
+    ids = [int(m['id']) for m in machines]
+    denominaciones = denominacion_efectiva(pd.Series([m.get('denominacion') for m in machines], dtype=object)).to_numpy()
+
+    # 2. Una sola carga de lecturas que cubre todos los periodos
+    df = leer_lecturas(
+        counters_repo, ids,
+        min(p[0] for p in periodos),
+        max(p[1] for p in periodos),
+    )
+    diffs = _totales_por_periodo(df, ids, periodos)
+
+    # 3. Totales × denominación, por máquina (filas) y periodo (columnas)
+    totales = {TOTALES[m]: diffs[m] * denominaciones[:, None] for m in MEDIDORES}
+    totales["utilidad"] = totales["in_total"] - (totales["out_total"] + totales["jackpot_total"])
+    has_data = diffs["has_data"]
+
+    periodos_out = []
+    for j, (start, end) in enumerate(periodos):
+        cat = {c: round(float(totales[c][:, j].sum()), 2) for c in CATEGORIAS}
+        periodos_out.append({
+            "period_start": start,
+            "period_end": end,
+            "category_totals": {**{c: cat[c] for c in CATEGORIAS[:-1]}, "utilidad_final": cat["utilidad"]},
+            "machines_with_data": int(has_data[:, j].sum()),
+        })
+
+    machines_comparison = []
+    machines_summary = []
+    for i, m in enumerate(machines):
+        por_periodo = [
+            {**{c: round(float(totales[c][i, j]), 2) for c in CATEGORIAS}, "has_data": bool(has_data[i, j])}
+            for j in range(len(periodos))
+        ]
+        variaciones = [
+            {
+                "period_start": periodos[j][0],
+                "period_end": periodos[j][1],
+                **{c: _variacion(por_periodo[0][c], por_periodo[j][c]) for c in CATEGORIAS},
+            }
+            for j in range(1, len(periodos))
+        ]
+        info = {
+            "machine_id": ids[i],
+            "machine_marca": m.get('marca'),
+            "machine_modelo": m.get('modelo'),
+            "machine_serial": m.get('serial'),
+            "machine_asset": m.get('asset'),
+            "denominacion": float(denominaciones[i]),
+        }
+        machines_comparison.append({**info, "periodos": por_periodo, "variaciones": variaciones})
+        machines_summary.append({**info, **por_periodo[0]})
+
+    actual = periodos_out[0]["category_totals"]
+    category_deltas = []
+    for p in periodos_out[1:]:
+        previo = p["category_totals"]
+        category_deltas.append({
+            "period_start": p["period_start"],
+            "period_end": p["period_end"],
+            **{c: _variacion(actual[c], previo[c]) for c in actual},
+        })
+
+    report = {
+        "tipo_reporte": "comparativo",
+        "period_start": periodos[0][0],
+        "period_end": periodos[0][1],
+        "periodos": periodos_out,
+        "category_deltas": category_deltas,
+        "machines_comparison": machines_comparison,
+        # Periodo actual, en el formato del reporte consolidado (exportación)
+        "machines_summary": machines_summary,
+        "category_totals": periodos_out[0]["category_totals"],
+        "total_machines": len(machines),
+        "machines_with_data": periodos_out[0]["machines_with_data"],
+        "generated_at": clock().strftime("%Y-%m-%d %H:%M:%S"),
+        "generated_by": actor,
+    }
+    if place is not None:
+        report["casino_id"] = casino_id
+        report["casino_nombre"] = place.get('nombre')
+    else:
+        report["machine_id"] = machine_id
+    return report
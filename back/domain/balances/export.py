@@ -9,6 +9,44 @@ from io import BytesIO
 from datetime import datetime
 
 
+def _formato_variacion(variacion: Dict[str, Any]) -> str:
+    """'$1,234.00 (+12.5%)'; sin porcentaje si el periodo comparado fue 0."""
+    texto = f"${variacion['delta']:,.2f}"
+    if variacion.get('pct') is not None:
+        texto += f" ({variacion['pct']:+.1f}%)"
+    return texto
+
+
+def _filas_comparativo(report: Dict[str, Any]):
+    """
+    Tablas del reporte comparativo (mismas para PDF y Excel):
+    - Totales por periodo.
+    - Variación del periodo actual contra cada periodo comparado.
+    - Variación de la utilidad por máquina.
+    """
+    periodos = [
+        [f"{p['period_start']} al {p['period_end']}",
+         p['category_totals']['in_total'], p['category_totals']['out_total'],
+         p['category_totals']['jackpot_total'], p['category_totals']['billetero_total'],
+         p['category_totals']['utilidad_final']]
+        for p in report['periodos']
+    ]
+    variaciones = [
+        [f"vs {d['period_start']} al {d['period_end']}"]
+        + [_formato_variacion(d[c]) for c in ('in_total', 'out_total', 'jackpot_total', 'billetero_total', 'utilidad_final')]
+        for d in report['category_deltas']
+    ]
+    maquinas = [
+        [str(m['machine_id']), str(m.get('machine_marca') or 'N/A')[:10], m['periodos'][0]['utilidad']]
+        + [_formato_variacion(v['utilidad']) for v in m['variaciones']]
+        for m in report.get('machines_comparison', [])
+    ]
+    encabezado_maquinas = ['ID', 'Marca', 'UTILIDAD'] + [
+        f"Δ vs {d['period_start']}" for d in report['category_deltas']
+    ]
+    return periodos, variaciones, maquinas, encabezado_maquinas
+
+
 def generar_pdf_reporte(report: Dict[str, Any]) -> bytes:
     """
     Genera un PDF del reporte consolidado.
@@ -203,6 +241,44 @@ def generar_pdf_reporte(report: Dict[str, Any]) -> bytes:
     elements.append(totals_table)
     elements.append(Spacer(1, 0.3*inch))
     
+    # Comparativo entre periodos (solo reportes comparativos)
+    if report.get('category_deltas'):
+        periodos, variaciones, maquinas, encabezado_maquinas = _filas_comparativo(report)
+        tabla_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976d2')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ])
+        
+        elements.append(Paragraph("COMPARATIVO ENTRE PERIODOS", subtitle_style))
+        filas = [['Periodo', 'IN', 'OUT', 'JACKPOT', 'BILLETERO', 'UTILIDAD']] + [
+            [p[0]] + [f"${v:,.2f}" for v in p[1:]] for p in periodos
+        ]
+        tabla = Table(filas)
+        tabla.setStyle(tabla_style)
+        elements.append(tabla)
+        elements.append(Spacer(1, 0.2*inch))
+        
+        filas = [['Variación', 'IN', 'OUT', 'JACKPOT', 'BILLETERO', 'UTILIDAD']] + variaciones
+        tabla = Table(filas)
+        tabla.setStyle(tabla_style)
+        elements.append(tabla)
+        elements.append(Spacer(1, 0.2*inch))
+        
+        if maquinas:
+            elements.append(Paragraph("VARIACIÓN DE UTILIDAD POR MÁQUINA", subtitle_style))
+            filas = [encabezado_maquinas] + [
+                m[:2] + [f"${m[2]:,.2f}"] + m[3:] for m in maquinas
+            ]
+            tabla = Table(filas)
+            tabla.setStyle(tabla_style)
+            elements.append(tabla)
+        elements.append(Spacer(1, 0.3*inch))
+    
     # Estadísticas
     stats_data = [
         ['Total de Máquinas:', str(report.get('total_machines', 0))],
@@ -409,6 +485,35 @@ def generar_excel_reporte(report: Dict[str, Any]) -> bytes:
             ws.cell(row=row, column=2).font = Font(bold=True, size=11, color='FF0000')
             ws.cell(row=row, column=2).fill = PatternFill(start_color='FFEB3B', end_color='FFEB3B', fill_type='solid')
     
+    # Comparativo entre periodos (solo reportes comparativos)
+    if report.get('category_deltas'):
+        periodos, variaciones, maquinas, encabezado_maquinas = _filas_comparativo(report)
+        tablas = [
+            ('COMPARATIVO ENTRE PERIODOS', ['Periodo', 'IN', 'OUT', 'JACKPOT', 'BILLETERO', 'UTILIDAD'], periodos),
+            ('VARIACIÓN vs PERIODO ACTUAL', ['Variación', 'IN', 'OUT', 'JACKPOT', 'BILLETERO', 'UTILIDAD'], variaciones),
+            ('VARIACIÓN DE UTILIDAD POR MÁQUINA', encabezado_maquinas, maquinas),
+        ]
+        for titulo, headers, filas in tablas:
+            if not filas:
+                continue
+            row += 3
+            ws[f'A{row}'] = titulo
+            ws[f'A{row}'].font = Font(size=12, bold=True)
+            row += 1
+            for col, header in enumerate(headers, 1):
+                cell = ws.cell(row=row, column=col, value=header)
+                cell.font = header_font
+                cell.fill = header_fill
+                cell.alignment = Alignment(horizontal='center')
+                cell.border = border
+            for fila in filas:
+                row += 1
+                for col, value in enumerate(fila, 1):
+                    cell = ws.cell(row=row, column=col, value=value)
+                    cell.border = border
+                    if isinstance(value, float):
+                        cell.number_format = '"$"#,##0.00'
+    
     # Estadísticas
     row += 3
     ws.cell(row=row, column=1, value='Total de Máquinas:').font = Font(bold=True)
@@ -0,0 +1,155 @@
+# -------------------------------------------
+# back/domain/balances/leaderboard.py
+# Propósito:
+#   - Ranking (top / bottom N) de máquinas por utilidad, jackpot, billetero,
+#     in u out en un periodo, filtrable por casino, marca y modelo.
+#
+# Cálculo:
+#   - Desde contadores: una pasada por counters.csv y, por máquina,
+#     (CONTADOR FINAL - CONTADOR INICIAL) × DENOMINACION (igual que el cuadre).
+#   - Desde el agregado diario (CountersRepo.daily_bounds): primera y última
+#     lectura de cada máquina por día, precalculadas y reutilizadas mientras
+#     counters.csv no cambie. Se encadena primera lectura del primer día ->
+#     última del último día, así el total es el mismo que desde contadores
+#     (sumar cuadres diarios perdería el movimiento entre un día y el siguiente).
+#   - Selección con nlargest / nsmallest (selección parcial tipo heap, sin
+#     ordenar todas las máquinas) y solo se devuelven las N filas pedidas.
+# -------------------------------------------
+
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from back.domain.balances.timeseries import MEDIDORES, leer_lecturas, maquinas_en_alcance
+
+
+# Métrica pedida -> columna de totales
+METRICAS = {
+    "utilidad": "utilidad_total",
+    "jackpot": "jackpot_total",
+    "billetero": "billetero_total",
+    "in": "in_total",
+    "out": "out_total",
+}
+TOTALES = ["in_total", "out_total", "jackpot_total", "billetero_total", "utilidad_total"]
+
+FUENTE_CONTADORES = "counters"
+FUENTE_DIARIOS = "daily"
+FUENTE_AUTO = "auto"
+
+
+def _totales(diffs: pd.DataFrame, maquinas: pd.DataFrame) -> pd.DataFrame:
+    """(final - inicial) por máquina (índice machine_id, columnas MEDIDORES) -> totales con denominación."""
+    denominacion = maquinas.set_index("machine_id")["denominacion"].reindex(diffs.index)
+    diffs = diffs.mul(denominacion, axis=0)
+    diffs.columns = TOTALES[:-1]
+    diffs["utilidad_total"] = diffs["in_total"] - (diffs["out_total"] + diffs["jackpot_total"])
+    return diffs.reset_index()
+
+
+def _totales_desde_contadores(counters_repo, maquinas: pd.DataFrame, period_start: str, period_end: str) -> pd.DataFrame:
+    """Totales por máquina calculados en una pasada vectorizada por los contadores."""
+    df = leer_lecturas(counters_repo, maquinas["machine_id"].tolist(), period_start, period_end)
+    if df.empty:
+        return pd.DataFrame(columns=["machine_id"] + TOTALES)
+    df = df.sort_values("at", kind="mergesort")
+    grupos = df.groupby("machine_id")[MEDIDORES]
+    return _totales(grupos.last() - grupos.first(), maquinas)
+
+
+def _totales_desde_diarios(counters_repo, maquinas: pd.DataFrame, period_start: str, period_end: str) -> pd.DataFrame:
+    """
+    Totales por máquina desde el agregado diario: primera lectura del primer
+    día con datos y última lectura del último día con datos del periodo.
+    """
+    bounds = counters_repo.daily_bounds()
+    bounds = bounds[
+        bounds["machine_id"].isin(maquinas["machine_id"])
+        & (bounds["day"] >= period_start)
+        & (bounds["day"] <= period_end)
+    ]
+    if bounds.empty:
+        return pd.DataFrame(columns=["machine_id"] + TOTALES)
+    grupos = bounds.sort_values("day", kind="mergesort").groupby("machine_id")
+    inicial = grupos[[f"first_{c}" for c in MEDIDORES]].first()
+    final = grupos[[f"last_{c}" for c in MEDIDORES]].last()
+    inicial.columns = final.columns = MEDIDORES
+    return _totales(final - inicial, maquinas)
+
+
+def ranking_maquinas(
+    period_start: str,
+    period_end: str,
+    counters_repo,
+    machines_repo,
+    places_repo,
+    metrica: str = "utilidad",
+    n: int = 20,
+    orden: str = "top",
+    casino_id: Optional[int] = None,
+    marca: Optional[str] = None,
+    modelo: Optional[str] = None,
+    fuente: str = FUENTE_AUTO,
+) -> Dict[str, Any]:
+    """
+    Retorna {"metric", "orden", "n", "period_start", "period_end", "fuente",
+    "machines_considered", "rows"}; rows trae a lo sumo N máquinas con rank.
+
+    - orden: "top" (mayores) o "bottom" (menores).
+    - fuente: "daily" (agregado diario de lecturas de borde), "counters"
+      (pasada completa por las lecturas) o "auto" (= daily). Ambas fuentes
+      dan los mismos totales; cambia solo el costo.
+
+    Raises:
+        NotFoundError: si el casino no existe
+        ValueError: parámetros inválidos
+    """
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica inválida: {metrica} (use {', '.join(METRICAS)})")
+    if orden not in ("top", "bottom"):
+        raise ValueError("El orden debe ser 'top' o 'bottom'")
+    if fuente not in (FUENTE_AUTO, FUENTE_DIARIOS, FUENTE_CONTADORES):
+        raise ValueError(f"Fuente inválida: {fuente}")
+    if n < 1:
+        raise ValueError("n debe ser mayor o igual a 1")
+    if period_start > period_end:
+        raise ValueError(
+            f"La fecha inicial ({period_start}) debe ser menor o igual a la fecha final ({period_end})"
+        )
+
+    maquinas = maquinas_en_alcance(machines_repo, places_repo, None, casino_id, marca, modelo)
+
+    if fuente == FUENTE_CONTADORES:
+        usada = FUENTE_CONTADORES
+        totales = _totales_desde_contadores(counters_repo, maquinas, period_start, period_end)
+    else:
+        usada = FUENTE_DIARIOS
+        totales = _totales_desde_diarios(counters_repo, maquinas, period_start, period_end)
+
+    # Selección parcial: solo las N filas pedidas
+    columna = METRICAS[metrica]
+    if orden == "top":
+        seleccion = totales.nlargest(n, columna, keep="first")
+    else:
+        seleccion = totales.nsmallest(n, columna, keep="first")
+    seleccion = seleccion.merge(maquinas, on="machine_id", how="left")
+
+    rows = []
+    for rank, fila in enumerate(seleccion.to_dict(orient="records"), start=1):
+        rows.append({
+            "rank": rank,
+            "machine_id": int(fila["machine_id"]),
+            **{col: (None if pd.isna(fila.get(col)) else fila.get(col)) for col in ("casino_id", "marca", "modelo", "serial", "asset")},
+            **{col: round(float(fila[col]), 2) for col in TOTALES},
+        })
+
+    return {
+        "metric": metrica,
+        "orden": orden,
+        "n": n,
+        "period_start": period_start,
+        "period_end": period_end,
+        "fuente": usada,
+        "machines_considered": len(totales),
+        "rows": rows,
+    }
@@ -0,0 +1,194 @@
+# -------------------------------------------
+# back/domain/balances/timeseries.py
+# Propósito:
+#   - Serie de tiempo de IN / OUT / JACKPOT / BILLETERO / UTILIDAD por día,
+#     semana o mes, para una máquina, un casino o un grupo marca/modelo.
+#
+# Cálculo (mismo criterio que calcular_cuadre_maquina, aplicado a cada tramo):
+#   - Por máquina y tramo: TOTAL = (CONTADOR FINAL - CONTADOR INICIAL) × DENOMINACION,
+#     donde inicial/final son la primera y la última lectura dentro del tramo.
+#   - UTILIDAD = TOTAL IN - (TOTAL OUT + TOTAL JACKPOT)
+#   - El valor del tramo es la suma de las máquinas (solo máquinas activas,
+#     igual que el cuadre de casino).
+#   Así, un punto diario coincide con el cuadre de ese día, sin tener que
+#   llamar al cuadre una vez por día.
+#
+# Rendimiento:
+#   - Una sola pasada por counters.csv (por bloques, solo columnas necesarias).
+#   - Agrupación y remuestreo vectorizados con pandas (groupby + Period).
+# -------------------------------------------
+
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from back.domain.balances.machine_balance import NotFoundError
+
+
+MEDIDORES = ["in_amount", "out_amount", "jackpot_amount", "billetero_amount"]
+
+# Datos de la máquina que acompañan al alcance (para mostrar)
+INFO_MAQUINA = ["casino_id", "marca", "modelo", "serial", "asset"]
+
+# Granularidad pedida -> frecuencia de pandas
+FRECUENCIAS = {"day": "D", "week": "W-SUN", "month": "M"}
+
+
+def maquinas_en_alcance(
+    machines_repo,
+    places_repo,
+    machine_id: Optional[int],
+    casino_id: Optional[int],
+    marca: Optional[str],
+    modelo: Optional[str],
+) -> pd.DataFrame:
+    """
+    Máquinas activas que entran en el alcance (casino, marca/modelo o una
+    máquina), con su denominación efectiva y datos para mostrar.
+    """
+    if casino_id is not None and places_repo.obtener_por_id(casino_id) is None:
+        raise NotFoundError(f"Casino con id {casino_id} no encontrado")
+
+    machines = pd.DataFrame(machines_repo.listar(only_active=True, casino_id=casino_id))
+    if machine_id is not None:
+        if machines_repo.get_by_id(machine_id) is None:
+            raise NotFoundError(f"Máquina con id {machine_id} no encontrada")
+        if machines.empty or not (pd.to_numeric(machines["id"], errors="coerce") == machine_id).any():
+            raise NotFoundError(f"Máquina con id {machine_id} está inactiva")
+    if machines.empty:
+        return pd.DataFrame(columns=["machine_id", "denominacion"] + INFO_MAQUINA)
+
+    mask = pd.Series(True, index=machines.index)
+    if machine_id is not None:
+        mask &= pd.to_numeric(machines["id"], errors="coerce") == machine_id
+    if marca:
+        mask &= machines["marca"].astype(str).str.strip().str.lower() == marca.strip().lower()
+    if modelo:
+        mask &= machines["modelo"].astype(str).str.strip().str.lower() == modelo.strip().lower()
+    machines = machines[mask]
+
+    result = pd.DataFrame({
+        "machine_id": pd.to_numeric(machines["id"], errors="coerce").astype("int64").values,
+        "denominacion": denominacion_efectiva(machines.get("denominacion")).values,
+    })
+    for col in INFO_MAQUINA:
+        result[col] = machines[col].values if col in machines.columns else None
+    return result
+
+
+def denominacion_efectiva(valores: pd.Series) -> pd.Series:
+    """Misma regla que el cuadre: denominación inválida o <= 0 cuenta como 1."""
+    denominacion = pd.to_numeric(valores, errors="coerce")
+    return denominacion.where(denominacion > 0, 1.0).fillna(1.0)
+
+
+def leer_lecturas(counters_repo, machine_ids, date_from: str, date_to: str) -> pd.DataFrame:
+    """
+    Lecturas de las máquinas indicadas entre dos fechas (YYYY-MM-DD, inclusivas),
+    en una sola pasada por bloques. machine_id queda entero y los medidores
+    numéricos; filas sin fecha válida se descartan.
+    """
+    ids = set(machine_ids)
+    partes: List[pd.DataFrame] = []
+    if ids:
+        for chunk in counters_repo.iter_chunks(["id", "machine_id", "at"] + MEDIDORES):
+            m = pd.to_numeric(chunk["machine_id"], errors="coerce")
+            day = chunk["at"].fillna("").astype(str).str[:10]
+            mask = m.isin(ids) & (day >= date_from) & (day <= date_to)
+            if mask.any():
+                partes.append(chunk[mask].assign(machine_id=m[mask].astype("int64")))
+    if not partes:
+        return pd.DataFrame(columns=["id", "machine_id", "at", "ts"] + MEDIDORES)
+    df = pd.concat(partes, ignore_index=True)
+    df["ts"] = pd.to_datetime(df["at"], errors="coerce")
+    df = df[df["ts"].notna()]
+    for col in MEDIDORES:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+    return df
+
+
+def serie_utilidad(
+    period_start: str,
+    period_end: str,
+    counters_repo,
+    machines_repo,
+    places_repo,
+    machine_id: Optional[int] = None,
+    casino_id: Optional[int] = None,
+    marca: Optional[str] = None,
+    modelo: Optional[str] = None,
+    granularidad: str = "day",
+) -> Dict[str, Any]:
+    """
+    Retorna {"granularidad", "period_start", "period_end", "machines", "points"}.
+    Cada punto: period_start, period_end, in_total, out_total, jackpot_total,
+    billetero_total, utilidad_total, machines_with_data. Los tramos sin
+    lecturas aparecen con totales en 0 para que la curva sea continua.
+
+    Raises:
+        NotFoundError: si la máquina o el casino no existen (o la máquina está inactiva)
+        ValueError: si el periodo o la granularidad no son válidos
+    """
+    if granularidad not in FRECUENCIAS:
+        raise ValueError(f"Granularidad inválida: {granularidad} (use day, week o month)")
+    if machine_id is None and casino_id is None and not marca and not modelo:
+        raise ValueError("Debe indicar machine_id, casino_id o marca/modelo")
+    try:
+        inicio = pd.Timestamp(period_start)
+        fin = pd.Timestamp(period_end)
+    except ValueError:
+        raise ValueError("Las fechas deben tener formato YYYY-MM-DD")
+    if inicio > fin:
+        raise ValueError(
+            f"La fecha inicial ({period_start}) debe ser menor o igual a la fecha final ({period_end})"
+        )
+
+    maquinas = maquinas_en_alcance(machines_repo, places_repo, machine_id, casino_id, marca, modelo)
+    ids = set(maquinas["machine_id"].tolist())
+
+    # 1. Una pasada por bloques: solo lecturas de las máquinas y del periodo
+    df = leer_lecturas(counters_repo, ids, period_start, period_end)
+
+    freq = FRECUENCIAS[granularidad]
+    tramos = pd.period_range(inicio, fin, freq=freq)
+    totales = pd.DataFrame(0.0, index=tramos, columns=MEDIDORES)
+    con_datos = pd.Series(0, index=tramos)
+
+    if not df.empty:
+        df = df.sort_values("at", kind="mergesort")
+        df["tramo"] = df["ts"].dt.to_period(freq)
+
+        # 2. Por máquina y tramo: (final - inicial) × denominación
+        grupos = df.groupby(["machine_id", "tramo"])[MEDIDORES]
+        diffs = grupos.last() - grupos.first()
+        denominacion = maquinas.set_index("machine_id")["denominacion"]
+        diffs = diffs.mul(denominacion.reindex(diffs.index.get_level_values("machine_id")).values, axis=0)
+
+        # 3. Suma por tramo (todas las máquinas del alcance)
+        por_tramo = diffs.groupby(level="tramo")
+        totales = por_tramo.sum().reindex(tramos, fill_value=0.0)
+        con_datos = por_tramo.size().reindex(tramos, fill_value=0)
+
+    totales.columns = ["in_total", "out_total", "jackpot_total", "billetero_total"]
+    totales["utilidad_total"] = totales["in_total"] - (totales["out_total"] + totales["jackpot_total"])
+    totales = totales.round(2)
+
+    points = []
+    for tramo, fila in zip(tramos, totales.to_dict(orient="records")):
+        # Los extremos se recortan al periodo pedido (semanas/meses parciales)
+        desde = max(tramo.start_time.normalize(), inicio)
+        hasta = min(tramo.end_time.normalize(), fin)
+        points.append({
+            "period_start": desde.strftime("%Y-%m-%d"),
+            "period_end": hasta.strftime("%Y-%m-%d"),
+            **fila,
+            "machines_with_data": int(con_datos.get(tramo, 0)),
+        })
+
+    return {
+        "granularidad": granularidad,
+        "period_start": period_start,
+        "period_end": period_end,
+        "machines": len(ids),
+        "points": points,
+    }
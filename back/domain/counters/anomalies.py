@@ -0,0 +1,183 @@
+"""
+back/domain/counters/anomalies.py
+
+Escaneo de anomalías en el historial de contadores.
+
+Los contadores son acumulados: entre dos lecturas consecutivas de la misma
+máquina cada medidor debería subir (o quedarse igual). Un reinicio del
+medidor, dígitos intercambiados o un error de captura aparecen como:
+- "negative": el medidor bajó respecto a la lectura anterior.
+- "outlier": el salto es muchísimo mayor que los saltos habituales de la
+  máquina (más de ANOMALY_OUTLIER_FACTOR veces la mediana de sus saltos
+  positivos en ese medidor).
+
+Esos casos son los que luego producen cuadres absurdos (totales negativos),
+por eso el resultado se guarda en una tabla de hallazgos que los endpoints de
+cuadre pueden consultar.
+
+Memoria acotada:
+- counters.csv se lee por bloques (solo las columnas necesarias).
+- Si el archivo es grande, en una primera pasada las filas se reparten por
+  máquina (machine_id % N) en archivos temporales; todas las lecturas de una
+  máquina quedan en la misma partición.
+- Cada partición se procesa en UNA pasada vectorizada: ordenar por
+  (machine_id, at, id) y `groupby(...).diff()`.
+"""
+
+import math
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from back.core import settings
+
+
+MEDIDORES = ["in_amount", "out_amount", "jackpot_amount", "billetero_amount"]
+SCAN_FIELDS = ["id", "machine_id", "casino_id", "at"] + MEDIDORES
+
+NEGATIVO = "negative"
+ATIPICO = "outlier"
+
+
+def _preparar(df: pd.DataFrame) -> pd.DataFrame:
+	"""Tipos numéricos; se descartan filas sin máquina o sin fecha."""
+	out = pd.DataFrame({
+		"id": pd.to_numeric(df["id"], errors="coerce"),
+		"machine_id": pd.to_numeric(df["machine_id"], errors="coerce"),
+		"casino_id": pd.to_numeric(df["casino_id"], errors="coerce"),
+		"at": df["at"].fillna("").astype(str).str.strip(),
+	})
+	for m in MEDIDORES:
+		out[m] = pd.to_numeric(df[m], errors="coerce")
+	return out[out["machine_id"].notna() & (out["at"] != "")]
+
+
+def analizar_lecturas(
+	df: pd.DataFrame,
+	outlier_factor: float,
+	min_samples: int,
+	scanned_at: str,
+) -> pd.DataFrame:
+	"""
+	Hallazgos de un conjunto de lecturas que contiene el historial COMPLETO
+	de cada máquina presente. Una fila por (lectura, medidor) anómalo.
+	"""
+	df = _preparar(df)
+	if df.empty:
+		return pd.DataFrame()
+	df = df.sort_values(["machine_id", "at", "id"], kind="mergesort").reset_index(drop=True)
+	grupos = df.groupby("machine_id", sort=False)
+
+	previas = grupos[["id", "at"] + MEDIDORES].shift(1)
+	deltas = grupos[MEDIDORES].diff()
+
+	partes: List[pd.DataFrame] = []
+	for m in MEDIDORES:
+		delta = deltas[m]
+		# Mediana de saltos positivos por máquina (robusta a los propios atípicos)
+		positivos = delta.where(delta > 0)
+		mediana = positivos.groupby(df["machine_id"]).transform("median")
+		muestras = positivos.groupby(df["machine_id"]).transform("count")
+
+		negativo = delta < 0
+		atipico = (
+			~negativo
+			& (muestras >= min_samples)
+			& (mediana > 0)
+			& (delta > outlier_factor * mediana)
+		)
+		sel = negativo | atipico
+		if not sel.any():
+			continue
+		partes.append(pd.DataFrame({
+			"machine_id": df.loc[sel, "machine_id"].astype("int64"),
+			"casino_id": df.loc[sel, "casino_id"].astype("Int64"),
+			"meter": m,
+			"kind": negativo[sel].map({True: NEGATIVO, False: ATIPICO}),
+			"at": df.loc[sel, "at"],
+			"prev_at": previas.loc[sel, "at"],
+			"value": df.loc[sel, m],
+			"prev_value": previas.loc[sel, m],
+			"delta": delta[sel],
+			"counter_id": df.loc[sel, "id"].astype("Int64"),
+			"prev_counter_id": previas.loc[sel, "id"].astype("Int64"),
+			"scanned_at": scanned_at,
+		}))
+
+	if not partes:
+		return pd.DataFrame()
+	return pd.concat(partes).sort_values(["machine_id", "at", "meter"], kind="mergesort")
+
+
+def _particiones(counters_repo, chunksize: int, buckets: int, tmpdir: Path) -> Iterator[pd.DataFrame]:
+	"""Reparte las lecturas por máquina en `buckets` archivos y los entrega uno a uno."""
+	if buckets <= 1:
+		partes = list(counters_repo.iter_chunks(SCAN_FIELDS, chunksize))
+		if partes:
+			yield pd.concat(partes, ignore_index=True)
+		return
+
+	rutas = [tmpdir / f"bucket-{i}.csv" for i in range(buckets)]
+	escritos = set()
+	for chunk in counters_repo.iter_chunks(SCAN_FIELDS, chunksize):
+		machine = pd.to_numeric(chunk["machine_id"], errors="coerce")
+		chunk = chunk[machine.notna()]
+		bucket = (machine[machine.notna()].astype("int64") % buckets)
+		for b, parte in chunk.groupby(bucket.values):
+			ruta = rutas[int(b)]
+			parte.to_csv(ruta, mode="a", index=False, header=ruta not in escritos)
+			escritos.add(ruta)
+	for ruta in rutas:
+		if ruta in escritos:
+			yield pd.read_csv(ruta, dtype=str)
+
+
+def escanear_anomalias(
+	counters_repo,
+	anomalies_repo,
+	clock: Callable[[], datetime],
+	outlier_factor: Optional[float] = None,
+	min_samples: Optional[int] = None,
+	chunksize: Optional[int] = None,
+	bucket_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+	"""
+	Recorre todo counters.csv y reemplaza la tabla de hallazgos.
+
+	Retorna un resumen: {"scanned_at", "readings", "machines", "findings",
+	"negative", "outlier", "partitions"}.
+	"""
+	outlier_factor = outlier_factor or settings.ANOMALY_OUTLIER_FACTOR
+	min_samples = min_samples or settings.ANOMALY_MIN_SAMPLES
+	chunksize = chunksize or settings.ANOMALY_SCAN_CHUNKSIZE
+	bucket_bytes = bucket_bytes or settings.ANOMALY_SCAN_BUCKET_BYTES
+
+	scanned_at = clock().strftime("%Y-%m-%d %H:%M:%S")
+	buckets = max(1, math.ceil(counters_repo.file_size() / bucket_bytes))
+	resumen = {
+		"scanned_at": scanned_at,
+		"readings": 0,
+		"machines": 0,
+		"findings": 0,
+		NEGATIVO: 0,
+		ATIPICO: 0,
+		"partitions": buckets,
+	}
+
+	with tempfile.TemporaryDirectory(prefix="counter-scan-") as tmp:
+		def hallazgos() -> Iterator[pd.DataFrame]:
+			for parte in _particiones(counters_repo, chunksize, buckets, Path(tmp)):
+				resumen["readings"] += len(parte)
+				resumen["machines"] += pd.to_numeric(parte["machine_id"], errors="coerce").nunique()
+				found = analizar_lecturas(parte, outlier_factor, min_samples, scanned_at)
+				if not found.empty:
+					conteo = found["kind"].value_counts()
+					resumen[NEGATIVO] += int(conteo.get(NEGATIVO, 0))
+					resumen[ATIPICO] += int(conteo.get(ATIPICO, 0))
+				yield found
+
+		resumen["findings"] = anomalies_repo.replace_all(hallazgos())
+	return resumen
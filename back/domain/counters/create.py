@@ -12,13 +12,46 @@ Comentarios para estudiantes (4to semestre):
   las operaciones de almacenamiento.
 """
 
-from typing import Callable, Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
 
 
 class NotFoundError(Exception):
 	pass
 
 
+# Medidores acumulados: en una máquina sana nunca bajan con el tiempo
+MEDIDORES = ["in_amount", "out_amount", "jackpot_amount", "billetero_amount"]
+
+
+def verificar_monotonia(data: Dict[str, Any], latest: Optional[Dict[str, Any]]) -> List[str]:
+	"""
+	Compara una lectura nueva contra la última lectura de la misma máquina.
+
+	- Solo se revisa si la lectura nueva es posterior a la última (una carga
+	  atrasada no se puede juzgar contra una lectura más nueva).
+	- Retorna un mensaje por cada medidor que bajó; lista vacía si todo está bien.
+	"""
+	if not latest:
+		return []
+	at_nuevo = str(data.get("at") or "").strip()
+	at_ultimo = str(latest.get("at") or "").strip()
+	if not at_nuevo or at_nuevo <= at_ultimo:
+		return []
+
+	avisos = []
+	for fld in MEDIDORES:
+		try:
+			nuevo = float(data.get(fld) or 0)
+			anterior = float(latest.get(fld) or 0)
+		except (TypeError, ValueError):
+			continue
+		if nuevo < anterior:
+			avisos.append(
+				f"{fld} bajó de {anterior} a {nuevo} respecto a la lectura del {at_ultimo}"
+			)
+	return avisos
+
+
 def create_counter(
 	data: Dict[str, Any],
 	clock: Callable[[], str],
@@ -1,22 +1,37 @@
 # back/domain/counters/read.py
 
-from typing import List, Any, Optional
+from typing import List, Any, Optional, Tuple, Iterator
 from datetime import date
 from fastapi import HTTPException, status
+import pandas as pd
+from functools import lru_cache
+from pydantic import TypeAdapter
 
 from back.models.counters import CounterOut
+from back.models.parciales import modelo_parcial
+
+
+@lru_cache(maxsize=64)
+def _counters_adapter(fields: Optional[Tuple[str, ...]] = None) -> TypeAdapter:
+    """
+    Validación de listados completos en una pasada (en vez de CounterOut(**row)
+    por fila); con fields, contra el modelo parcial de esos campos.
+    """
+    return TypeAdapter(List[modelo_parcial(CounterOut, fields)])
 
 def consultar_contadores_reporte(
     casino_id: int,
     start_date: date,
     end_date: date,
-    counters_repo: Any
+    counters_repo: Any,
+    fields: Optional[List[str]] = None
 ) -> List[CounterOut]:
     """
     Obtiene los registros de contadores filtrados para el Módulo de Reportes.
     
     Reglas:
     - start_date no puede ser mayor que end_date.
+    - fields: solo esos campos (modelo parcial de CounterOut).
     """
 
     # 1. Validación lógica de fechas
@@ -34,11 +49,109 @@ def consultar_contadores_reporte(
     rows = counters_repo.list_by_casino_date(
         casino_id=casino_id,
         fecha_inicio=start_str,
-        fecha_fin=end_str
+        fecha_fin=end_str,
+        fields=fields
     )
 
     # 4. Retornar modelos
-    return [CounterOut(**row) for row in rows]
+    return _counters_adapter(tuple(fields) if fields else None).validate_python(rows)
+
+
+def consultar_contadores_reporte_paginado(
+    casino_id: int,
+    start_date: date,
+    end_date: date,
+    counters_repo: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[CounterOut], Optional[str]]:
+    """
+    Igual que `consultar_contadores_reporte`, pero por páginas ordenadas por
+    (at, id). Retorna (contadores, siguiente_cursor).
+    """
+
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha de inicio no puede ser posterior a la fecha de fin."
+        )
+
+    try:
+        rows, next_cursor = counters_repo.list_counters_page(
+            casino_id=casino_id,
+            date_from=start_date.strftime("%Y-%m-%d"),
+            # Incluir todo el día final (mismo criterio que list_by_casino_date)
+            date_to=end_date.strftime("%Y-%m-%d") + " 23:59:59",
+            cursor=cursor,
+            limit=limit,
+            fields=fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return _counters_adapter(tuple(fields) if fields else None).validate_python(rows), next_cursor
+
+
+# Campos exportables: los mismos que expone CounterOut
+EXPORT_FIELDS = list(CounterOut.model_fields.keys())
+_INT_FIELDS = {"id", "machine_id", "casino_id"}
+_FLOAT_FIELDS = {"in_amount", "out_amount", "jackpot_amount", "billetero_amount"}
+
+
+def exportar_contadores_stream(
+    casino_id: int,
+    start_date: date,
+    end_date: date,
+    counters_repo: Any,
+    formato: str = "ndjson",
+    fields: Optional[List[str]] = None
+) -> Iterator[str]:
+    """
+    Exportación masiva de contadores para auditoría (NDJSON o CSV).
+
+    A diferencia de `consultar_contadores_reporte`, no arma la lista completa
+    en memoria: devuelve un generador que va produciendo texto bloque a bloque
+    a partir de la lectura por bloques del repositorio.
+
+    fields: columnas ya validadas (campos_param en la API); None = todas.
+
+    Las validaciones (fechas) se hacen ANTES de devolver el generador,
+    para que los errores salgan como 400 y no a mitad de la descarga.
+    """
+
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha de inicio no puede ser posterior a la fecha de fin."
+        )
+    columns = list(fields or EXPORT_FIELDS)
+
+    chunks = counters_repo.iter_by_casino_date(
+        casino_id=casino_id,
+        fecha_inicio=start_date.strftime("%Y-%m-%d"),
+        fecha_fin=end_date.strftime("%Y-%m-%d"),
+        fields=columns
+    )
+
+    def _generar() -> Iterator[str]:
+        header_sent = False
+        for chunk in chunks:
+            # Mismos tipos que CounterOut (enteros y decimales)
+            for col in columns:
+                if col in _INT_FIELDS:
+                    chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("Int64")
+                elif col in _FLOAT_FIELDS:
+                    chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+            if formato == "csv":
+                yield chunk.to_csv(index=False, header=not header_sent)
+                header_sent = True
+            else:
+                yield chunk.to_json(orient="records", lines=True, force_ascii=False)
+        if formato == "csv" and not header_sent:
+            yield ",".join(columns) + "\n"
+
+    return _generar()
 
 
 def obtener_contador_por_id(
@@ -43,6 +43,10 @@ def modificar_contadores_batch(
     
     # exclude_none=True solo envia al repo los campos que SÍ cambiaron.
     updates_list = [u.dict(exclude_none=True) for u in batch_data.updates]
+    # Días propios de cada corrección (lotes de varios días) como 'YYYY-MM-DD'
+    for u in updates_list:
+        if "fecha" in u:
+            u["fecha"] = u["fecha"].strftime("%Y-%m-%d")
 
     # 3. Ejecutar Actualización
     updated_rows = counters_repo.update_batch(
@@ -18,7 +18,7 @@ import pandas as pd
 
 try:
 	# Cuando se importa como paquete
-	from .inativation import ensure_data_files, append_log, MACHINES_CSV, LOGS_CSV, MACHINES_STATUS_CSV
+	from .inativation import ensure_data_files, append_log, update_status_csv, maquinas_activas, MACHINES_CSV, LOGS_CSV, MACHINES_STATUS_CSV
 except Exception:
 	# Permitir ejecución directa del script (python activation.py)
 	# Agregar la raíz del proyecto a sys.path si es necesario y reintentar
@@ -27,7 +27,7 @@ except Exception:
 	project_root = os.path.abspath(os.path.join(this_dir, "..", "..", ".."))
 	if project_root not in sys.path:
 		sys.path.insert(0, project_root)
-	from back.domain.machines.inativation import ensure_data_files, append_log, MACHINES_CSV, LOGS_CSV, MACHINES_STATUS_CSV
+	from back.domain.machines.inativation import ensure_data_files, append_log, update_status_csv, maquinas_activas, MACHINES_CSV, LOGS_CSV, MACHINES_STATUS_CSV
 
 
 def _now() -> str:
@@ -39,7 +39,7 @@ def activar_maquina_por_serial(serial: str, actor: str = "system", note: Optiona
 
 	Comportamiento:
 	- Si la máquina no existe -> ValueError.
-	- Si ya está activa -> registra intento en `logs.csv` y devuelve fila.
+	- Si ya está activa -> registra intento en la bitácora de auditoría y devuelve fila.
 	- Si está inactiva -> marca `is_active=True`, actualiza timestamps, graba CSVs y registra en logs.
 
 	Retorna la fila actualizada (NaN convertidos a cadena vacía).
@@ -64,8 +64,8 @@ def activar_maquina_por_serial(serial: str, actor: str = "system", note: Optiona
 		if col not in df.columns:
 			df[col] = "" if default == "" else default
 
-	current_state = str(df.at[idx, "is_active"]).strip().lower()
-	if current_state == "true":
+	# Misma regla que la inactivación y la versión masiva (is_active vacío -> estado)
+	if maquinas_activas(df.loc[[idx]]).iat[0]:
 		# Ya activa: registrar intento y devolver error informativo
 		log_entry = {
 			"timestamp": timestamp,
@@ -105,9 +105,8 @@ def activar_maquina_por_serial(serial: str, actor: str = "system", note: Optiona
 	}
 	append_log(log_entry)
 
-	# actualizar machines_status.csv
-	status = df[[col for col in ["id", "serial", "is_active"] if col in df.columns]].copy()
-	status.to_csv(MACHINES_STATUS_CSV, index=False)
+	# actualizar machines_status.csv (desde el df en memoria, sin releer)
+	update_status_csv(df)
 
 	row = df.loc[idx].to_dict()
 	clean = {k: ("" if pd.isna(v) else v) for k, v in row.items()}
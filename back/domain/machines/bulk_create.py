@@ -0,0 +1,173 @@
+# -------------------------------------------
+# back/domain/machines/bulk_create.py
+# Propósito:
+#   Alta masiva de máquinas (apertura de un casino: cientos de máquinas).
+#
+# Entradas:
+#   - Lista de filas (dicts) ya sea desde JSON o leídas de un CSV/XLSX
+#     con columnas: marca, modelo, serial, asset, place_id (o casino_id),
+#     denominacion, is_active (opcional).
+#
+# Validaciones (mismas reglas que el alta individual):
+#   - Cada fila debe cumplir MachineIn.
+#   - serial y asset únicos (sin distinguir mayúsculas) contra las máquinas
+#     existentes Y dentro del mismo lote (gana la primera aparición).
+#   - El casino debe existir y estar activo.
+#   Las comprobaciones de unicidad y casino se hacen vectorizadas con pandas.
+#
+# Procesamiento:
+#   - Ids asignados en un solo bloque consecutivo.
+#   - Una sola escritura de machines.csv para todas las filas aceptadas.
+#
+# Salida:
+#   - {"created", "rejected", "results": [por fila: row, serial, status, id, detail]}
+#   - status: "created" | "invalid" | "duplicate" | "casino_error"
+# -------------------------------------------
+
+import io
+from typing import Any, Dict, List
+
+import pandas as pd
+from pydantic import ValidationError
+
+from back.models.machines import MachineIn
+
+
+CSV_TYPES = {"text/csv", "application/csv"}
+XLSX_TYPES = {
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.ms-excel",
+}
+
+
+class CargaMasivaError(Exception):
+    """El archivo o cuerpo del lote no se pudo interpretar."""
+    pass
+
+
+def leer_lote_maquinas(content: bytes, content_type: str) -> List[Dict[str, Any]]:
+    """Convierte un CSV o XLSX subido en una lista de filas (dicts)."""
+    tipo = (content_type or "").split(";")[0].strip().lower()
+    try:
+        if tipo in CSV_TYPES:
+            df = pd.read_csv(io.BytesIO(content), dtype=str)
+        elif tipo in XLSX_TYPES:
+            df = pd.read_excel(io.BytesIO(content), dtype=str)
+        else:
+            raise CargaMasivaError(f"Tipo de contenido no soportado: {content_type}")
+    except CargaMasivaError:
+        raise
+    except Exception as e:
+        raise CargaMasivaError(f"No se pudo leer el archivo: {e}")
+
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    # Aceptar 'casino_id' como sinónimo de 'place_id' (así se llama en machines.csv)
+    if "place_id" not in df.columns and "casino_id" in df.columns:
+        df = df.rename(columns={"casino_id": "place_id"})
+
+    rows = []
+    for record in df.to_dict(orient="records"):
+        # Celdas vacías -> ausentes (para que apliquen los valores por defecto)
+        rows.append({k: v for k, v in record.items() if not pd.isna(v) and str(v).strip() != ""})
+    return rows
+
+
+def registrar_maquinas_masivo(
+    rows: List[Dict[str, Any]],
+    machines_repo: Any,
+    places_repo: Any,
+    actor: str = "system"
+) -> Dict[str, Any]:
+    """Registra un lote de máquinas con una sola escritura del CSV."""
+    results: List[Dict[str, Any]] = [
+        {"row": i + 1, "serial": str(r.get("serial", "") or ""), "status": None, "id": None, "detail": ""}
+        for i, r in enumerate(rows)
+    ]
+
+    # 1. Validación de forma por fila (Pydantic)
+    validas: List[Dict[str, Any]] = []
+    for i, r in enumerate(rows):
+        try:
+            m = MachineIn(**r)
+        except ValidationError as e:
+            results[i]["status"] = "invalid"
+            results[i]["detail"] = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            continue
+        validas.append({"_row": i, **m.model_dump()})
+
+    if validas:
+        lote = pd.DataFrame(validas)
+        serial_norm = lote["serial"].str.strip().str.lower()
+        asset_norm = lote["asset"].str.strip().str.lower()
+
+        # 2. Unicidad contra lo existente (una lectura del CSV) y dentro del lote
+        existentes = pd.DataFrame(machines_repo.listar())
+        if existentes.empty:
+            seriales_existentes, assets_existentes = set(), set()
+        else:
+            seriales_existentes = set(existentes.get("serial", pd.Series(dtype=str)).fillna("").str.strip().str.lower())
+            assets_existentes = set(existentes.get("asset", pd.Series(dtype=str)).fillna("").str.strip().str.lower())
+
+        serial_dup_existente = serial_norm.isin(seriales_existentes)
+        asset_dup_existente = asset_norm.isin(assets_existentes)
+        serial_dup_lote = serial_norm.duplicated(keep="first")
+        asset_dup_lote = asset_norm.duplicated(keep="first")
+
+        # 3. Casino existente y activo (una lectura de places.csv)
+        places = pd.DataFrame(places_repo.listar(only_active=None))
+        if places.empty:
+            activos, conocidos = set(), set()
+        else:
+            ids = pd.to_numeric(places["id"], errors="coerce")
+            # Misma regla que el alta individual: inactivo solo si estado es "false"
+            # (vacío o NaN cuenta como activo)
+            activo = places["estado"].astype(str).str.strip().str.lower() != "false"
+            conocidos = set(ids.dropna().astype(int))
+            activos = set(ids[activo].dropna().astype(int))
+        casino_inexistente = ~lote["place_id"].isin(conocidos)
+        casino_inactivo = ~casino_inexistente & ~lote["place_id"].isin(activos)
+
+        motivos = [
+            (serial_dup_existente, "duplicate", "Ya existe una máquina con el serial '{serial}'"),
+            (asset_dup_existente, "duplicate", "Ya existe una máquina con el asset '{asset}'"),
+            (serial_dup_lote, "duplicate", "Serial '{serial}' repetido dentro del lote"),
+            (asset_dup_lote, "duplicate", "Asset '{asset}' repetido dentro del lote"),
+            (casino_inexistente, "casino_error", "Casino con id {place_id} no encontrado"),
+            (casino_inactivo, "casino_error", "Casino con id {place_id} está inactivo"),
+        ]
+        rechazada = pd.Series(False, index=lote.index)
+        for mask, status, template in motivos:
+            nuevas = mask & ~rechazada
+            for pos in lote.index[nuevas]:
+                fila = lote.loc[pos]
+                res = results[int(fila["_row"])]
+                res["status"] = status
+                res["detail"] = template.format(**fila.to_dict())
+            rechazada |= mask
+
+        # 4. Ids en un bloque y una sola escritura
+        aceptadas = lote[~rechazada]
+        if not aceptadas.empty:
+            first_id = machines_repo.next_id()
+            nuevas_filas = []
+            for offset, (_, fila) in enumerate(aceptadas.iterrows()):
+                new_id = first_id + offset
+                nuevas_filas.append({
+                    "id": new_id,
+                    "marca": fila["marca"],
+                    "modelo": fila["modelo"],
+                    "serial": fila["serial"],
+                    "asset": fila["asset"],
+                    "denominacion": str(fila["denominacion"]),
+                    "estado": str(bool(fila["is_active"])),
+                    "casino_id": int(fila["place_id"]),
+                })
+                res = results[int(fila["_row"])]
+                res["status"] = "created"
+                res["id"] = new_id
+            machines_repo.add_many(nuevas_filas, actor)
+
+    created = sum(1 for r in results if r["status"] == "created")
+    return {"created": created, "rejected": len(results) - created, "results": results}
@@ -0,0 +1,135 @@
+"""Activación / inactivación masiva de máquinas.
+
+Pensado para cerrar (o reabrir) un piso completo de un casino sin hacer
+cientos de llamadas a `/machines/inactivate` o `/machines/activate`.
+
+En una sola pasada vectorizada sobre `machines.csv`:
+- Se seleccionan las máquinas por lista de seriales o por `casino_id`.
+- Se cambian solo las que lo necesitan (las que ya están en el estado
+  pedido se reportan como intento, igual que en la versión individual).
+- `machines.csv` y `machines_status.csv` se escriben UNA vez.
+- Todas las entradas de auditoría se anexan en UNA sola escritura.
+
+Retorna el resultado por serial para que el cliente sepa qué pasó con cada una.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Optional, Dict, Any, List
+
+import pandas as pd
+
+from back.domain.machines import inativation
+
+
+# Estado resultante por serial
+CAMBIADA = "changed"
+SIN_CAMBIO = "unchanged"
+NO_ENCONTRADA = "not_found"
+
+
+def cambiar_estado_masivo(
+	activar: bool,
+	serials: Optional[List[str]] = None,
+	casino_id: Optional[int] = None,
+	actor: str = "system",
+	motivo: Optional[str] = None,
+	clock: Optional[callable] = None,
+) -> Dict[str, Any]:
+	"""Activa (`activar=True`) o inactiva varias máquinas a la vez.
+
+	- Exactamente uno de `serials` o `casino_id` debe venir.
+	- Máquinas ya en el estado pedido -> resultado "unchanged" y se registra
+	  el intento en la bitácora (mismas acciones que la versión individual).
+	- Seriales inexistentes -> resultado "not_found" (no detienen el lote).
+
+	Retorna {"action", "batch_token", "changed", "results": [...]}.
+	"""
+	if (serials is None) == (casino_id is None):
+		raise ValueError("Debe indicar una lista de seriales o un casino_id (solo uno)")
+
+	inativation.ensure_data_files()
+	df = inativation.load_machines_df()
+	if "serial" not in df.columns:
+		raise ValueError("CSV de máquinas no contiene columna 'serial'")
+
+	# Asegurar columnas de auditoría
+	for col, default in (("is_active", "True"), ("updated_at", ""), ("updated_by", "")):
+		if col not in df.columns:
+			df[col] = default
+
+	serial_col = df["serial"].astype(str).str.strip()
+	if casino_id is not None:
+		target = pd.to_numeric(df["casino_id"], errors="coerce") == casino_id
+		if not target.any():
+			raise ValueError(f"No se encontraron máquinas para el casino {casino_id}")
+		pedidos: List[str] = list(dict.fromkeys(serial_col[target].tolist()))
+	else:
+		# Sin duplicados y respetando el orden de la petición
+		pedidos = list(dict.fromkeys(str(s).strip() for s in serials))
+		target = serial_col.isin(pedidos)
+
+	# Misma regla que la inactivación individual (is_active vacío -> estado)
+	activa = inativation.maquinas_activas(df)
+	cambiar = target & (activa != activar)
+
+	timestamp = inativation._now(clock)
+	nuevo = "True" if activar else "False"
+
+	# Una sola asignación vectorizada para todas las filas a cambiar
+	if cambiar.any():
+		df.loc[cambiar, "is_active"] = nuevo
+		# Sincronizar campo 'estado' también
+		if "estado" in df.columns:
+			df.loc[cambiar, "estado"] = nuevo
+		df.loc[cambiar, "updated_at"] = timestamp
+		df.loc[cambiar, "updated_by"] = actor
+		inativation.save_machines_df(df)
+		inativation.update_status_csv(df)
+
+	# Bitácora: una entrada por máquina, anexadas en un solo bloque
+	batch_token = uuid.uuid4().hex
+	if activar:
+		accion, accion_intento = "activate_machine", "activation_attempt_on_already_active"
+		motivo_default, nota_intento = "reactivacion_masiva", "machine_already_active"
+	else:
+		accion, accion_intento = "inactivate_machine", "inactivation_attempt_on_already_inactive"
+		motivo_default, nota_intento = "inactivacion_masiva", "machine_already_inactive"
+
+	ids = df["id"] if "id" in df.columns else pd.Series("", index=df.index)
+	entries = []
+	estado_por_serial: Dict[str, Dict[str, Any]] = {}
+	for idx in df.index[target]:
+		changed = bool(cambiar.at[idx])
+		serial = serial_col.at[idx]
+		entries.append({
+			"timestamp": timestamp,
+			"action": accion if changed else accion_intento,
+			"machine_id": ids.at[idx],
+			"serial": serial,
+			"inactivation_token": "" if activar else uuid.uuid4().hex,
+			"motivo": motivo or motivo_default,
+			"actor": actor,
+			"note": "" if changed else nota_intento,
+			"batch_token": batch_token,
+		})
+		estado_por_serial.setdefault(serial, {
+			"serial": serial,
+			"machine_id": ids.at[idx],
+			"status": CAMBIADA if changed else SIN_CAMBIO,
+			# Cambiada o no, la máquina queda en el estado pedido
+			"is_active": activar,
+		})
+	inativation.append_logs(entries)
+
+	results = [
+		estado_por_serial.get(s, {"serial": s, "machine_id": None, "status": NO_ENCONTRADA, "is_active": None})
+		for s in pedidos
+	]
+	return {
+		"action": "activate" if activar else "inactivate",
+		"batch_token": batch_token,
+		"changed": int(cambiar.sum()),
+		"results": results,
+	}
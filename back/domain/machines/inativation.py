@@ -4,13 +4,15 @@ Este módulo ofrece funciones para:
 - Inicializar CSVs locales en la carpeta `back/domain/machines`.
 - Crear/leer/guardar máquinas en `machines.csv`.
 - Inactivar una máquina por `serial` (borrado lógico) y registrar
-  la acción en `logs.csv`.
+  la acción en la bitácora de auditoría (`data/audit/`, ver
+  `back/storage/audit_log.py`).
 - Exportar listados de máquinas activas/inactivas.
 - Generar una "variable de inactivación" única.
 
 Los CSVs creados por este módulo (si no existen) son:
 - machines.csv: lista de máquinas y metadatos.
-- logs.csv: historial de acciones (inactivaciones, modificaciones).
+- logs.csv: historial antiguo de acciones; ya no se escribe, su contenido
+  se importa a la bitácora de auditoría la primera vez que se usa.
 - machines_status.csv: listado simple de id/serial/is_active (útil para reportes).
 
 Se diseñó para que las pruebas se puedan ejecutar localmente con
@@ -23,10 +25,12 @@ from __future__ import annotations
 import os
 import uuid
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 import pandas as pd
 
+from back.storage.audit_log import audit_log
+
 
 BASE_DIR = os.path.dirname(__file__)
 # Guardar CSVs en la carpeta raíz `data/` para centralizar los datos
@@ -96,22 +100,70 @@ def save_machines_df(df: pd.DataFrame) -> None:
 	df.to_csv(MACHINES_CSV, index=False)
 
 
+def maquinas_activas(df: pd.DataFrame) -> pd.Series:
+	"""Máscara de máquinas activas, con la misma regla para operaciones individuales y masivas.
+
+	- Manda `is_active`: activa salvo que diga "false".
+	- Si `is_active` está vacío (máquinas creadas por POST /machines, que solo
+	  escriben `estado`), se usa `estado` con la misma regla.
+	- Sin ninguno de los dos valores, la máquina se considera activa.
+	"""
+	def _texto(col: str) -> pd.Series:
+		if col not in df.columns:
+			return pd.Series("", index=df.index)
+		return df[col].fillna("").astype(str).str.strip().str.lower()
+
+	is_active, estado = _texto("is_active"), _texto("estado")
+	valor = is_active.where(is_active != "", estado)
+	return valor != "false"
+
+
 def append_log(entry: Dict[str, Any]) -> None:
-	ensure_data_files()
-	logs_df = pd.read_csv(LOGS_CSV, dtype=str)
-	for k in entry.keys():
-		if k not in logs_df.columns:
-			logs_df[k] = ""
-	logs_df = pd.concat([logs_df, pd.DataFrame([entry])], ignore_index=True)
-	logs_df.to_csv(LOGS_CSV, index=False)
-
-
-def update_status_csv() -> None:
-	df = load_machines_df()
-	if "is_active" not in df.columns:
-		df["is_active"] = "True"
+	"""Registra la acción en la bitácora de auditoría (solo anexa una línea)."""
+	audit_log.append(entry)
+
+
+def append_logs(entries: List[Dict[str, Any]]) -> None:
+	"""Registra varias acciones con una sola escritura (operaciones masivas)."""
+	audit_log.append_many(entries)
+
+
+# Última proyección escrita en machines_status.csv (texto CSV) y firma del
+# archivo en ese momento; sirve para no reescribirlo si nada cambió.
+_status_cache: Dict[str, Any] = {"text": None, "sig": None}
+
+
+def _status_signature():
+	try:
+		st = os.stat(MACHINES_STATUS_CSV)
+	except FileNotFoundError:
+		return None
+	return (st.st_mtime_ns, st.st_size)
+
+
+def update_status_csv(df: Optional[pd.DataFrame] = None) -> None:
+	"""Regenera machines_status.csv (id, serial, is_active).
+
+	- Si quien llama ya tiene el DataFrame de máquinas actualizado, lo pasa
+	  en `df` y NO se vuelve a leer machines.csv.
+	- Si la proyección resultante es igual a la última escrita (y nadie tocó
+	  el archivo desde entonces), no se escribe nada.
+	- Operaciones masivas llaman una sola vez al final -> una sola escritura.
+
+	El contenido del archivo es el mismo de siempre (mismas columnas y filas).
+	"""
+	if df is None:
+		df = load_machines_df()
 	status = df[[col for col in ["id", "serial", "is_active"] if col in df.columns]].copy()
-	status.to_csv(MACHINES_STATUS_CSV, index=False)
+	if "is_active" not in status.columns:
+		status["is_active"] = "True"
+	text = status.to_csv(index=False)
+	if text == _status_cache["text"] and _status_signature() == _status_cache["sig"]:
+		return
+	with open(MACHINES_STATUS_CSV, "w", encoding="utf-8", newline="") as f:
+		f.write(text)
+	_status_cache["text"] = text
+	_status_cache["sig"] = _status_signature()
 
 
 def crear_variable_inactivacion(serial: str) -> str:
@@ -127,7 +179,7 @@ def inactivar_maquina_por_serial(
 	"""Marca una máquina como inactiva (borrado lógico) por su serial.
 
 	- Conserva la fila en `machines.csv` pero marca `is_active` = False.
-	- Agrega una entrada en `logs.csv` con token de inactivación.
+	- Agrega una entrada en la bitácora de auditoría con token de inactivación.
 	- Actualiza `machines_status.csv`.
 
 	Retorna la fila actualizada como dict.
@@ -150,7 +202,7 @@ def inactivar_maquina_por_serial(
 		if col not in df.columns:
 			df[col] = "" if default == "" else default
 
-	if str(df.at[idx, "is_active"]).strip().lower() == "false":
+	if not maquinas_activas(df.loc[[idx]]).iat[0]:
 		# Ya inactiva: registrar intento en logs y retornar
 		log_entry = {
 			"timestamp": timestamp,
@@ -191,7 +243,7 @@ def inactivar_maquina_por_serial(
 		"note": "",
 	}
 	append_log(log_entry)
-	update_status_csv()
+	update_status_csv(df)
 
 	row = df.loc[idx].to_dict()
 	clean_row = {k: ("" if pd.isna(v) else v) for k, v in row.items()}
@@ -1,17 +1,23 @@
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
+import uuid
 
 import pandas as pd
 
 from back.storage.places_repo import PlaceStorage
 from back.storage.machines_repo import MachinesRepo
 from back.models.places import PlaceOut, PlaceIn
+from back.domain.machines import inativation
 
 
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 PLACES_CSV = DATA_DIR / "places.csv"
 
+# Acciones de bitácora para la inactivación en cascada y su reversa
+CASCADE_INACTIVATION = "inactivate_casino_cascade"
+CASCADE_RESTORE = "restore_casino_cascade"
+
 
 class CasinoManagement:
     """Operaciones de gestión de casinos (alta, modificación, inactivación, consultas).
@@ -104,6 +110,188 @@ class CasinoManagement:
         """Marca un casino como inactivo. Reusa la función de PlaceStorage."""
         return PlaceStorage.inactivar(casino_id, actor=actor)
 
+    @staticmethod
+    def inactivar_casino_en_cascada(casino_id: int, actor: str = "system", motivo: Optional[str] = None) -> dict:
+        """Inactiva el casino y TODAS sus máquinas en una sola operación.
+
+        - machines.csv y machines_status.csv se escriben una vez (todas las
+          máquinas del casino juntas), places.csv una vez, después. Si falla
+          la escritura de places.csv se restaura machines.csv y se relanza.
+        - "Activa" con la regla de la inactivación individual
+          (`inativation.maquinas_activas`: is_active vacío -> estado).
+        - Se anexa UNA entrada de auditoría con el estado previo de cada
+          máquina; `revertir_inactivacion_en_cascada` la usa para restaurar.
+
+        - Un casino ya inactivo se rechaza: una segunda cascada (reintento,
+          doble clic) registraría todas las máquinas como inactivas y la
+          reversa por defecto no restauraría nada.
+
+        Retorna {"casino_id", "batch_token", "machines_inactivated", "machines_total"}.
+        Lanza KeyError si el casino no existe y ValueError si ya está inactivo.
+        """
+        casino = PlaceStorage.obtener_por_id(int(casino_id))
+        if casino is None:
+            raise KeyError(f"No existe un casino con ID {casino_id}")
+        if str(casino.get("estado", "")).strip().lower() == "false":
+            raise ValueError(f"El casino {casino_id} ya está inactivo")
+
+        df = inativation.load_machines_df()
+        original = df.copy()  # para restaurar machines.csv si falla places.csv
+        for col, default in (("is_active", "True"), ("updated_at", ""), ("updated_by", "")):
+            if col not in df.columns:
+                df[col] = default
+
+        del_casino = pd.to_numeric(df["casino_id"], errors="coerce") == int(casino_id)
+        activa = inativation.maquinas_activas(df)
+        cambiar = del_casino & activa
+        timestamp = inativation._now()
+
+        # Estado previo de cada máquina del casino (para poder revertir)
+        prior_states = [
+            {"machine_id": str(mid), "serial": str(serial), "is_active": bool(act)}
+            for mid, serial, act in zip(
+                df.loc[del_casino, "id"], df.loc[del_casino, "serial"], activa[del_casino]
+            )
+        ]
+
+        if cambiar.any():
+            df.loc[cambiar, "is_active"] = "False"
+            if "estado" in df.columns:
+                df.loc[cambiar, "estado"] = "False"
+            df.loc[cambiar, "updated_at"] = timestamp
+            df.loc[cambiar, "updated_by"] = actor
+            inativation.save_machines_df(df)
+            inativation.update_status_csv(df)
+
+        try:
+            PlaceStorage.inactivar(int(casino_id), actor=actor)
+        except Exception:
+            if cambiar.any():
+                CasinoManagement._restaurar_maquinas(original)
+            raise
+
+        batch_token = uuid.uuid4().hex
+        inativation.append_log({
+            "timestamp": timestamp,
+            "action": CASCADE_INACTIVATION,
+            "machine_id": "",
+            "serial": "",
+            "inactivation_token": batch_token,
+            "motivo": motivo or "inactivacion_casino",
+            "actor": actor,
+            "note": "",
+            "casino_id": int(casino_id),
+            "batch_token": batch_token,
+            "prior_states": prior_states,
+        })
+
+        return {
+            "casino_id": int(casino_id),
+            "batch_token": batch_token,
+            "machines_inactivated": int(cambiar.sum()),
+            "machines_total": int(del_casino.sum()),
+        }
+
+    @staticmethod
+    def revertir_inactivacion_en_cascada(
+        casino_id: int, actor: str = "system", batch_token: Optional[str] = None
+    ) -> dict:
+        """Reactiva el casino y devuelve sus máquinas al estado que tenían
+        antes de la inactivación en cascada (leído de la bitácora).
+
+        - Sin `batch_token` se revierte la última inactivación en cascada del
+          casino, siempre que no haya sido revertida ya.
+        - Las máquinas que estaban inactivas antes de la cascada siguen inactivas.
+        - Mismo orden y rollback que la inactivación: machines.csv primero y,
+          si falla places.csv, se restaura machines.csv.
+
+        Lanza KeyError si el casino no existe y ValueError si no hay nada que revertir.
+        """
+        if PlaceStorage.obtener_por_id(int(casino_id)) is None:
+            raise KeyError(f"No existe un casino con ID {casino_id}")
+
+        def _del_casino(entry: dict) -> bool:
+            return (
+                entry.get("action") in (CASCADE_INACTIVATION, CASCADE_RESTORE)
+                and str(entry.get("casino_id")) == str(int(casino_id))
+            )
+
+        registro = None
+        cursor = None
+        while registro is None:
+            entries, cursor = inativation.audit_log.query(match=_del_casino, cursor=cursor, limit=50)
+            for entry in entries:
+                if batch_token is None:
+                    # La más reciente decide: si ya fue revertida, no hay pendiente
+                    if entry["action"] == CASCADE_RESTORE:
+                        raise ValueError("La última inactivación en cascada de este casino ya fue revertida")
+                    registro = entry
+                    break
+                if entry.get("batch_token") == batch_token:
+                    if entry["action"] == CASCADE_RESTORE:
+                        raise ValueError(f"La inactivación {batch_token} ya fue revertida")
+                    registro = entry
+                    break
+            if cursor is None:
+                break
+        if registro is None:
+            raise ValueError("No hay una inactivación en cascada para revertir en este casino")
+
+        previos = {p["machine_id"]: p["is_active"] for p in registro.get("prior_states", [])}
+
+        df = inativation.load_machines_df()
+        original = df.copy()  # para restaurar machines.csv si falla places.csv
+        for col, default in (("is_active", "True"), ("updated_at", ""), ("updated_by", "")):
+            if col not in df.columns:
+                df[col] = default
+        ids = pd.to_numeric(df["id"], errors="coerce").astype("Int64").astype(str)
+        debe_estar = ids.map(previos)  # NaN para máquinas que no estaban en el registro
+        estaba_activa = debe_estar.eq(True)
+        restaurar = estaba_activa & ~inativation.maquinas_activas(df)
+        timestamp = inativation._now()
+
+        if restaurar.any():
+            df.loc[restaurar, "is_active"] = "True"
+            if "estado" in df.columns:
+                df.loc[restaurar, "estado"] = "True"
+            df.loc[restaurar, "updated_at"] = timestamp
+            df.loc[restaurar, "updated_by"] = actor
+            inativation.save_machines_df(df)
+            inativation.update_status_csv(df)
+
+        try:
+            PlaceStorage.activar(int(casino_id), actor=actor)
+        except Exception:
+            if restaurar.any():
+                CasinoManagement._restaurar_maquinas(original)
+            raise
+
+        inativation.append_log({
+            "timestamp": timestamp,
+            "action": CASCADE_RESTORE,
+            "machine_id": "",
+            "serial": "",
+            "inactivation_token": "",
+            "motivo": "reactivacion_casino",
+            "actor": actor,
+            "note": "",
+            "casino_id": int(casino_id),
+            "batch_token": registro["batch_token"],
+            "restored_machine_ids": ids[restaurar].tolist(),
+        })
+
+        return {
+            "casino_id": int(casino_id),
+            "batch_token": registro["batch_token"],
+            "machines_restored": int(restaurar.sum()),
+        }
+
+    @staticmethod
+    def _restaurar_maquinas(original: pd.DataFrame) -> None:
+        """Vuelve machines.csv (y machines_status.csv) al contenido previo a la cascada."""
+        inativation.save_machines_df(original)
+        inativation.update_status_csv(original)
+
     @staticmethod
     def listar_maquinas(casino_id: int, only_active: bool = True) -> List[dict]:
         """Devuelve la lista de máquinas asociadas a un casino.
@@ -40,6 +40,13 @@ from .api.router import api_router  # Router principal de la API
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi import Request
 from back.api.deps import oauth2_scheme, decodificar_jwt
+from back.api.responses import CompresionMiddleware
+from back.core import settings
+from back.core import metrics
+import time
+from functools import lru_cache
+from fastapi.responses import PlainTextResponse
+from starlette.routing import Match
 
 
 class AuthMiddleware(BaseHTTPMiddleware):
@@ -60,6 +67,55 @@ class AuthMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         return response
 
+class MetricsMiddleware:
+    """
+    Métricas HTTP por ruta (ver back/core/metrics.py): conteo por estado,
+    latencia y peticiones en vuelo. Middleware ASGI puro (sin BaseHTTPMiddleware)
+    para no sumar costo a cada petición.
+    """
+
+    def __init__(self, app, router):
+        self.app = app
+        self.router = router
+        # La plantilla se resuelve antes de ejecutar la ruta (para el gauge en
+        # vuelo); caché acotado porque las URLs llevan ids.
+        self._plantilla = lru_cache(maxsize=4096)(self._resolver)
+
+    def _resolver(self, method: str, path: str) -> str:
+        scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+        parcial = None
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and parcial is None:
+                parcial = route.path  # ruta existe con otro método (405)
+        return parcial or "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        route = self._plantilla(method, scope["path"])
+        status_code = 500
+
+        async def send_con_estado(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.http_in_flight.inc(method=method, route=route)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_con_estado)
+        finally:
+            metrics.http_latency.observe(time.perf_counter() - inicio, method=method, route=route)
+            metrics.http_requests.inc(method=method, route=route, status=status_code)
+            metrics.http_in_flight.dec(method=method, route=route)
+
+
 def create_app() -> FastAPI:
     """
     Factory para crear y configurar la aplicación FastAPI.
@@ -79,18 +135,36 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Cabeceras propias que el front necesita leer (paginación por cursor, GET condicional)
+        expose_headers=["X-Next-Cursor", "ETag"],
+    )
+    # gzip para respuestas grandes (reportes, listados de contadores)
+    app.add_middleware(
+        CompresionMiddleware,
+        minimum_size=settings.RESPONSE_GZIP_MIN_BYTES,
+        compresslevel=settings.RESPONSE_GZIP_LEVEL,
     )
 
-    # Endpoint de salud simple
+    # Endpoint de salud simple (async: corre en el event loop, sin esperar
+    # hilos libres detrás de reportes pesados)
     @app.get("/health")
-    def health() -> dict[str, str]:
+    async def health() -> dict[str, str]:
         """Simple health check endpoint."""
         return {"status": "ok"}
 
+    if settings.METRICS_ENABLED:
+        # Formato de texto de Prometheus; sin CSV ni autenticación, como /health
+        @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+        async def metrics_endpoint() -> PlainTextResponse:
+            return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
     # Incluir el router principal bajo /api
     app.include_router(api_router, prefix="/api")
     # Agregar middleware de autenticación (no obliga, facilita acceso al request)
     app.add_middleware(AuthMiddleware)
+    # Métricas: el más externo, mide la petición completa (auth, gzip incluidos)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, router=app.router)
     return app
 
 # Instancia de aplicación para Uvicorn
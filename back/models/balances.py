@@ -99,6 +99,8 @@ class MachineBalanceOut(BaseModel):
     generated_at: str
     generated_by: str
     locked: bool
+    # Hallazgos del escaneo de contadores dentro del periodo (ver /balances/anomalies)
+    anomalias: int = 0
 
 
 # ============ MODELOS PARA CASINO BALANCES ============
@@ -368,3 +370,167 @@ class ParticipationReportOut(BaseModel):
     generated_by: str
 
 
+# ============ MODELOS PARA ANOMALÍAS DE CONTADORES ============
+
+class CounterAnomalyOut(BaseModel):
+    """Hallazgo del escaneo: salto negativo o atípico de un medidor entre dos lecturas."""
+    machine_id: int
+    casino_id: Optional[int] = None
+    meter: str  # in_amount | out_amount | jackpot_amount | billetero_amount
+    kind: str  # negative | outlier
+    at: str
+    prev_at: Optional[str] = None
+    value: Optional[float] = None
+    prev_value: Optional[float] = None
+    delta: Optional[float] = None
+    counter_id: Optional[int] = None
+    prev_counter_id: Optional[int] = None
+    scanned_at: str
+
+    @field_validator('casino_id', 'prev_at', 'value', 'prev_value', 'delta', 'counter_id', 'prev_counter_id', mode='before')
+    def empty_to_none(cls, v):
+        """El CSV guarda los vacíos como ''."""
+        return None if v == "" else v
+
+
+class AnomalyScanOut(BaseModel):
+    """Resumen de una corrida del escaneo de anomalías."""
+    scanned_at: str
+    readings: int
+    machines: int
+    findings: int
+    negative: int
+    outlier: int
+    partitions: int
+
+
+# ============ MODELOS PARA SERIES DE TIEMPO ============
+
+class TimeSeriesPoint(BaseModel):
+    """Totales de un tramo (día, semana o mes) de la serie."""
+    period_start: str
+    period_end: str
+    in_total: float
+    out_total: float
+    jackpot_total: float
+    billetero_total: float
+    utilidad_total: float  # IN - (OUT + JACKPOT)
+    machines_with_data: int
+
+
+class TimeSeriesOut(BaseModel):
+    """Serie de tiempo de cuadres para una máquina, casino o grupo marca/modelo."""
+    granularidad: str  # day | week | month
+    period_start: str
+    period_end: str
+    machines: int  # Máquinas activas dentro del alcance
+    points: List[TimeSeriesPoint]
+
+
+# ============ MODELOS PARA REPORTE COMPARATIVO ============
+
+class Variacion(BaseModel):
+    """Diferencia del periodo actual contra otro periodo."""
+    delta: float
+    pct: Optional[float] = None  # None si el periodo comparado fue 0
+
+
+class PeriodTotals(BaseModel):
+    """Totales consolidados de uno de los periodos comparados."""
+    period_start: str
+    period_end: str
+    category_totals: CategoryTotals
+    machines_with_data: int
+
+
+class CategoryVariation(BaseModel):
+    """Variación por categoría contra un periodo comparado."""
+    period_start: str
+    period_end: str
+    in_total: Variacion
+    out_total: Variacion
+    jackpot_total: Variacion
+    billetero_total: Variacion
+    utilidad_final: Variacion
+
+
+class MachinePeriodTotals(BaseModel):
+    """Totales de una máquina en uno de los periodos."""
+    in_total: float
+    out_total: float
+    jackpot_total: float
+    billetero_total: float
+    utilidad: float
+    has_data: bool
+
+
+class MachineVariation(BaseModel):
+    """Variación de una máquina contra un periodo comparado."""
+    period_start: str
+    period_end: str
+    in_total: Variacion
+    out_total: Variacion
+    jackpot_total: Variacion
+    billetero_total: Variacion
+    utilidad: Variacion
+
+
+class MachineComparison(BaseModel):
+    """Máquina con sus totales por periodo y sus variaciones."""
+    machine_id: int
+    machine_marca: Optional[str] = None
+    machine_modelo: Optional[str] = None
+    machine_serial: Optional[str] = None
+    machine_asset: Optional[str] = None
+    denominacion: float
+    periodos: List[MachinePeriodTotals]  # Mismo orden que ComparativeReport.periodos
+    variaciones: List[MachineVariation]  # Una por periodo comparado
+
+
+class ComparativeReport(BaseModel):
+    """
+    Reporte comparativo: el primer periodo es el actual y se compara
+    contra cada uno de los siguientes.
+    """
+    casino_id: Optional[int] = None
+    casino_nombre: Optional[str] = None
+    machine_id: Optional[int] = None
+    period_start: str
+    period_end: str
+    periodos: List[PeriodTotals]
+    category_deltas: List[CategoryVariation]
+    machines_comparison: List[MachineComparison]
+    total_machines: int
+    machines_with_data: int
+    generated_at: str
+    generated_by: str
+
+
+# ============ MODELOS PARA RANKING DE MÁQUINAS ============
+
+class LeaderboardRow(BaseModel):
+    """Máquina dentro del ranking con sus totales del periodo."""
+    rank: int
+    machine_id: int
+    casino_id: Optional[int] = None
+    marca: Optional[str] = None
+    modelo: Optional[str] = None
+    serial: Optional[str] = None
+    asset: Optional[str] = None
+    in_total: float
+    out_total: float
+    jackpot_total: float
+    billetero_total: float
+    utilidad_total: float
+
+
+class LeaderboardOut(BaseModel):
+    """Top / bottom N máquinas por una métrica en un periodo."""
+    metric: str  # utilidad | jackpot | billetero | in | out
+    orden: str  # top | bottom
+    n: int
+    period_start: str
+    period_end: str
+    fuente: str  # counters | daily (de dónde salieron los totales)
+    machines_considered: int
+    rows: List[LeaderboardRow]
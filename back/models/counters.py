@@ -71,9 +71,15 @@ class CounterUpdate(BaseModel):
 	Nota sobre 'at':
 	- Si NO se incluye 'at': modifica TODOS los contadores de esa máquina en la fecha de la URL
 	- Si SÍ se incluye 'at': modifica SOLO el contador con esa fecha/hora exacta
+
+	Nota sobre 'fecha':
+	- Si NO se incluye: se usa la fecha de la URL.
+	- Si SÍ se incluye: la corrección aplica a ese día. Así un mismo lote puede
+	  corregir varios días (una sola escritura del CSV).
 	"""
 
 	machine_id: int = Field(..., ge=1, description="ID de la máquina a modificar")
+	fecha: Optional[date] = Field(None, description="Día del contador si difiere del de la URL (lotes de varios días)")
 	at: Optional[str] = Field(None, description="Fecha/hora específica para filtrar un único contador (opcional)")
 	in_amount: Optional[float] = Field(None, ge=0.0)
 	out_amount: Optional[float] = Field(None, ge=0.0)
@@ -139,3 +145,11 @@ class MachineSimple(BaseModel):
 class CounterOutWithMachine(CounterOut):
 	"""Salida de contador que incluye la máquina asociada."""
 	machine: MachineSimple | None = None
+	# Avisos no bloqueantes (p. ej. un medidor menor que en la última lectura)
+	warnings: List[str] = []
+
+
+class MachineLatestReading(MachineSimple):
+	"""Máquina de un casino junto con su última lectura de contadores (si tiene)."""
+	is_active: bool | None = None
+	latest: CounterOut | None = None
@@ -0,0 +1,38 @@
+# -------------------------------------------
+# back/models/logs.py
+# Propósito:
+#   - Contrato Pydantic de salida para la bitácora de auditoría (GET /logs).
+#
+# Entrada de bitácora (data/audit/*.jsonl):
+#   - seq: int (orden de registro, creciente)
+#   - timestamp: str (datetime local)
+#   - action: str (inactivate_machine, activate_machine, intentos, ...)
+#   - machine_id, serial, inactivation_token, motivo, actor, note: str
+#
+# Consideraciones:
+#   - Se permiten campos extra: algunas acciones guardan datos propios
+#     (p. ej. acciones masivas) y no deben perderse al consultarlas.
+# -------------------------------------------
+
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+class AuditLogOut(BaseModel):
+    """Entrada de la bitácora de auditoría."""
+    seq: int
+    timestamp: str = ""
+    action: str = ""
+    machine_id: Optional[str] = ""
+    serial: Optional[str] = ""
+    inactivation_token: Optional[str] = ""
+    motivo: Optional[str] = ""
+    actor: Optional[str] = ""
+    note: Optional[str] = ""
+
+    model_config = ConfigDict(extra="allow")
+
+    @field_validator("machine_id", "serial", "inactivation_token", "motivo", "actor", "note", mode="before")
+    def _to_str(cls, v):
+        # machine_id llega como int o str según quién escribió la entrada
+        return "" if v is None else str(v)
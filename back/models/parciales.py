@@ -0,0 +1,33 @@
+# -------------------------------------------
+# back/models/parciales.py
+# Propósito:
+#   - Modelos de salida "parciales" para sparse fieldsets (?fields=id,serial):
+#     el mismo modelo <Entidad>Out pero solo con los campos pedidos.
+#
+# Diseño:
+#   - modelo_parcial(MachineOut, ["id", "serial"]) crea (una vez, con caché)
+#     un modelo con esos campos, en ese orden, con los mismos tipos y
+#     validaciones (Field(ge=0), defaults...).
+#   - Sin campos devuelve el modelo completo: el camino normal no cambia.
+# -------------------------------------------
+
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, create_model
+
+
+@lru_cache(maxsize=256)
+def _crear_parcial(modelo: Type[BaseModel], campos: Tuple[str, ...]) -> Type[BaseModel]:
+    definiciones = {c: (modelo.model_fields[c].annotation, modelo.model_fields[c]) for c in campos}
+    return create_model(f"{modelo.__name__}Parcial", __config__=modelo.model_config, **definiciones)
+
+
+def modelo_parcial(modelo: Type[BaseModel], campos: Optional[Sequence[str]]) -> Type[BaseModel]:
+    """
+    Modelo con solo `campos` (ya validados contra modelo.model_fields).
+    Retorna `modelo` tal cual si campos es None o vacío.
+    """
+    if not campos:
+        return modelo
+    return _crear_parcial(modelo, tuple(campos))
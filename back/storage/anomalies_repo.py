@@ -0,0 +1,118 @@
+# -------------------------------------------
+# back/storage/anomalies_repo.py
+# Propósito:
+#   - Persistir y consultar los hallazgos del escaneo de anomalías de
+#     contadores (data/counter_anomalies.csv).
+#
+# Notas:
+#   - El escaneo reemplaza la tabla completa: se escribe a un archivo
+#     temporal y se renombra, así los lectores nunca ven una tabla a medias.
+#   - La tabla es chica comparada con counters.csv; se mantiene una copia en
+#     memoria que solo se relee cuando el archivo cambia (mtime/tamaño).
+# -------------------------------------------
+
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from back.core.metrics import registrar_cache
+from back.storage import csv_io
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+ANOMALIES_CSV = DATA_DIR / "counter_anomalies.csv"
+
+ANOMALY_COLUMNS = [
+    "machine_id",
+    "casino_id",
+    "meter",
+    "kind",
+    "at",
+    "prev_at",
+    "value",
+    "prev_value",
+    "delta",
+    "counter_id",
+    "prev_counter_id",
+    "scanned_at",
+]
+
+
+class AnomaliesRepo:
+    """Tabla de hallazgos (saltos negativos o atípicos por medidor)."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = Path(path) if path is not None else None
+        self._df: Optional[pd.DataFrame] = None
+        self._sig = None
+
+    @property
+    def path(self) -> Path:
+        # Se evalúa en cada uso para respetar rutas parcheadas en pruebas
+        return self._path if self._path is not None else ANOMALIES_CSV
+
+    def _signature(self):
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (str(self.path), st.st_mtime_ns, st.st_size)
+
+    def _frame(self) -> pd.DataFrame:
+        sig = self._signature()
+        registrar_cache("counter_anomalies", self._df is not None and sig == self._sig)
+        if self._df is None or sig != self._sig:
+            if sig is None:
+                df = pd.DataFrame(columns=ANOMALY_COLUMNS)
+            else:
+                df = csv_io.read_csv(self.path, dtype=str).fillna("")
+            self._df = df
+            self._sig = sig
+        return self._df
+
+    def replace_all(self, parts: Iterable[pd.DataFrame]) -> int:
+        """
+        Reemplaza la tabla con los bloques entregados (se escriben uno tras
+        otro, sin juntarlos en memoria). Retorna el número de filas escritas.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        total = 0
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            pd.DataFrame(columns=ANOMALY_COLUMNS).to_csv(f, index=False)
+            for part in parts:
+                if part.empty:
+                    continue
+                part.reindex(columns=ANOMALY_COLUMNS).to_csv(f, index=False, header=False)
+                total += len(part)
+        tmp.replace(self.path)
+        csv_io.registrar_escritura(self.path)
+        return total
+
+    def listar(
+        self,
+        machine_id: Optional[int] = None,
+        casino_id: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        kind: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Hallazgos filtrados; fechas 'YYYY-MM-DD' inclusivas sobre `at`."""
+        df = self._frame()
+        if df.empty:
+            return []
+        mask = pd.Series(True, index=df.index)
+        if machine_id is not None:
+            mask &= df["machine_id"] == str(machine_id)
+        if casino_id is not None:
+            mask &= df["casino_id"] == str(casino_id)
+        if date_from is not None:
+            mask &= df["at"].str[:10] >= date_from
+        if date_to is not None:
+            mask &= df["at"].str[:10] <= date_to
+        if kind is not None:
+            mask &= df["kind"] == kind
+        return df[mask].to_dict(orient="records")
+
+    def contar_maquina(self, machine_id: int, date_from: str, date_to: str) -> int:
+        """Cantidad de hallazgos de una máquina en un periodo (para los cuadres)."""
+        return len(self.listar(machine_id=machine_id, date_from=date_from, date_to=date_to))
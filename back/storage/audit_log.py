@@ -0,0 +1,316 @@
+# -------------------------------------------
+# back/storage/audit_log.py
+# Propósito:
+#   - Bitácora de auditoría de solo-anexar (activaciones, inactivaciones,
+#     intentos fallidos, etc.), en reemplazo de reescribir logs.csv completo
+#     en cada acción.
+#
+# Diseño:
+#   - Segmentos JSONL en data/audit/: audit-<primer_seq>.jsonl. Cada entrada
+#     lleva un `seq` creciente; anexar es escribir UNA línea al final.
+#   - Rotación: se abre un segmento nuevo cuando el actual supera
+#     AUDIT_SEGMENT_MAX_BYTES o tiene más de AUDIT_SEGMENT_MAX_AGE_SECONDS.
+#   - Índice sidecar (data/audit/index.json): por segmento, los valores
+#     distintos de machine_id, serial, actor y día. Solo se reescribe cuando
+#     aparece un valor nuevo, así que casi siempre anexar no lo toca.
+#   - Consulta: se descartan con el índice los segmentos que no pueden
+#     contener el filtro y se leen solo los restantes (del más nuevo al
+#     más viejo), paginando por cursor (= seq de la última entrada entregada).
+#
+# Migración:
+#   - Si no hay segmentos y existe el logs.csv histórico, sus filas se
+#     importan una vez al primer segmento para no perder el historial.
+# -------------------------------------------
+
+import base64
+import csv
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from back.core import settings
+from back.core.metrics import lock_medido
+
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+AUDIT_DIR = DATA_DIR / "audit"
+LEGACY_LOGS_CSV = DATA_DIR / "logs.csv"
+
+# Campos indexados en el sidecar (entrada -> valores distintos por segmento)
+INDEXED_FIELDS = ("machine_id", "serial", "actor", "day")
+
+
+def encode_log_cursor(seq: int) -> str:
+    return base64.urlsafe_b64encode(str(int(seq)).encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_log_cursor(cursor: str) -> int:
+    """Lanza ValueError si el cursor no es válido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii"))
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
+
+
+def _norm(value: Any) -> str:
+    """machine_id puede venir como 1, '1' o '1.0': se normaliza a texto."""
+    if value is None:
+        return ""
+    text = str(value).strip()
+    try:
+        as_float = float(text)
+        if as_float.is_integer():
+            return str(int(as_float))
+    except ValueError:
+        pass
+    return text
+
+
+def _entry_keys(entry: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "machine_id": _norm(entry.get("machine_id")),
+        "serial": _norm(entry.get("serial")),
+        "actor": _norm(entry.get("actor")),
+        "day": str(entry.get("timestamp") or "")[:10],
+    }
+
+
+class AuditLog:
+    """Bitácora segmentada de solo-anexar con índice sidecar."""
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_segment_bytes: Optional[int] = None,
+        max_segment_age_seconds: Optional[int] = None,
+        legacy_csv: Optional[Path] = LEGACY_LOGS_CSV,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = Path(directory) if directory is not None else AUDIT_DIR
+        self.max_segment_bytes = max_segment_bytes or settings.AUDIT_SEGMENT_MAX_BYTES
+        self.max_segment_age_seconds = max_segment_age_seconds or settings.AUDIT_SEGMENT_MAX_AGE_SECONDS
+        self.legacy_csv = legacy_csv
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Carga perezosa: nada se lee ni crea hasta el primer uso
+        self._loaded = False
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._last_seq = 0
+
+    # ----------------- rutas / persistencia -----------------
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / "index.json"
+
+    @staticmethod
+    def _segment_name(first_seq: int) -> str:
+        return f"audit-{first_seq:010d}.jsonl"
+
+    @staticmethod
+    def _segment_first_seq(name: str) -> int:
+        return int(name[len("audit-"):-len(".jsonl")])
+
+    def _segments(self) -> List[str]:
+        """Nombres de segmento ordenados del más viejo al más nuevo."""
+        return sorted(self._index.keys(), key=self._segment_first_seq)
+
+    def _save_index(self) -> None:
+        data = {
+            name: {
+                "created_at": meta["created_at"],
+                **{f: sorted(meta[f]) for f in INDEXED_FIELDS},
+            }
+            for name, meta in self._index.items()
+        }
+        tmp = self.index_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        tmp.replace(self.index_path)
+
+    def _read_segment(self, name: str) -> List[Dict[str, Any]]:
+        path = self.directory / name
+        if not path.exists():
+            return []
+        entries = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Línea cortada por un apagado a mitad de escritura
+                    continue
+        return entries
+
+    def _rebuild_index(self) -> None:
+        """Reconstruye el índice leyendo los segmentos (si el sidecar falta o está dañado)."""
+        self._index = {}
+        for path in sorted(self.directory.glob("audit-*.jsonl")):
+            meta = {"created_at": path.stat().st_mtime, **{f: set() for f in INDEXED_FIELDS}}
+            for entry in self._read_segment(path.name):
+                for f, v in _entry_keys(entry).items():
+                    meta[f].add(v)
+            self._index[path.name] = meta
+        self._save_index()
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                raw = json.load(f)
+            self._index = {
+                name: {"created_at": meta["created_at"], **{f: set(meta.get(f, [])) for f in INDEXED_FIELDS}}
+                for name, meta in raw.items()
+                if (self.directory / name).exists()
+            }
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            self._rebuild_index()
+
+        segments = self._segments()
+        if segments:
+            last = self._read_segment(segments[-1])
+            self._last_seq = max(
+                [int(e.get("seq", 0)) for e in last] + [self._segment_first_seq(segments[-1]) - 1]
+            )
+        self._loaded = True
+
+        if not segments:
+            self._import_legacy_csv()
+
+    def _import_legacy_csv(self) -> None:
+        """Importa una sola vez las filas del logs.csv histórico."""
+        if self.legacy_csv is None or not Path(self.legacy_csv).exists():
+            return
+        with open(self.legacy_csv, newline="", encoding="utf-8") as f:
+            rows = [{k: (v or "") for k, v in row.items()} for row in csv.DictReader(f)]
+        if rows:
+            self._append_many(rows)
+
+    # ----------------- escritura -----------------
+
+    def _current_segment(self, now: float) -> str:
+        """Segmento activo; abre uno nuevo si el actual excede tamaño o antigüedad."""
+        segments = self._segments()
+        if segments:
+            name = segments[-1]
+            path = self.directory / name
+            size = path.stat().st_size if path.exists() else 0
+            age = now - self._index[name]["created_at"]
+            if size < self.max_segment_bytes and age < self.max_segment_age_seconds:
+                return name
+        name = self._segment_name(self._last_seq + 1)
+        self._index[name] = {"created_at": now, **{f: set() for f in INDEXED_FIELDS}}
+        return name
+
+    def _append_many(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        now = self._clock()
+        name = self._current_segment(now)
+        meta = self._index[name]
+        # Segmento recién abierto: hay que registrarlo en el índice
+        index_changed = not (self.directory / name).exists()
+        stored = []
+        lines = []
+        for entry in entries:
+            self._last_seq += 1
+            record = {**entry, "seq": self._last_seq}
+            for f, v in _entry_keys(record).items():
+                if v not in meta[f]:
+                    meta[f].add(v)
+                    index_changed = True
+            lines.append(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            stored.append(record)
+        # Una sola escritura por lote (anexar)
+        with open(self.directory / name, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+        if index_changed:
+            self._save_index()
+        return stored
+
+    def append(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Anexa una entrada y la devuelve con su `seq` asignado."""
+        return self.append_many([entry])[0]
+
+    def append_many(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Anexa varias entradas con una sola escritura al segmento activo."""
+        if not entries:
+            return []
+        with lock_medido(self._lock, "audit_log"):
+            self._ensure_loaded()
+            return self._append_many(entries)
+
+    # ----------------- consulta -----------------
+
+    def _segment_may_match(self, meta: Dict[str, Any], filters: Dict[str, str],
+                           date_from: Optional[str], date_to: Optional[str]) -> bool:
+        for f, v in filters.items():
+            if v not in meta[f]:
+                return False
+        if date_from or date_to:
+            return any(
+                (not date_from or d >= date_from) and (not date_to or d <= date_to)
+                for d in meta["day"]
+            )
+        return True
+
+    def query(
+        self,
+        machine_id: Optional[Any] = None,
+        serial: Optional[str] = None,
+        actor: Optional[str] = None,
+        action: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        match: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Entradas de la más reciente a la más antigua.
+        Retorna (entradas, siguiente_cursor); el cursor es None al final.
+        Fechas en formato 'YYYY-MM-DD' (inclusive).
+        `match` es un filtro adicional por entrada (campos no indexados).
+        """
+        before = decode_log_cursor(cursor) if cursor else None
+        filters = {
+            f: _norm(v)
+            for f, v in (("machine_id", machine_id), ("serial", serial), ("actor", actor))
+            if v is not None and str(v).strip() != ""
+        }
+
+        with lock_medido(self._lock, "audit_log"):
+            self._ensure_loaded()
+            segments = [
+                name for name in self._segments()
+                if (before is None or self._segment_first_seq(name) < before)
+                and self._segment_may_match(self._index[name], filters, date_from, date_to)
+            ]
+
+        found: List[Dict[str, Any]] = []
+        for name in reversed(segments):
+            for entry in reversed(self._read_segment(name)):
+                if before is not None and int(entry.get("seq", 0)) >= before:
+                    continue
+                keys = _entry_keys(entry)
+                if any(keys[f] != v for f, v in filters.items()):
+                    continue
+                if action and entry.get("action") != action:
+                    continue
+                if date_from and keys["day"] < date_from:
+                    continue
+                if date_to and keys["day"] > date_to:
+                    continue
+                if match is not None and not match(entry):
+                    continue
+                found.append(entry)
+                if len(found) > limit:
+                    return found[:limit], encode_log_cursor(found[limit - 1]["seq"])
+        return found, None
+
+
+# Instancia compartida por el dominio y la API
+audit_log = AuditLog()
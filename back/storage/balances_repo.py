@@ -8,7 +8,10 @@
 
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+
+from back.storage import csv_io
+from back.storage.pagination import SortedCsvIndex
 
 # Rutas a los archivos CSV
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
@@ -16,11 +19,49 @@ MACHINE_BALANCES_CSV = DATA_DIR / "machine_balances.csv"
 CASINO_BALANCES_CSV = DATA_DIR / "casino_balances.csv"
 
 
+def _balance_mask(owner_col: str, owner_id: Optional[int], date_from: Optional[str], date_to: Optional[str]):
+    """Filtro vectorizado (mismas reglas que listar_*_balances) para la paginación por cursor."""
+    def mask(block: pd.DataFrame) -> pd.Series:
+        m = pd.Series(True, index=block.index)
+        if owner_id is not None:
+            m &= block[owner_col] == str(owner_id)
+        if date_from is not None:
+            m &= block['period_start'] >= date_from
+        if date_to is not None:
+            m &= block['period_end'] <= date_to
+        return m
+    return mask
+
+
+def _usecols(fields: Optional[List[str]], owner_col: str):
+    """usecols para read_csv: columnas pedidas + las que usan filtros y orden (None = todas)."""
+    if not fields:
+        return None
+    needed = set(fields) | {owner_col, 'period_start', 'period_end', 'generated_at', 'id'}
+    return lambda c: c in needed
+
+
+def _mas_recientes_primero(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Orden descendente por (generated_at, id numérico), el mismo de la
+    paginación por cursor (SortedCsvIndex recorrido al revés): con offset,
+    los empates de generated_at quedan siempre en el mismo orden.
+    """
+    orden = pd.DataFrame({
+        'k': df['generated_at'].fillna('').astype(str),
+        'i': pd.to_numeric(df['id'], errors='coerce').fillna(-1),
+    }, index=df.index)
+    return df.loc[orden.sort_values(['k', 'i'], ascending=False, kind='mergesort').index]
+
+
 class BalancesRepo:
     """Repositorio para gestionar balances de máquinas y casinos"""
     
     def __init__(self):
         self._ensure_files()
+        # Copias ordenadas por (generated_at, id) para paginación por cursor
+        self._sorted_machine = SortedCsvIndex(lambda: MACHINE_BALANCES_CSV, "generated_at")
+        self._sorted_casino = SortedCsvIndex(lambda: CASINO_BALANCES_CSV, "generated_at")
     
     def _ensure_files(self):
         """Crea los archivos CSV si no existen"""
@@ -33,7 +74,7 @@ class BalancesRepo:
                 'in_total', 'out_total', 'jackpot_total', 'billetero_total',
                 'utilidad_total', 'generated_at', 'generated_by', 'locked'
             ])
-            df.to_csv(MACHINE_BALANCES_CSV, index=False)
+            csv_io.write_csv(df, MACHINE_BALANCES_CSV, index=False)
         
         # Crear casino_balances.csv si no existe
         if not CASINO_BALANCES_CSV.exists():
@@ -42,7 +83,7 @@ class BalancesRepo:
                 'in_total', 'out_total', 'jackpot_total', 'billetero_total',
                 'utilidad_total', 'generated_at', 'generated_by', 'locked'
             ])
-            df.to_csv(CASINO_BALANCES_CSV, index=False)
+            csv_io.write_csv(df, CASINO_BALANCES_CSV, index=False)
     
     # ============ FUNCIONES PARA MACHINE BALANCES ============
     
@@ -52,10 +93,15 @@ class BalancesRepo:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         limit: Optional[int] = 100,
-        offset: int = 0
+        offset: int = 0,
+        fields: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
-        """Lista balances de máquinas con filtros opcionales"""
-        df = pd.read_csv(MACHINE_BALANCES_CSV, dtype=str)
+        """Lista balances de máquinas con filtros opcionales.
+
+        fields: solo se leen (usecols) y normalizan esas columnas, más las
+        necesarias para filtrar y ordenar.
+        """
+        df = csv_io.read_csv(MACHINE_BALANCES_CSV, dtype=str, usecols=_usecols(fields, 'machine_id'))
         
         if df.empty:
             return []
@@ -71,8 +117,8 @@ class BalancesRepo:
         if date_to is not None:
             df = df[df['period_end'] <= date_to]
         
-        # Ordenar por fecha de generación
-        df = df.sort_values(by='generated_at', ascending=False)
+        # Ordenar por fecha de generación (desempate por id, como el cursor)
+        df = _mas_recientes_primero(df)
         
         # Aplicar paginación
         if limit is not None:
@@ -80,16 +126,40 @@ class BalancesRepo:
         else:
             df = df.iloc[offset:]
         
-        # Convertir a lista de diccionarios
-        results = []
-        for _, row in df.iterrows():
-            results.append(self._normalize_machine_balance(row.to_dict()))
+        if fields:
+            df = df[[c for c in fields if c in df.columns]]
         
-        return results
+        # Convertir a lista de diccionarios
+        return [self._normalize_machine_balance(r, fields) for r in df.to_dict(orient='records')]
+    
+    def listar_machine_balances_page(
+        self,
+        machine_id: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Página de balances de máquinas, del más reciente al más antiguo por
+        (generated_at, id), usando cursor. Retorna (filas, siguiente_cursor).
+        fields: columnas a devolver (por defecto todas).
+        """
+        page, next_cursor = self._sorted_machine.page(
+            limit=limit,
+            cursor=cursor,
+            mask=_balance_mask('machine_id', machine_id, date_from, date_to),
+            descending=True
+        )
+        if fields:
+            page = page[[c for c in fields if c in page.columns]]
+        rows = [self._normalize_machine_balance(r, fields) for r in page.to_dict(orient='records')]
+        return rows, next_cursor
     
     def insertar_machine_balance(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Inserta un nuevo balance de máquina"""
-        df = pd.read_csv(MACHINE_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(MACHINE_BALANCES_CSV, dtype=str)
         
         # Generar ID si no existe
         if 'id' not in row or row['id'] is None:
@@ -98,13 +168,13 @@ class BalancesRepo:
         # Agregar fila
         new_row = pd.DataFrame([row])
         df = pd.concat([df, new_row], ignore_index=True)
-        df.to_csv(MACHINE_BALANCES_CSV, index=False)
+        csv_io.write_csv(df, MACHINE_BALANCES_CSV, index=False)
         
         return self.obtener_machine_balance_por_id(int(row['id']))
     
     def obtener_machine_balance_por_id(self, balance_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene un balance de máquina por ID"""
-        df = pd.read_csv(MACHINE_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(MACHINE_BALANCES_CSV, dtype=str)
         
         if df.empty:
             return None
@@ -118,7 +188,7 @@ class BalancesRepo:
     
     def lock_machine_balance(self, balance_id: int, actor: str, clock) -> bool:
         """Bloquea un balance de máquina"""
-        df = pd.read_csv(MACHINE_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(MACHINE_BALANCES_CSV, dtype=str)
         
         idx = df.index[df['id'] == str(balance_id)]
         
@@ -130,7 +200,7 @@ class BalancesRepo:
         df.at[i, 'generated_by'] = actor
         df.at[i, 'generated_at'] = clock().strftime("%Y-%m-%d %H:%M:%S")
         
-        df.to_csv(MACHINE_BALANCES_CSV, index=False)
+        csv_io.write_csv(df, MACHINE_BALANCES_CSV, index=False)
         return True
     
     def get_machine_balance_by_period(
@@ -140,7 +210,7 @@ class BalancesRepo:
         period_end: str
     ) -> Optional[Dict[str, Any]]:
         """Obtiene un balance de máquina por periodo"""
-        df = pd.read_csv(MACHINE_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(MACHINE_BALANCES_CSV, dtype=str)
         
         if df.empty:
             return None
@@ -158,7 +228,7 @@ class BalancesRepo:
     
     def update_machine_balance(self, balance_id: int, cambios: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Actualiza un balance de máquina existente"""
-        df = pd.read_csv(MACHINE_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(MACHINE_BALANCES_CSV, dtype=str)
         
         idx = df.index[df['id'] == str(balance_id)]
         
@@ -177,13 +247,13 @@ class BalancesRepo:
             if field in allowed_fields:
                 df.at[i, field] = str(value)
         
-        df.to_csv(MACHINE_BALANCES_CSV, index=False)
+        csv_io.write_csv(df, MACHINE_BALANCES_CSV, index=False)
         
         return self.obtener_machine_balance_por_id(balance_id)
     
     def _next_machine_balance_id(self) -> int:
         """Calcula el siguiente ID para machine_balances"""
-        df = pd.read_csv(MACHINE_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(MACHINE_BALANCES_CSV, dtype=str)
         
         if df.empty:
             return 1
@@ -191,30 +261,37 @@ class BalancesRepo:
         ids = [int(x) for x in df['id'].dropna() if str(x).strip() != '']
         return (max(ids) + 1) if ids else 1
     
-    def _normalize_machine_balance(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        """Normaliza tipos de datos de un balance de máquina"""
-        try:
-            row['id'] = int(row['id'])
-        except (ValueError, TypeError):
-            row['id'] = None
-        
-        try:
-            row['machine_id'] = int(row['machine_id'])
-        except (ValueError, TypeError):
-            row['machine_id'] = None
+    def _normalize_machine_balance(self, row: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Normaliza tipos de datos de un balance de máquina.
+        Con fields (proyección) solo se normalizan esas columnas.
+        """
+        def wanted(col: str) -> bool:
+            return not fields or col in fields
+        
+        for field in ['id', 'machine_id']:
+            if not wanted(field):
+                continue
+            try:
+                row[field] = int(row[field])
+            except (ValueError, TypeError):
+                row[field] = None
         
         for field in ['in_total', 'out_total', 'jackpot_total', 'billetero_total', 'utilidad_total']:
+            if not wanted(field):
+                continue
             try:
                 row[field] = float(row.get(field, 0))
             except (ValueError, TypeError):
                 row[field] = 0.0
         
         # Normalizar locked a booleano
-        locked_val = row.get('locked', 'False')
-        if isinstance(locked_val, str):
-            row['locked'] = locked_val.lower() == 'true'
-        else:
-            row['locked'] = bool(locked_val)
+        if wanted('locked'):
+            locked_val = row.get('locked', 'False')
+            if isinstance(locked_val, str):
+                row['locked'] = locked_val.lower() == 'true'
+            else:
+                row['locked'] = bool(locked_val)
         
         return row
     
@@ -226,10 +303,15 @@ class BalancesRepo:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         limit: Optional[int] = 100,
-        offset: int = 0
+        offset: int = 0,
+        fields: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
-        """Lista balances de casinos con filtros opcionales"""
-        df = pd.read_csv(CASINO_BALANCES_CSV, dtype=str)
+        """Lista balances de casinos con filtros opcionales.
+
+        fields: solo se leen (usecols) y normalizan esas columnas, más las
+        necesarias para filtrar y ordenar.
+        """
+        df = csv_io.read_csv(CASINO_BALANCES_CSV, dtype=str, usecols=_usecols(fields, 'place_id'))
         
         if df.empty:
             return []
@@ -245,8 +327,8 @@ class BalancesRepo:
         if date_to is not None:
             df = df[df['period_end'] <= date_to]
         
-        # Ordenar por fecha de generación
-        df = df.sort_values(by='generated_at', ascending=False)
+        # Ordenar por fecha de generación (desempate por id, como el cursor)
+        df = _mas_recientes_primero(df)
         
         # Aplicar paginación
         if limit is not None:
@@ -254,16 +336,40 @@ class BalancesRepo:
         else:
             df = df.iloc[offset:]
         
-        # Convertir a lista de diccionarios
-        results = []
-        for _, row in df.iterrows():
-            results.append(self._normalize_casino_balance(row.to_dict()))
+        if fields:
+            df = df[[c for c in fields if c in df.columns]]
         
-        return results
+        # Convertir a lista de diccionarios
+        return [self._normalize_casino_balance(r, fields) for r in df.to_dict(orient='records')]
+    
+    def listar_casino_balances_page(
+        self,
+        place_id: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Página de balances de casinos, del más reciente al más antiguo por
+        (generated_at, id), usando cursor. Retorna (filas, siguiente_cursor).
+        fields: columnas a devolver (por defecto todas).
+        """
+        page, next_cursor = self._sorted_casino.page(
+            limit=limit,
+            cursor=cursor,
+            mask=_balance_mask('place_id', place_id, date_from, date_to),
+            descending=True
+        )
+        if fields:
+            page = page[[c for c in fields if c in page.columns]]
+        rows = [self._normalize_casino_balance(r, fields) for r in page.to_dict(orient='records')]
+        return rows, next_cursor
     
     def insertar_casino_balance(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Inserta un nuevo balance de casino"""
-        df = pd.read_csv(CASINO_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(CASINO_BALANCES_CSV, dtype=str)
         
         # Generar ID si no existe
         if 'id' not in row or row['id'] is None:
@@ -272,13 +378,13 @@ class BalancesRepo:
         # Agregar fila
         new_row = pd.DataFrame([row])
         df = pd.concat([df, new_row], ignore_index=True)
-        df.to_csv(CASINO_BALANCES_CSV, index=False)
+        csv_io.write_csv(df, CASINO_BALANCES_CSV, index=False)
         
         return self.obtener_casino_balance_por_id(int(row['id']))
     
     def obtener_casino_balance_por_id(self, balance_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene un balance de casino por ID"""
-        df = pd.read_csv(CASINO_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(CASINO_BALANCES_CSV, dtype=str)
         
         if df.empty:
             return None
@@ -297,7 +403,7 @@ class BalancesRepo:
         period_end: str
     ) -> Optional[Dict[str, Any]]:
         """Obtiene un balance de casino por periodo"""
-        df = pd.read_csv(CASINO_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(CASINO_BALANCES_CSV, dtype=str)
         
         if df.empty:
             return None
@@ -315,7 +421,7 @@ class BalancesRepo:
     
     def update_casino_balance(self, balance_id: int, cambios: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Actualiza un balance de casino existente"""
-        df = pd.read_csv(CASINO_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(CASINO_BALANCES_CSV, dtype=str)
         
         idx = df.index[df['id'] == str(balance_id)]
         
@@ -334,13 +440,13 @@ class BalancesRepo:
             if field in allowed_fields:
                 df.at[i, field] = str(value)
         
-        df.to_csv(CASINO_BALANCES_CSV, index=False)
+        csv_io.write_csv(df, CASINO_BALANCES_CSV, index=False)
         
         return self.obtener_casino_balance_por_id(balance_id)
     
     def lock_casino_balance(self, balance_id: int, actor: str, clock) -> bool:
         """Bloquea un balance de casino"""
-        df = pd.read_csv(CASINO_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(CASINO_BALANCES_CSV, dtype=str)
         
         idx = df.index[df['id'] == str(balance_id)]
         
@@ -352,12 +458,12 @@ class BalancesRepo:
         df.at[i, 'generated_by'] = actor
         df.at[i, 'generated_at'] = clock().strftime("%Y-%m-%d %H:%M:%S")
         
-        df.to_csv(CASINO_BALANCES_CSV, index=False)
+        csv_io.write_csv(df, CASINO_BALANCES_CSV, index=False)
         return True
     
     def _next_casino_balance_id(self) -> int:
         """Calcula el siguiente ID para casino_balances"""
-        df = pd.read_csv(CASINO_BALANCES_CSV, dtype=str)
+        df = csv_io.read_csv(CASINO_BALANCES_CSV, dtype=str)
         
         if df.empty:
             return 1
@@ -365,30 +471,37 @@ class BalancesRepo:
         ids = [int(x) for x in df['id'].dropna() if str(x).strip() != '']
         return (max(ids) + 1) if ids else 1
     
-    def _normalize_casino_balance(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        """Normaliza tipos de datos de un balance de casino"""
-        try:
-            row['id'] = int(row['id'])
-        except (ValueError, TypeError):
-            row['id'] = None
-        
-        try:
-            row['place_id'] = int(row['place_id'])
-        except (ValueError, TypeError):
-            row['place_id'] = None
+    def _normalize_casino_balance(self, row: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Normaliza tipos de datos de un balance de casino.
+        Con fields (proyección) solo se normalizan esas columnas.
+        """
+        def wanted(col: str) -> bool:
+            return not fields or col in fields
+        
+        for field in ['id', 'place_id']:
+            if not wanted(field):
+                continue
+            try:
+                row[field] = int(row[field])
+            except (ValueError, TypeError):
+                row[field] = None
         
         for field in ['in_total', 'out_total', 'jackpot_total', 'billetero_total', 'utilidad_total']:
+            if not wanted(field):
+                continue
             try:
                 row[field] = float(row.get(field, 0))
             except (ValueError, TypeError):
                 row[field] = 0.0
         
         # Normalizar locked a booleano
-        locked_val = row.get('locked', 'False')
-        if isinstance(locked_val, str):
-            row['locked'] = locked_val.lower() == 'true'
-        else:
-            row['locked'] = bool(locked_val)
+        if wanted('locked'):
+            locked_val = row.get('locked', 'False')
+            if isinstance(locked_val, str):
+                row['locked'] = locked_val.lower() == 'true'
+            else:
+                row['locked'] = bool(locked_val)
         
         return row
 
@@ -1,7 +1,12 @@
 # Implementación de helper para counters usando pandas.
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple, Iterator
+
+from back.core.metrics import registrar_cache
+from back.storage import csv_io
+from back.storage.pagination import SortedCsvIndex
 
 CSV_PATH = Path("data/counters.csv")
 
@@ -21,10 +26,109 @@ EXPECTED_COLUMNS = [
 ]
 
 
+def _index_key(machine_id: Any, at: Any) -> Tuple[str, str]:
+    """
+    Normaliza una pareja (machine_id, at) para el índice de unicidad.
+    machine_id puede llegar como int, '1' o '1.0' (según cómo pandas escribió el CSV).
+    """
+    try:
+        m = str(int(float(machine_id)))
+    except (ValueError, TypeError):
+        m = str(machine_id).strip()
+    return m, str(at).strip()
+
+
+def _index_keys(df: pd.DataFrame) -> List[Tuple[str, str]]:
+    """Claves (machine_id, at) de un DataFrame, calculadas de forma vectorizada."""
+    if df.empty:
+        return []
+    m_num = pd.to_numeric(df["machine_id"], errors="coerce")
+    m_str = m_num.astype("Int64").astype(str).where(
+        m_num.notna(), df["machine_id"].astype(str).str.strip()
+    )
+    at_str = df["at"].astype(str).str.strip()
+    return list(zip(m_str.tolist(), at_str.tolist()))
+
+
+def _casino_date_mask(df: pd.DataFrame, casino_id: int, fecha_inicio: str, fecha_fin: str) -> pd.Series:
+    """
+    Filtro de reportes (casino + rango de días sobre 'at'), compartido por
+    list_by_casino_date e iter_by_casino_date para que consulta y exportación
+    devuelvan exactamente las mismas filas.
+    """
+    # Mismo criterio que int(float(casino_id)): trunca; lo no numérico no coincide
+    casino = np.trunc(pd.to_numeric(df["casino_id"], errors="coerce"))
+    row_at = df["at"].fillna("").astype(str)
+    row_date = row_at.str[:10]
+    return (
+        (casino == casino_id)
+        & (row_at.str.len() >= 10)
+        & (row_date >= fecha_inicio)
+        & (row_date <= fecha_fin)
+    )
+
+
+def _machine_keys(df: pd.DataFrame) -> pd.Series:
+    """machine_id normalizado ('1', no '1.0') para cada fila, vectorizado."""
+    m_num = pd.to_numeric(df["machine_id"], errors="coerce")
+    return m_num.astype("Int64").astype(str).where(
+        m_num.notna(), df["machine_id"].astype(str).str.strip()
+    )
+
+
+def _latest_from_df(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """
+    Última lectura por máquina (mayor 'at'; a igual 'at', mayor id).
+    Una sola ordenación + groupby, sin recorrer filas en Python.
+    """
+    if df.empty:
+        return {}
+    work = df.assign(
+        _m=_machine_keys(df).values,
+        _at=df["at"].fillna("").astype(str).str.strip().values,
+        _id=pd.to_numeric(df["id"], errors="coerce").fillna(-1).values,
+    )
+    last = (
+        work.sort_values(["_at", "_id"], kind="mergesort")
+        .groupby("_m", sort=False)
+        .tail(1)
+    )
+    rows = last[EXPECTED_COLUMNS].fillna("").astype(str).to_dict(orient="records")
+    return dict(zip(last["_m"].tolist(), rows))
+
+
+def _latest_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Fila insertada normalizada como quedaría al leerla del CSV (strings)."""
+    return {col: ("" if row.get(col) is None else str(row.get(col))) for col in EXPECTED_COLUMNS}
+
+
+def _is_newer(row: Dict[str, Any], current: Optional[Dict[str, Any]]) -> bool:
+    if current is None:
+        return True
+    def _id(r):
+        try:
+            return int(float(r.get("id")))
+        except (TypeError, ValueError):
+            return -1
+    return (str(row.get("at", "")).strip(), _id(row)) >= (str(current.get("at", "")).strip(), _id(current))
+
+
 class CountersRepo:
 
     def __init__(self):
         self._ensure_file()
+        # Índice de unicidad (machine_id, at). Se construye perezosamente y se
+        # reconstruye solo si el CSV fue modificado por otra instancia/proceso.
+        self._keys: Optional[Set[Tuple[str, str]]] = None
+        self._keys_sig: Optional[Tuple[int, int]] = None
+        # Última lectura por máquina (machine_id normalizado -> fila). Misma
+        # firma y ciclo de vida que el índice de unicidad.
+        self._latest: Optional[Dict[str, Dict[str, Any]]] = None
+        # Copia ordenada por (at, id) para paginación por cursor
+        self._sorted = SortedCsvIndex(lambda: CSV_PATH, "at")
+        # Agregado diario (primera/última lectura por máquina y día), ver daily_bounds()
+        self._bounds: Optional[pd.DataFrame] = None
+        self._bounds_sig: Optional[Tuple[int, int]] = None
 
     def _ensure_file(self):
         """Crea el CSV con las columnas si no existe."""
@@ -32,35 +136,116 @@ class CountersRepo:
             # Crear directorio si no existe
             CSV_PATH.parent.mkdir(parents=True, exist_ok=True)
             df = pd.DataFrame(columns=EXPECTED_COLUMNS)
-            df.to_csv(CSV_PATH, index=False)
+            csv_io.write_csv(df, CSV_PATH, index=False)
         else:
             # Si existe, aseguramos que tenga la columna casino_id (migración simple)
-            df = pd.read_csv(CSV_PATH)
+            df = csv_io.read_csv(CSV_PATH)
             if "casino_id" not in df.columns:
                 df["casino_id"] = ""
-                df.to_csv(CSV_PATH, index=False)
+                csv_io.write_csv(df, CSV_PATH, index=False)
 
-    def _read_df(self) -> pd.DataFrame:
+    def _read_df(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Leer el CSV y asegurar que tenga las columnas esperadas.
         Como estudiante: si no existe, devolvemos un DataFrame vacío con columnas.
+        columns: leer solo esas columnas (usecols); por defecto todas.
         """
+        columns = list(columns or EXPECTED_COLUMNS)
         if CSV_PATH.exists():
-            df = pd.read_csv(CSV_PATH, dtype=str)
+            wanted = set(columns)
+            df = csv_io.read_csv(CSV_PATH, dtype=str, usecols=lambda c: c in wanted)
         else:
-            df = pd.DataFrame(columns=EXPECTED_COLUMNS)
+            df = pd.DataFrame(columns=columns)
 
         # Asegurar que todas las columnas esperadas existan en el DataFrame
-        for col in EXPECTED_COLUMNS:
+        for col in columns:
             if col not in df.columns:
                 df[col] = None
-        return df[EXPECTED_COLUMNS]
+        return df[columns]
 
     def _write_df(self, df: pd.DataFrame) -> None:
         """
         Escribir DataFrame al CSV respetando el orden de columnas.
         """
-        df.to_csv(CSV_PATH, index=False)
+        in_sync = self._keys is not None and self._keys_sig == self._file_signature()
+        csv_io.write_csv(df, CSV_PATH, index=False)
+        # Si el índice estaba al día, quien escribe ya lo actualizó: solo
+        # registramos la nueva firma. Si no, se reconstruye en la próxima consulta.
+        if in_sync:
+            self._keys_sig = self._file_signature()
+        else:
+            self._keys = None
+            self._latest = None
+
+    # -------------- ÍNDICE DE UNICIDAD (machine_id, at) ---------------
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """Firma barata del CSV (mtime, tamaño) para detectar cambios externos."""
+        try:
+            st = CSV_PATH.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _keys_index(self) -> Set[Tuple[str, str]]:
+        """
+        Devuelve el set de claves (machine_id, at) existentes.
+        Solo relee el CSV si cambió desde la última vez (otra instancia escribió).
+        """
+        sig = self._file_signature()
+        hit = self._keys is not None and self._latest is not None and sig == self._keys_sig
+        registrar_cache("counters_keys", hit)
+        if not hit:
+            df = self._read_df()
+            self._keys = set(_index_keys(df))
+            self._latest = _latest_from_df(df)
+            self._keys_sig = sig
+        return self._keys
+
+    def _latest_index(self) -> Dict[str, Dict[str, Any]]:
+        """Mapa máquina -> última lectura, al día con el CSV."""
+        self._keys_index()
+        return self._latest
+
+    def _bump_latest(self, row: Dict[str, Any]) -> None:
+        """Actualiza el mapa si la lectura nueva es la más reciente de su máquina."""
+        latest = self._latest_index()
+        m = _index_key(row.get("machine_id"), "")[0]
+        if _is_newer(row, latest.get(m)):
+            latest[m] = _latest_row(row)
+
+    def _refresh_latest(self, df: pd.DataFrame, machine_ids: List[Any]) -> None:
+        """Recalcula la última lectura solo para las máquinas indicadas."""
+        latest = self._latest_index()
+        wanted = {_index_key(m, "")[0] for m in machine_ids}
+        subset = df[_machine_keys(df).isin(wanted)]
+        fresh = _latest_from_df(subset)
+        for m in wanted:
+            if m in fresh:
+                latest[m] = fresh[m]
+            else:
+                latest.pop(m, None)
+
+    def latest_reading(self, machine_id: int) -> Optional[Dict[str, Any]]:
+        """Última lectura registrada de la máquina (O(1)) o None."""
+        return self._latest_index().get(_index_key(machine_id, "")[0])
+
+    def latest_by_machines(self, machine_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Última lectura de cada máquina pedida (O(máquinas)); omite las que no tienen."""
+        latest = self._latest_index()
+        result = {}
+        for machine_id in machine_ids:
+            row = latest.get(_index_key(machine_id, "")[0])
+            if row is not None:
+                result[int(machine_id)] = row
+        return result
+
+    def has_reading(self, machine_id: int, at: str) -> bool:
+        """
+        True si ya existe una lectura para esa máquina en esa fecha-hora exacta.
+        Consulta O(1) sobre el índice en memoria.
+        """
+        return _index_key(machine_id, at) in self._keys_index()
 
     def next_id(self) -> int:
         """Calcular el próximo id disponible (secuencial)."""
@@ -184,11 +369,53 @@ class CountersRepo:
             results.append(row)
         return results
 
+    def list_counters_page(
+        self,
+        casino_id: Optional[int] = None,
+        machine_id: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Página de contadores ordenada por (at, id) usando cursor (keyset).
+
+        - date_from/date_to: rango inclusivo sobre `at` ('YYYY-MM-DD HH:MM:SS').
+        - cursor: valor devuelto por la página anterior (None = primera página).
+        - fields: columnas a devolver (por defecto todas).
+        Retorna (filas, siguiente_cursor); siguiente_cursor es None al final.
+        Lanza ValueError si el cursor es inválido.
+        """
+
+        def mask(block: pd.DataFrame) -> pd.Series:
+            m = pd.Series(True, index=block.index)
+            if casino_id is not None:
+                m &= pd.to_numeric(block["casino_id"], errors="coerce") == casino_id
+            if machine_id is not None:
+                m &= pd.to_numeric(block["machine_id"], errors="coerce") == machine_id
+            return m
+
+        page, next_cursor = self._sorted.page(
+            limit=limit,
+            cursor=cursor,
+            key_from=date_from,
+            key_to=date_to,
+            mask=mask,
+        )
+        rows = page.reindex(columns=fields or EXPECTED_COLUMNS).fillna("").to_dict(orient="records")
+        return rows, next_cursor
+
     def insert_counter(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """
         Insertar un registro nuevo en el CSV. `row` debe contener las columnas
         esperadas (al menos las públicas). Retorna la fila insertada.
+
+        La regla "una lectura por máquina y fecha-hora" la valida quien llama
+        (ver `has_reading`); aquí solo mantenemos el índice al día.
         """
+        keys = self._keys_index()
         df = self._read_df()
         # Asegurar que el id exista y sea único
         if "id" not in row or row["id"] is None:
@@ -203,22 +430,79 @@ class CountersRepo:
         df = pd.concat([df, pd.DataFrame([row])], ignore_index=True, sort=False)
         # Escribir asegurando el orden de columnas
         df = df.reindex(columns=EXPECTED_COLUMNS)
+        keys.add(_index_key(row["machine_id"], row["at"]))
+        self._bump_latest(row)
         self._write_df(df)
         return self.get_by_id(int(row["id"]))
 
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Inserta varias lecturas con una sola escritura (cargas en lote / importaciones).
+
+        La unicidad (machine_id, at) se valida contra el índice y también dentro
+        del mismo lote. Si alguna fila choca, no se escribe nada (ValueError).
+        Retorna las filas insertadas con su id asignado.
+        """
+        if not rows:
+            return []
+
+        keys = self._keys_index()
+        batch_keys: Set[Tuple[str, str]] = set()
+        for row in rows:
+            key = _index_key(row.get("machine_id"), row.get("at"))
+            if key in keys or key in batch_keys:
+                raise ValueError(
+                    f"Ya existe un registro para la máquina {key[0]} en la fecha-hora {key[1]}"
+                )
+            batch_keys.add(key)
+
+        df = self._read_df()
+        start_id = self.next_id()
+        prepared = []
+        for offset, row in enumerate(rows):
+            row = dict(row)
+            if row.get("id") is None:
+                row["id"] = start_id + offset
+            for col in EXPECTED_COLUMNS:
+                if col not in row:
+                    row[col] = None
+            prepared.append(row)
+
+        df = pd.concat([df, pd.DataFrame(prepared)], ignore_index=True, sort=False)
+        df = df.reindex(columns=EXPECTED_COLUMNS)
+        keys.update(batch_keys)
+        for row in prepared:
+            self._bump_latest(row)
+        self._write_df(df)
+        return prepared
+
     def update_counter(
         self, counter_id: int, cambios: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
         """
         Actualiza columnas permitidas de un registro existente.
         Retorna la fila actualizada o None si no existe.
+
+        Si el cambio mueve la lectura a otro (machine_id, at) ya ocupado,
+        lanza ValueError.
         """
         df = self._read_df()
-        idx = df.index[df["id"] == counter_id]
+        idx = df.index[pd.to_numeric(df["id"], errors="coerce") == counter_id]
         if len(idx) == 0:
             return None
         i = idx[0]
 
+        old_key = _index_key(df.at[i, "machine_id"], df.at[i, "at"])
+        new_key = _index_key(
+            cambios.get("machine_id", df.at[i, "machine_id"]),
+            cambios.get("at", df.at[i, "at"]),
+        )
+        keys = self._keys_index()
+        if new_key != old_key and new_key in keys:
+            raise ValueError(
+                f"Ya existe un registro para la máquina {new_key[0]} en la fecha-hora {new_key[1]}"
+            )
+
         allowed = {
             "at",
             "in_amount",
@@ -233,6 +517,10 @@ class CountersRepo:
             if k in allowed:
                 df.at[i, k] = str(v)
 
+        if new_key != old_key:
+            keys.discard(old_key)
+            keys.add(new_key)
+        self._refresh_latest(df, [old_key[0], new_key[0]])
         self._write_df(df)
         return self.get_by_id(counter_id)
 
@@ -246,104 +534,211 @@ class CountersRepo:
     ) -> List[Dict]:
         """
         Actualiza múltiples registros filtrando por Casino y Fecha (YYYY-MM-DD).
+
+        - Cada update puede traer su propia 'fecha' (YYYY-MM-DD); si no, se usa
+          fecha_filtro. Así un lote puede corregir varios días con una sola escritura.
+        - Si el update trae 'at', solo se modifica el contador con esa hora exacta.
+        - Si la misma (máquina, fecha) viene repetida, gana la última.
+
+        Los candidatos se eligen con máscaras vectorizadas (casino, día, máquina)
+        y los cambios se aplican con loc solo sobre las filas que coinciden.
         """
         df = self._read_df()
-        if df.empty:
+        if df.empty or not updates:
             return []
 
         now_str = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-        updated_records = []
 
-        # Mapa de actualizaciones
-        updates_map = {int(u["machine_id"]): u for u in updates}
-        machines_to_update = updates_map.keys()
-
-        # Iterar
-        for idx, row in df.iterrows():
+        # Mapa de actualizaciones por (máquina, día)
+        updates_map: Dict[Tuple[int, str], Dict] = {}
+        for u in updates:
+            day = str(u.get("fecha") or fecha_filtro)[:10]
+            updates_map[(int(u["machine_id"]), day)] = u
+
+        # 1. Candidatos: casino + días + máquinas del lote (todo vectorizado)
+        row_casino = pd.to_numeric(df["casino_id"], errors="coerce")
+        row_machine = pd.to_numeric(df["machine_id"], errors="coerce")
+        row_at = df["at"].fillna("").astype(str).str.strip()
+        row_day = row_at.str[:10]
+
+        days = {d for _, d in updates_map}
+        machines = {m for m, _ in updates_map}
+        candidates = (
+            (row_casino == casino_id)
+            & row_day.isin(days)
+            & row_machine.isin(machines)
+        )
+        if not candidates.any():
+            return []
 
-            # 1. Validar Casino
-            try:
-                row_casino = int(float(row["casino_id"]))
-            except (ValueError, TypeError):
+        c_machine = row_machine[candidates]
+        c_day = row_day[candidates]
+        c_at = row_at[candidates]
+
+        # 2. Aplicar cada corrección solo sobre sus filas
+        touched = []
+        amount_cols = ["in_amount", "out_amount", "jackpot_amount", "billetero_amount"]
+        for (m_id, day), cambios in updates_map.items():
+            match = (c_machine == m_id) & (c_day == day)
+            if cambios.get("at") is not None:
+                # Si viene 'at' en el JSON, debe coincidir exactamente
+                match &= c_at == str(cambios["at"]).strip()
+            idx = match[match].index
+            if idx.empty:
                 continue
 
-            if row_casino != casino_id:
-                continue
+            for col in amount_cols:
+                if cambios.get(col) is not None:
+                    df.loc[idx, col] = str(cambios[col])
 
-            # 2. Validar Fecha
-            row_at = str(row["at"])
-            if len(row_at) >= 10:
-                row_date = row_at[:10]
-            else:
-                continue
-
-            if row_date != fecha_filtro:
-                continue
+            # Auditoría
+            df.loc[idx, "updated_at"] = now_str
+            df.loc[idx, "updated_by"] = actor
+            touched.extend(idx.tolist())
 
-            # 3. Validar Máquina
-            try:
-                m_id = int(float(row["machine_id"]))
-            except (ValueError, TypeError):
-                continue
+        if not touched:
+            return []
 
-            if m_id in machines_to_update:
-                cambios = updates_map[m_id]
-
-                # 4. Validar hora específica si se proporciona en el JSON
-                if cambios.get("at") is not None:
-                    # Si viene 'at' en el JSON, debe coincidir exactamente
-                    if row_at.strip() != str(cambios["at"]).strip():
-                        continue  # Este no es el contador específico que buscamos
-
-                # Aplicar cambios
-                if cambios.get("in_amount") is not None:
-                    df.at[idx, "in_amount"] = str(cambios["in_amount"])
-                if cambios.get("out_amount") is not None:
-                    df.at[idx, "out_amount"] = str(cambios["out_amount"])
-                if cambios.get("jackpot_amount") is not None:
-                    df.at[idx, "jackpot_amount"] = str(cambios["jackpot_amount"])
-                if cambios.get("billetero_amount") is not None:
-                    df.at[idx, "billetero_amount"] = str(cambios["billetero_amount"])
-
-                # Auditoría
-                df.at[idx, "updated_at"] = now_str
-                df.at[idx, "updated_by"] = actor
-
-                # Agregar a resultados
-                res_row = df.loc[idx].to_dict()
-                # Normalizar para retorno
-                res_row["machine_id"] = m_id
-                res_row["casino_id"] = row_casino
-                updated_records.append(res_row)
-
-        if updated_records:
-            self._write_df(df)
+        self._refresh_latest(df, row_machine.loc[touched].dropna().unique().tolist())
+        self._write_df(df)
 
+        # Mismo orden que el archivo y mismos tipos normalizados que antes
+        touched = sorted(touched)
+        updated_records = df.loc[touched].to_dict(orient="records")
+        for rec, m_id in zip(updated_records, row_machine.loc[touched].tolist()):
+            rec["machine_id"] = int(m_id)
+            rec["casino_id"] = casino_id
         return updated_records
 
     # -------------- METODO PARA EL MOUDLO DE REPORTES ---------------
 
     def list_by_casino_date(
-        self, casino_id: int, fecha_inicio: str, fecha_fin: str
+        self, casino_id: int, fecha_inicio: str, fecha_fin: str, fields: Optional[List[str]] = None
     ) -> List[Dict]:
-        """Filtra registros por casino y rango de fechas."""
-        df = self._read_df()
-        results = []
-
-        for _, row in df.iterrows():
-            try:
-                if int(float(row["casino_id"])) != casino_id:
-                    continue
-            except:
-                continue
+        """
+        Filtra registros por casino y rango de fechas.
+        fields: proyección; solo se leen esas columnas (más casino_id y at
+        para filtrar) y cada fila trae solo las pedidas.
+        """
+        fields = list(fields or EXPECTED_COLUMNS)
+        df = self._read_df(list(dict.fromkeys(fields + ["casino_id", "at"])))
+        mask = _casino_date_mask(df, casino_id, fecha_inicio, fecha_fin)
+        return df.loc[mask, fields].fillna("").to_dict(orient="records")
 
-            row_at = str(row["at"])
-            if len(row_at) >= 10:
-                row_date = row_at[:10]
-                if fecha_inicio <= row_date <= fecha_fin:
-                    results.append(row.fillna("").to_dict())
+    def iter_by_casino_date(
+        self,
+        casino_id: int,
+        fecha_inicio: str,
+        fecha_fin: str,
+        fields: Optional[List[str]] = None,
+        chunksize: int = 50_000,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Igual que `list_by_casino_date`, pero lee el CSV por bloques y va
+        entregando DataFrames ya filtrados (y proyectados a `fields`).
 
-        return results
+        La memoria queda acotada al tamaño del bloque, sin importar cuántas
+        filas tenga el archivo. Las filas salen en el orden del CSV.
+        """
+        if not CSV_PATH.exists():
+            return
+        fields = list(fields or EXPECTED_COLUMNS)
+        # Solo se leen las columnas pedidas más las necesarias para filtrar
+        usecols = list(dict.fromkeys(fields + ["casino_id", "at"]))
+        reader = csv_io.read_csv(
+            CSV_PATH,
+            dtype=str,
+            usecols=lambda c: c in usecols,
+            chunksize=chunksize,
+        )
+        for chunk in reader:
+            for col in usecols:
+                if col not in chunk.columns:
+                    chunk[col] = None
+            mask = _casino_date_mask(chunk, casino_id, fecha_inicio, fecha_fin)
+            if mask.any():
+                yield chunk.loc[mask, fields]
+
+    def iter_chunks(
+        self,
+        fields: Optional[List[str]] = None,
+        chunksize: int = 50_000,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Recorre TODO el historial por bloques (solo las columnas `fields`),
+        para procesos por lotes como el escaneo de anomalías.
+        """
+        if not CSV_PATH.exists():
+            return
+        fields = list(fields or EXPECTED_COLUMNS)
+        reader = csv_io.read_csv(
+            CSV_PATH,
+            dtype=str,
+            usecols=lambda c: c in fields,
+            chunksize=chunksize,
+        )
+        for chunk in reader:
+            for col in fields:
+                if col not in chunk.columns:
+                    chunk[col] = None
+            yield chunk[fields]
+
+    def daily_bounds(self, chunksize: int = 50_000) -> pd.DataFrame:
+        """
+        Agregado diario precalculado: por (machine_id, day) la primera y la
+        última lectura del día (medidores crudos, no diferencias), con columnas
+        first_<medidor> / last_<medidor>.
+
+        Con lecturas de borde (y no deltas por día) cualquier periodo se
+        encadena bien: primera lectura del primer día -> última del último,
+        incluido el movimiento entre la última lectura de un día y la primera
+        del siguiente.
+
+        - Mismas filas que la lectura de reportes: machine_id numérico, 'at'
+          con fecha válida; medidores no numéricos cuentan como 0.
+        - Orden dentro del día por 'at' (empates: orden del archivo).
+        - Una pasada por bloques; se reutiliza mientras counters.csv no cambie.
+        """
+        sig = self._file_signature()
+        hit = self._bounds is not None and sig == self._bounds_sig
+        registrar_cache("counters_daily_bounds", hit)
+        if hit:
+            return self._bounds
+
+        medidores = ["in_amount", "out_amount", "jackpot_amount", "billetero_amount"]
+        partes: List[pd.DataFrame] = []
+        offset = 0
+        for chunk in self.iter_chunks(["machine_id", "at"] + medidores, chunksize=chunksize):
+            chunk = chunk.assign(seq=range(offset, offset + len(chunk)))
+            offset += len(chunk)
+            m = pd.to_numeric(chunk["machine_id"], errors="coerce")
+            ok = m.notna() & pd.to_datetime(chunk["at"], errors="coerce").notna()
+            if not ok.any():
+                continue
+            chunk = chunk[ok].assign(machine_id=m[ok].astype("int64"), day=chunk.loc[ok, "at"].astype(str).str[:10])
+            for col in medidores:
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce").fillna(0.0)
+            # Solo los bordes de cada (máquina, día) dentro del bloque
+            chunk = chunk.sort_values(["at", "seq"], kind="mergesort")
+            grupos = chunk.groupby(["machine_id", "day"], sort=False)
+            partes.append(pd.concat([grupos.head(1), grupos.tail(1)]))
+
+        columnas = ["machine_id", "day"] + [f"first_{c}" for c in medidores] + [f"last_{c}" for c in medidores]
+        if not partes:
+            bounds = pd.DataFrame(columns=columnas)
+        else:
+            df = pd.concat(partes, ignore_index=True).sort_values(["at", "seq"], kind="mergesort")
+            # Sin NaN en los medidores: first()/last() son la primera y la última fila
+            grupos = df.groupby(["machine_id", "day"])[medidores]
+            bounds = pd.concat(
+                [grupos.first().add_prefix("first_"), grupos.last().add_prefix("last_")], axis=1
+            ).reset_index()[columnas]
+        self._bounds, self._bounds_sig = bounds, sig
+        return bounds
+
+    def file_size(self) -> int:
+        """Tamaño en bytes del CSV (0 si no existe)."""
+        return CSV_PATH.stat().st_size if CSV_PATH.exists() else 0
 
     # --------Este Metodo devuelve el último contador registrado ANTES o IGUAL a la fecha inicial del rango.-----------#
 
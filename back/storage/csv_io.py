@@ -1,55 +1,93 @@
 # -------------------------------------------
 # back/storage/csv_io.py
 # Propósito:
-#   - Helpers genéricos para leer y escribir CSV con pandas,
-#     y utilidades compartidas (ej.: next_id).
+#   - Punto común de lectura/escritura de CSV con pandas para los repos,
+#     para medir el I/O del storage (ver back/core/metrics.py).
 #
-# Funciones sugeridas:
-#   1) read_df(csv_path, expected_columns=None)
-#      Entradas:
-#        - csv_path: Path al archivo CSV.
-#        - expected_columns: lista de nombres de columnas en orden esperado (opcional).
-#      Comportamiento:
-#        - Si el archivo no existe: devolver DF vacío.
-#        - Si existe: leer con pd.read_csv(csv_path).
-#        - Si expected_columns viene y el DF no las tiene:
-#            * asegurar que el DF tenga esas columnas (agregar faltantes vacías)
-#            * reordenar columnas al orden de expected_columns.
-#      Salida:
-#        - pandas.DataFrame listo para usar.
+# Funciones:
+#   1) read_csv(path, **kwargs)
+#      - Igual que pd.read_csv(path, **kwargs). Registra una lectura de la
+#        tabla, los bytes del archivo y el tiempo de lectura+parseo.
+#      - Con chunksize devuelve un iterador de bloques; el tiempo se suma
+#        bloque a bloque y se registra al terminar de recorrerlo.
 #
-#   2) write_df(csv_path, df, expected_columns=None)
-#      Entradas:
-#        - csv_path: Path destino.
-#        - df: DataFrame a persistir.
-#        - expected_columns (opcional): para reordenar columnas antes de guardar.
-#      Comportamiento:
-#        - Reordenar columnas si se especifica expected_columns.
-#        - Guardar con df.to_csv(csv_path, index=False).
-#      Salida:
-#        - None (efecto: escribe archivo).
+#   2) write_csv(df, path, **kwargs)
+#      - Igual que df.to_csv(path, **kwargs). Registra la escritura y los
+#        bytes resultantes.
 #
-#   3) ensure_columns(df, columns)
-#      Entradas:
-#        - df: DataFrame.
-#        - columns: lista de nombres esperados.
-#      Comportamiento:
-#        - Añadir columnas faltantes con valores por defecto (vacío/NaN o False para bool).
-#        - Reordenar al final.
-#      Salida:
-#        - DataFrame con columnas completas y ordenadas.
+#   3) medir_lectura(path) / registrar_escritura(path)
+#      - Para I/O hecho a mano (módulo csv, archivo abierto por el repo):
+#        `with medir_lectura(path): ...` y registrar_escritura(path) al cerrar.
 #
-#   4) next_id(df, id_col="id")
-#      Entradas:
-#        - df: DataFrame; puede estar vacío.
-#        - id_col: nombre de la columna ID.
-#      Comportamiento:
-#        - Si df está vacío o no tiene la columna: retorna 1.
-#        - Si tiene datos: castear a int y retornar max + 1.
-#      Salida:
-#        - int con el siguiente ID disponible.
+#   4) tabla_de(path)
+#      - Nombre de la tabla = nombre del archivo sin extensión
+#        (data/machine_balances.csv -> "machine_balances"), el mismo que usa
+#        back/storage/versions.py.
 #
-# Notas de tipos:
-#   - Forzar tipos al leer (si se requiere) se puede hacer en cada repo; aquí mantener simple.
-#   - Manejar strings con .fillna('') cuando sea útil; evitar que NaN suba a la API.
+# Notas:
+#   - Las rutas se reciben en cada llamada (respeta rutas parcheadas en pruebas).
 # -------------------------------------------
+
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+from back.core import metrics
+
+
+def tabla_de(path) -> str:
+    return Path(path).stem
+
+
+def _tamano(path) -> int:
+    try:
+        return Path(path).stat().st_size
+    except (OSError, TypeError):
+        return 0
+
+
+@contextmanager
+def medir_lectura(path) -> Iterator[None]:
+    """Registra como lectura de la tabla lo que se haga dentro del bloque."""
+    inicio = time.perf_counter()
+    yield
+    metrics.registrar_lectura(tabla_de(path), _tamano(path), time.perf_counter() - inicio)
+
+
+def registrar_escritura(path) -> None:
+    """Registra una escritura ya hecha sobre path (con su tamaño final)."""
+    metrics.registrar_escritura(tabla_de(path), _tamano(path))
+
+
+def _por_bloques(reader, path) -> Iterator[pd.DataFrame]:
+    segundos = 0.0
+    try:
+        while True:
+            inicio = time.perf_counter()
+            try:
+                bloque = next(reader)
+            except StopIteration:
+                break
+            finally:
+                segundos += time.perf_counter() - inicio
+            yield bloque
+    finally:
+        reader.close()
+        metrics.registrar_lectura(tabla_de(path), _tamano(path), segundos)
+
+
+def read_csv(path, **kwargs):
+    """pd.read_csv medido (DataFrame, o iterador de bloques si se pasa chunksize)."""
+    if kwargs.get("chunksize") is not None:
+        return _por_bloques(pd.read_csv(path, **kwargs), path)
+    with medir_lectura(path):
+        return pd.read_csv(path, **kwargs)
+
+
+def write_csv(df: pd.DataFrame, path, **kwargs) -> None:
+    """df.to_csv medido."""
+    df.to_csv(path, **kwargs)
+    registrar_escritura(path)
@@ -0,0 +1,194 @@
+# -------------------------------------------
+# back/storage/idempotency_repo.py
+# Propósito:
+#   - Guardar la respuesta de los POST que llegan con cabecera `Idempotency-Key`
+#     para que los reintentos (p. ej. operadores móviles tras un timeout)
+#     reciban la misma respuesta sin volver a escribir CSVs ni recalcular cuadres.
+#
+# Diseño:
+#   - Memoria: OrderedDict acotado (máx. IDEMPOTENCY_MAX_ENTRIES); al llenarse
+#     se expulsa la entrada más antigua.
+#   - TTL: cada entrada vence a los IDEMPOTENCY_TTL_SECONDS; las vencidas se
+#     descartan al consultarlas y al cargar el archivo.
+#   - Disco: sidecar JSONL (data/idempotency_keys.jsonl) de solo-anexar, para
+#     sobrevivir reinicios de Uvicorn. Se compacta cuando crece demasiado.
+#
+# Entradas (clave compuesta):
+#   - scope: ruta + usuario (evita que dos usuarios compartan una misma key).
+#   - key: valor de la cabecera.
+#   - fingerprint: hash del cuerpo; misma key con otro cuerpo = error del cliente.
+#
+# Reserva:
+#   - reserve() consulta y, si no hay respuesta guardada, marca la key "en curso"
+#     en la misma sección crítica. Un reintento que llega mientras el primero
+#     sigue corriendo recibe IdempotencyInProgressError (409) en vez de
+#     ejecutar el handler otra vez. put() o release() liberan la reserva.
+#   - Las reservas viven solo en memoria (un reinicio las descarta).
+# -------------------------------------------
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from back.core import settings
+from back.core.metrics import lock_medido
+
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+IDEMPOTENCY_FILE = DATA_DIR / "idempotency_keys.jsonl"
+
+
+class IdempotencyConflictError(Exception):
+    """La misma Idempotency-Key se reutilizó con un cuerpo distinto."""
+    pass
+
+
+class IdempotencyInProgressError(Exception):
+    """Otra petición con la misma Idempotency-Key todavía se está procesando."""
+    pass
+
+
+def fingerprint(payload: Any) -> str:
+    """Hash estable del cuerpo de la petición (orden de llaves normalizado)."""
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """Almacén acotado de respuestas idempotentes (memoria + sidecar en disco)."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path) if path is not None else IDEMPOTENCY_FILE
+        self.max_entries = max_entries or settings.IDEMPOTENCY_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.IDEMPOTENCY_TTL_SECONDS
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._in_progress: Dict[Tuple[str, str], str] = {}  # (scope, key) -> fingerprint
+        self._lines_on_disk = 0
+        self._load()
+
+    # ----------------- persistencia -----------------
+
+    def _load(self) -> None:
+        """Carga el sidecar (si existe) descartando entradas vencidas."""
+        if not self.path.exists():
+            return
+        now = self._clock()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                self._lines_on_disk += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Línea cortada por un apagado a mitad de escritura
+                    continue
+                if entry.get("expires_at", 0) <= now:
+                    continue
+                k = (entry["scope"], entry["key"])
+                self._entries.pop(k, None)
+                self._entries[k] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+        self._lines_on_disk += 1
+        # Compactar cuando el archivo tiene muchas más líneas que entradas vivas
+        if self._lines_on_disk > 2 * self.max_entries:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self._entries.values():
+                f.write(json.dumps(entry, default=str) + "\n")
+        tmp.replace(self.path)
+        self._lines_on_disk = len(self._entries)
+
+    # ----------------- API pública -----------------
+
+    def _lookup(self, scope: str, key: str, fp: str) -> Optional[Dict[str, Any]]:
+        # Llamar con self._lock tomado
+        entry = self._entries.get((scope, key))
+        if entry is None:
+            return None
+        if entry["expires_at"] <= self._clock():
+            del self._entries[(scope, key)]
+            return None
+        if entry["fingerprint"] != fp:
+            raise IdempotencyConflictError(
+                "La Idempotency-Key ya se usó con un cuerpo diferente"
+            )
+        return {"status_code": entry["status_code"], "body": entry["body"]}
+
+    def get(self, scope: str, key: str, fp: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve {"status_code", "body"} guardado para (scope, key) o None.
+        Lanza IdempotencyConflictError si la key se usó con otro cuerpo.
+        """
+        with lock_medido(self._lock, "idempotency"):
+            return self._lookup(scope, key, fp)
+
+    def reserve(self, scope: str, key: str, fp: str) -> Optional[Dict[str, Any]]:
+        """
+        Como get(), pero si no hay respuesta guardada reserva (scope, key)
+        para esta petición. Quien recibe None debe terminar con put() o release().
+        Lanza IdempotencyInProgressError si la key ya está reservada por otra
+        petición en curso (IdempotencyConflictError si además el cuerpo difiere).
+        """
+        with lock_medido(self._lock, "idempotency"):
+            cached = self._lookup(scope, key, fp)
+            if cached is not None:
+                return cached
+            reservada = self._in_progress.get((scope, key))
+            if reservada is not None:
+                if reservada != fp:
+                    raise IdempotencyConflictError(
+                        "La Idempotency-Key ya se usó con un cuerpo diferente"
+                    )
+                raise IdempotencyInProgressError(
+                    "Ya hay una petición en curso con esta Idempotency-Key; reintente en unos segundos"
+                )
+            self._in_progress[(scope, key)] = fp
+            return None
+
+    def release(self, scope: str, key: str) -> None:
+        """Libera la reserva sin guardar respuesta (el handler falló)."""
+        with lock_medido(self._lock, "idempotency"):
+            self._in_progress.pop((scope, key), None)
+
+    def put(self, scope: str, key: str, fp: str, status_code: int, body: Any) -> None:
+        """Guarda la respuesta exitosa de una petición idempotente."""
+        now = self._clock()
+        entry = {
+            "scope": scope,
+            "key": key,
+            "fingerprint": fp,
+            "status_code": status_code,
+            "body": body,
+            "stored_at": now,
+            "expires_at": now + self.ttl_seconds,
+        }
+        with lock_medido(self._lock, "idempotency"):
+            self._in_progress.pop((scope, key), None)
+            self._entries.pop((scope, key), None)
+            self._entries[(scope, key)] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._append(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
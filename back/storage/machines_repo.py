@@ -39,6 +39,11 @@ import os
 from typing import List, Dict
 from datetime import datetime
 
+from back.storage import csv_io
+
+# desde back/storage -> ../../data/machines.csv
+MACHINES_CSV = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data", "machines.csv"))
+
 class MachinesRepo:
 
     def __init__(self, filepath=None):
@@ -46,9 +51,7 @@ class MachinesRepo:
         if filepath:
             self.filepath = filepath
         else:
-            base_dir = os.path.dirname(__file__)
-            # desde back/storage -> ../../data/machines.csv
-            self.filepath = os.path.abspath(os.path.join(base_dir, "..", "..", "data", "machines.csv"))
+            self.filepath = MACHINES_CSV
         self._ensure_file()
         self.data = self._load()
 
@@ -63,7 +66,7 @@ class MachinesRepo:
                 ])
 
     def _load(self) -> List[Dict]:
-        with open(self.filepath, newline="") as f:
+        with csv_io.medir_lectura(self.filepath), open(self.filepath, newline="") as f:
             return list(csv.DictReader(f))
 
     def _save(self):
@@ -71,6 +74,7 @@ class MachinesRepo:
             writer = csv.DictWriter(f, fieldnames=self.data[0].keys())
             writer.writeheader()
             writer.writerows(self.data)
+        csv_io.registrar_escritura(self.filepath)
 
     def next_id(self) -> int:
         if not self.data:
@@ -87,6 +91,20 @@ class MachinesRepo:
         self.data.append(machine)
         self._save()
 
+    def add_many(self, machines: List[Dict], actor: str):
+        """Agrega varias máquinas con una sola escritura del CSV (alta masiva)."""
+        if not machines:
+            return
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for machine in machines:
+            machine["created_at"] = now
+            machine["created_by"] = actor
+            machine["updated_at"] = now
+            machine["updated_by"] = actor
+
+        self.data.extend(machines)
+        self._save()
+
     def list_all(self):
         return self.data
 
@@ -118,13 +136,14 @@ class MachinesRepo:
                     return True
         return False
 
-    def listar(self, only_active: bool = None, casino_id: int = None):
+    def listar(self, only_active: bool = None, casino_id: int = None, fields: List[str] = None):
         """
         Devuelve la lista de máquinas filtrando por estado y/o casino.
         only_active=True: solo activas (estado==True)
         only_active=False: solo inactivas (estado==False)
         only_active=None: todas
         casino_id: filtrar por casino específico
+        fields: si se indica, cada fila trae solo esas columnas (proyección)
         """
         self.data = self._load()
         result = self.data
@@ -139,6 +158,8 @@ class MachinesRepo:
         elif only_active is False:
             result = [m for m in result if str(m.get("estado", "")).lower() == "false"]
         
+        if fields:
+            result = [{k: m.get(k) for k in fields} for m in result]
         return result
 
     def actualizar(self, machine_id: int, cambios: dict, actor: str) -> dict | None:
@@ -0,0 +1,153 @@
+# -------------------------------------------
+# back/storage/pagination.py
+# Propósito:
+#   - Paginación por cursor (keyset) sobre los CSV, en lugar de limit/offset.
+#
+# Idea:
+#   - Se mantiene en memoria una copia del CSV ORDENADA por (columna_clave, id)
+#     (p. ej. (at, id) para contadores o (generated_at, id) para balances).
+#     Solo se vuelve a leer/ordenar si el archivo cambió (mtime/tamaño).
+#   - El cursor codifica la última pareja (clave, id) entregada. Para la
+#     siguiente página se ubica la posición con búsqueda binaria (searchsorted)
+#     y se recorren filas hacia adelante (o atrás si es descendente) solo hasta
+#     llenar la página, así cada página cuesta ~O(tamaño de página).
+#   - Las fechas son strings 'YYYY-MM-DD HH:MM:SS', cuyo orden lexicográfico
+#     coincide con el cronológico, por eso se comparan como texto.
+#
+# Cursor:
+#   - String opaco base64-url de JSON [clave, id]. Los clientes no deben
+#     interpretarlo; solo reenviarlo en el parámetro `cursor`.
+# -------------------------------------------
+
+import base64
+import json
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from back.core.metrics import registrar_cache
+from back.storage import csv_io
+
+
+def encode_cursor(key: str, row_id: int) -> str:
+    raw = json.dumps([str(key), int(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Lanza ValueError si el cursor no es válido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(key), int(row_id)
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
+
+
+class SortedCsvIndex:
+    """
+    Copia ordenada de un CSV por (key_col, id), recargada solo cuando el archivo cambia.
+
+    - path_getter: función que devuelve la ruta del CSV (se evalúa en cada uso
+      para respetar rutas parcheadas en pruebas).
+    - key_col: columna de orden principal (string de fecha).
+    """
+
+    def __init__(self, path_getter: Callable[[], Path], key_col: str):
+        self._path_getter = path_getter
+        self.key_col = key_col
+        self._sig = None
+        self._df: Optional[pd.DataFrame] = None
+        self._keys = np.array([], dtype=str)
+        self._ids = np.array([], dtype=np.int64)
+
+    def _signature(self, path: Path):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (str(path), st.st_mtime_ns, st.st_size)
+
+    def frame(self) -> pd.DataFrame:
+        """DataFrame ordenado (columnas del CSV como str + '_id' entero)."""
+        path = Path(self._path_getter())
+        sig = self._signature(path)
+        registrar_cache(f"sorted_{csv_io.tabla_de(path)}", self._df is not None and sig == self._sig)
+        if self._df is None or sig != self._sig:
+            if sig is None:
+                df = pd.DataFrame(columns=["id", self.key_col])
+            else:
+                df = csv_io.read_csv(path, dtype=str)
+            df["_id"] = pd.to_numeric(df["id"], errors="coerce").fillna(-1).astype("int64")
+            df[self.key_col] = df[self.key_col].fillna("").astype(str)
+            df = df.sort_values([self.key_col, "_id"], kind="mergesort").reset_index(drop=True)
+            self._df = df
+            self._keys = df[self.key_col].to_numpy(dtype=str)
+            self._ids = df["_id"].to_numpy()
+            self._sig = sig
+        return self._df
+
+    def _cursor_position(self, cursor: str, descending: bool) -> int:
+        c_key, c_id = decode_cursor(cursor)
+        lo = int(np.searchsorted(self._keys, c_key, side="left"))
+        hi = int(np.searchsorted(self._keys, c_key, side="right"))
+        side = "left" if descending else "right"
+        return lo + int(np.searchsorted(self._ids[lo:hi], c_id, side=side))
+
+    def page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        key_from: Optional[str] = None,
+        key_to: Optional[str] = None,
+        mask: Optional[Callable[[pd.DataFrame], pd.Series]] = None,
+        descending: bool = False,
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        Devuelve (filas_de_la_página, siguiente_cursor).
+
+        - key_from/key_to: rango inclusivo sobre key_col (búsqueda binaria).
+        - mask: filtro vectorizado adicional (casino, máquina, etc.) que se
+          aplica solo a los bloques recorridos.
+        - siguiente_cursor es None cuando no hay más filas.
+        """
+        df = self.frame()
+        start, end = 0, len(df)
+        if key_from is not None:
+            start = int(np.searchsorted(self._keys, key_from, side="left"))
+        if key_to is not None:
+            end = int(np.searchsorted(self._keys, key_to, side="right"))
+        if cursor:
+            pos = self._cursor_position(cursor, descending)
+            if descending:
+                end = min(end, pos)
+            else:
+                start = max(start, pos)
+
+        wanted = limit + 1  # una fila extra para saber si hay más páginas
+        chunk = max(wanted * 2, 64)
+        parts: List[pd.DataFrame] = []
+        found = 0
+        while found < wanted and start < end:
+            if descending:
+                block = df.iloc[max(start, end - chunk):end].iloc[::-1]
+                end = max(start, end - chunk)
+            else:
+                block = df.iloc[start:min(end, start + chunk)]
+                start = min(end, start + chunk)
+            if mask is not None and not block.empty:
+                block = block[mask(block)]
+            if not block.empty:
+                parts.append(block)
+                found += len(block)
+            chunk *= 2  # filtros muy selectivos: ampliar el bloque
+
+        result = pd.concat(parts) if parts else df.iloc[0:0]
+        next_cursor = None
+        if len(result) > limit:
+            result = result.iloc[:limit]
+            last = result.iloc[-1]
+            next_cursor = encode_cursor(last[self.key_col], last["_id"])
+        return result.drop(columns=["_id"]), next_cursor
@@ -35,11 +35,27 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict
 
+from back.storage import csv_io
+
 
 # Ruta al archivo CSV de casinos
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 PLACES_CSV = DATA_DIR / "places.csv"
 
+# Columnas del CSV de casinos (también los campos permitidos en ?fields=)
+PLACES_COLUMNS = [
+    'id',
+    'nombre',
+    'direccion',
+    'codigo_casino',
+    'ciudad',
+    'estado',
+    'created_at',
+    'created_by',
+    'updated_at',
+    'updated_by'
+]
+
 
 class PlaceStorage:
     """Maneja la persistencia de casinos en CSV"""
@@ -50,25 +66,14 @@ class PlaceStorage:
         if not PLACES_CSV.exists():
             DATA_DIR.mkdir(parents=True, exist_ok=True)
             
-            df = pd.DataFrame(columns=[
-                'id',
-                'nombre',
-                'direccion',
-                'codigo_casino',
-                'ciudad',
-                'estado',
-                'created_at',
-                'created_by',
-                'updated_at',
-                'updated_by'
-            ])
-            df.to_csv(PLACES_CSV, index=False)
+            df = pd.DataFrame(columns=PLACES_COLUMNS)
+            csv_io.write_csv(df, PLACES_CSV, index=False)
 
     @staticmethod
     def _get_next_id() -> int:
         """Obtiene el siguiente ID disponible"""
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        df = csv_io.read_csv(PLACES_CSV)
         
         if df.empty:
             return 1
@@ -98,7 +103,7 @@ class PlaceStorage:
             ValueError: Si el codigo_casino ya existe
         """
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        df = csv_io.read_csv(PLACES_CSV)
         
         # VALIDACIÓN: Verificar que el código no exista
         if not df.empty:
@@ -128,7 +133,7 @@ class PlaceStorage:
         
         # Agregar al CSV
         df = pd.concat([df, pd.DataFrame([new_place])], ignore_index=True)
-        df.to_csv(PLACES_CSV, index=False)
+        csv_io.write_csv(df, PLACES_CSV, index=False)
         
         return new_place
 
@@ -142,7 +147,7 @@ class PlaceStorage:
         """
 
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        df = csv_io.read_csv(PLACES_CSV)
 
         if codigo_casino not in df["id"].values:
             raise KeyError(f"No existe un casino con ID {codigo_casino}")
@@ -160,7 +165,7 @@ class PlaceStorage:
         df.loc[df["id"] == codigo_casino, "updated_at"] = timestamp
         df.loc[df["id"] == codigo_casino, "updated_by"] = actor
 
-        df.to_csv(PLACES_CSV, index=False)
+        csv_io.write_csv(df, PLACES_CSV, index=False)
 
         return True
 
@@ -178,7 +183,7 @@ class PlaceStorage:
         Retorna True si se activó, lanza KeyError si no existe.
         """
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        df = csv_io.read_csv(PLACES_CSV)
 
         if codigo_casino not in df["id"].values:
             raise KeyError(f"No existe un casino con ID {codigo_casino}")
@@ -197,7 +202,7 @@ class PlaceStorage:
         df.loc[df["id"] == codigo_casino, "updated_at"] = timestamp
         df.loc[df["id"] == codigo_casino, "updated_by"] = actor
 
-        df.to_csv(PLACES_CSV, index=False)
+        csv_io.write_csv(df, PLACES_CSV, index=False)
         return True
 
     @staticmethod
@@ -206,10 +211,18 @@ class PlaceStorage:
         
 
     @staticmethod
-    def listar(only_active: bool = True, limit: int | None = None, offset: int = 0) -> list:
-        """Devuelve lista de lugares como dicts. Filtra por activos por defecto."""
+    def listar(only_active: bool = True, limit: int | None = None, offset: int = 0, fields: list | None = None) -> list:
+        """
+        Devuelve lista de lugares como dicts. Filtra por activos por defecto.
+        fields: solo se leen (usecols) y devuelven esas columnas, más las
+        necesarias para filtrar y ordenar.
+        """
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        if fields:
+            necesarias = set(fields) | {'id', 'estado'}
+            df = csv_io.read_csv(PLACES_CSV, usecols=lambda c: c in necesarias)
+        else:
+            df = csv_io.read_csv(PLACES_CSV)
 
         if df.empty:
             return []
@@ -231,13 +244,16 @@ class PlaceStorage:
         if limit is not None:
             df = df.iloc[:limit]
 
+        if fields:
+            df = df.reindex(columns=fields)
+
         # Normalizar filas a dicts
         return df.fillna('').to_dict(orient='records')
 
     @staticmethod
     def obtener_por_id(place_id: int) -> dict | None:
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        df = csv_io.read_csv(PLACES_CSV)
 
         if df.empty:
             return None
@@ -264,7 +280,7 @@ class PlaceStorage:
         Lanza KeyError si el `place_id` no existe.
         """
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        df = csv_io.read_csv(PLACES_CSV)
 
         if df.empty or place_id not in df['id'].astype(int).values:
             raise KeyError(f"No existe un casino con ID {place_id}")
@@ -287,7 +303,7 @@ class PlaceStorage:
         df.at[row_idx, 'updated_at'] = timestamp
         df.at[row_idx, 'updated_by'] = actor
 
-        df.to_csv(PLACES_CSV, index=False)
+        csv_io.write_csv(df, PLACES_CSV, index=False)
 
         return df.loc[row_idx].fillna('').to_dict()
 
@@ -295,7 +311,7 @@ class PlaceStorage:
     def existe_nombre(nombre: str, exclude_id: int | None = None) -> bool:
         """Verifica si ya existe un nombre (case-insensitive)."""
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        df = csv_io.read_csv(PLACES_CSV)
 
         if df.empty:
             return False
@@ -316,7 +332,7 @@ class PlaceStorage:
         Retorna dict si existe, None si no.
         """
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        df = csv_io.read_csv(PLACES_CSV)
 
         if df.empty:
             return None
@@ -343,7 +359,7 @@ class PlaceStorage:
         Retorna la fila actualizada como dict. Lanza KeyError si no existe.
         """
         PlaceStorage._ensure_csv_exists()
-        df = pd.read_csv(PLACES_CSV)
+        df = csv_io.read_csv(PLACES_CSV)
 
         if df.empty or int(place_id) not in df['id'].astype(int).values:
             raise KeyError(f"No existe un casino con ID {place_id}")
@@ -366,6 +382,6 @@ class PlaceStorage:
         df.at[row_idx, 'updated_at'] = timestamp
         df.at[row_idx, 'updated_by'] = actor
 
-        df.to_csv(PLACES_CSV, index=False)
+        csv_io.write_csv(df, PLACES_CSV, index=False)
 
         return df.loc[row_idx].fillna('').to_dict()
@@ -1,9 +1,17 @@
+import threading
 import pandas as pd
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
+from back.core.metrics import lock_medido, registrar_cache
+from back.storage import csv_io
+
 CSV_PATH = Path("data/users.csv")
 
+# Escrituras serializadas: el login re-hashea contraseñas desde el pool de
+# hilos, así que dos lecturas-modificación-escritura podrían pisarse.
+_write_lock = threading.RLock()
+
 EXPECTED_COLUMNS = [
     "id",
     "username",
@@ -19,13 +27,11 @@ EXPECTED_COLUMNS = [
     "deleted_by",
 ]
 
+# Columnas de auditoría: cambiarlas solas no cuenta como "el usuario cambió"
+_AUDIT_COLUMNS = {"updated_at", "updated_by"}
 
-def _read_df() -> pd.DataFrame:
-    if CSV_PATH.exists():
-        df = pd.read_csv(CSV_PATH)
-    else:
-        df = pd.DataFrame(columns=EXPECTED_COLUMNS)
 
+def _normalize_df(df: pd.DataFrame) -> pd.DataFrame:
     # Asegurar columnas completas
     for col in EXPECTED_COLUMNS:
         if col not in df.columns:
@@ -40,9 +46,17 @@ def _read_df() -> pd.DataFrame:
 
     return df[EXPECTED_COLUMNS]
 
+
+def _read_df() -> pd.DataFrame:
+    if CSV_PATH.exists():
+        df = csv_io.read_csv(CSV_PATH)
+    else:
+        df = pd.DataFrame(columns=EXPECTED_COLUMNS)
+    return _normalize_df(df)
+
 def _write_df(df: pd.DataFrame) -> None:
     """Escribir DataFrame al CSV respetando el orden de columnas."""
-    df.to_csv(CSV_PATH, index=False)
+    csv_io.write_csv(df, CSV_PATH, index=False)
 
 def _to_bool(value: Any) -> bool:
     """Convertir un valor a booleano."""
@@ -50,8 +64,78 @@ def _to_bool(value: Any) -> bool:
         return value
     return str(value).lower() == "true"
 
+
+# -------------------------------------------
+# Directorio de usuarios en memoria
+#   - DataFrame normalizado + índices por username e id (dict -> posición).
+#   - Se relee el CSV solo si su firma (ruta, mtime, tamaño) cambia, p. ej.
+#     por una edición externa o una ruta parcheada en pruebas.
+#   - Las escrituras propias actualizan el directorio sin volver a leer.
+# -------------------------------------------
+_directory: Dict[str, Any] = {"sig": None, "df": None, "by_username": {}, "by_id": {}, "live": {}}
+
+
+def _file_signature() -> Tuple[Any, ...]:
+    path = Path(CSV_PATH)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return (str(path), None, None)
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def _index(df: pd.DataFrame) -> None:
+    """Reconstruye los índices del directorio a partir de df (ya normalizado)."""
+    by_username: Dict[str, int] = {}
+    by_id: Dict[Any, int] = {}
+    live: Dict[str, List[Any]] = {}
+    deleted = df["is_deleted"].astype(str).str.lower() == "true"
+    for pos, (user_id, username, is_deleted) in enumerate(zip(df["id"], df["username"], deleted)):
+        # Primera aparición gana (mismo criterio que iloc[0] sobre el filtro)
+        by_username.setdefault(username, pos)
+        by_id.setdefault(user_id, pos)
+        if not is_deleted:
+            live.setdefault(username, []).append(user_id)
+    _directory.update(df=df, by_username=by_username, by_id=by_id, live=live)
+
+
+def _directory_df() -> pd.DataFrame:
+    """DataFrame normalizado vigente (recargado solo si el CSV cambió)."""
+    with lock_medido(_write_lock, "users"):
+        sig = _file_signature()
+        registrar_cache("users_directory", _directory["df"] is not None and sig == _directory["sig"])
+        if _directory["df"] is None or sig != _directory["sig"]:
+            _index(_read_df())
+            _directory["sig"] = sig
+        return _directory["df"]
+
+
+def _store(df: pd.DataFrame) -> None:
+    """Escribe df y lo deja como directorio vigente (sin releer el CSV)."""
+    df = df.reset_index(drop=True)
+    _write_df(df)
+    _index(_normalize_df(df.copy()))
+    _directory["sig"] = _file_signature()
+
+
+def _row_at(pos: int) -> Dict[str, Any]:
+    row = _directory["df"].iloc[pos].to_dict()
+    row["id"] = int(row["id"]) if str(row.get("id", "")).strip() else None
+    row["is_active"] = _to_bool(row.get("is_active", False))
+    return row
+
+
+def _same_value(current: Any, new: Any) -> bool:
+    """Compara como se verían en el CSV (vacío/None/NaN son lo mismo)."""
+    def _norm(v):
+        if v is None or (isinstance(v, float) and pd.isna(v)):
+            return ""
+        return str(v).strip().lower() if isinstance(v, bool) or str(v).lower() in ("true", "false") else str(v)
+    return _norm(current) == _norm(new)
+
+
 def next_id() -> int:
-    df = _read_df()
+    df = _directory_df()
     if df.empty:
         return 1
     # Tomar solo ids válidos numéricos
@@ -59,56 +143,56 @@ def next_id() -> int:
     return (max(ids) + 1) if ids else 1
 
 def username_exists(username: str, exclude_id: Optional[int] = None) -> bool:
-    df = _read_df()
-    subset = df[(df["username"] == username) & (df["is_deleted"].astype(str).str.lower() != "true")]
-    if exclude_id is not None:
-        subset = subset[subset["id"] != exclude_id]
-    return not subset.empty
+    with lock_medido(_write_lock, "users"):
+        _directory_df()
+        ids = _directory["live"].get(username, [])
+        return any(i != exclude_id for i in ids) if exclude_id is not None else bool(ids)
 
 def insert_user(row: Dict[str, Any]) -> Dict[str, Any]:
-    df = _read_df()
-    if username_exists(row["username"]):
-        raise ValueError("Username ya existe")
-    df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-    _write_df(df)
+    with lock_medido(_write_lock, "users"):
+        df = _directory_df()
+        if username_exists(row["username"]):
+            raise ValueError("Username ya existe")
+        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+        _store(df)
     return row
 
 def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
-    df = _read_df()
-    subset = df[df["username"] == username.strip().lower()]
-    if subset.empty:
-        return None
-    user = subset.iloc[0].to_dict()
-    # Normalizar tipos
-    user["id"] = int(user["id"]) if str(user.get("id", "")).strip() else None
-    user["is_active"] = str(user.get("is_active", "false")).lower() == "true"
-    return user
-  
+    with lock_medido(_write_lock, "users"):
+        _directory_df()
+        pos = _directory["by_username"].get(username.strip().lower())
+        return None if pos is None else _row_at(pos)
+
 def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
-    df = _read_df()
-    rows = df[df["id"] == user_id]
-    if rows.empty:
-        return None
-    row = rows.iloc[0].to_dict()
-    row["id"] = int(row["id"]) if str(row.get("id", "")).strip() else None
-    row["is_active"] = _to_bool(row.get("is_active", False))
-    return row
-  
+    with lock_medido(_write_lock, "users"):
+        _directory_df()
+        pos = _directory["by_id"].get(user_id)
+        return None if pos is None else _row_at(pos)
+
 def update_user_row(user_id: int, cambios: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    df = _read_df()
-    idx = df.index[df["id"] == user_id]
-    if len(idx) == 0:
-        return None
-    i = idx[0]
-
-    allowed_cols = {"username", "password", "role", "is_active", "updated_at", "updated_by", 
-                    "is_deleted", "deleted_at", "deleted_by"}
-    for k, v in cambios.items():
-        if k in allowed_cols:
+    with lock_medido(_write_lock, "users"):
+        df = _directory_df()
+        i = _directory["by_id"].get(user_id)
+        if i is None:
+            return None
+
+        allowed_cols = {"username", "password", "role", "is_active", "updated_at", "updated_by",
+                        "is_deleted", "deleted_at", "deleted_by"}
+        cambios = {k: v for k, v in cambios.items() if k in allowed_cols}
+
+        # Sin cambios reales (solo auditoría o mismos valores): no se reescribe el CSV
+        if all(_same_value(df.at[i, k], v) for k, v in cambios.items() if k not in _AUDIT_COLUMNS):
+            return _row_at(i)
+
+        df = df.copy()
+        for k, v in cambios.items():
+            # Columnas vacías llegan como float64: pasar a object antes de asignar texto
+            if df[k].dtype != object:
+                df[k] = df[k].astype(object)
             df.at[i, k] = v
+        _store(df)
 
-    _write_df(df)
-
+    # Fila tal como se escribió (antes de normalizar), igual que antes
     updated = df.loc[i].to_dict()
     updated["id"] = int(updated["id"]) if str(updated.get("id", "")).strip() else None
     updated["is_active"] = _to_bool(updated.get("is_active", False))
@@ -0,0 +1,44 @@
+# -------------------------------------------
+# back/storage/versions.py
+# Propósito:
+#   - Versión barata de cada tabla (CSV) para saber si los datos cambiaron
+#     sin leerlos: (mtime_ns, tamaño) del archivo.
+#
+# Uso:
+#   - version_tablas("counters", "machines") -> tupla comparable/hasheable;
+#     cambia cuando cualquiera de esos CSV se escribe.
+#   - Las rutas se resuelven en cada llamada (respeta rutas parcheadas en pruebas).
+# -------------------------------------------
+
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from back.storage import anomalies_repo, balances_repo, counters_repo, machines_repo, places_repo, users_repo
+
+
+TABLAS: Dict[str, Callable[[], Path]] = {
+    "counters": lambda: counters_repo.CSV_PATH,
+    "machines": lambda: machines_repo.MACHINES_CSV,
+    "places": lambda: places_repo.PLACES_CSV,
+    "machine_balances": lambda: balances_repo.MACHINE_BALANCES_CSV,
+    "casino_balances": lambda: balances_repo.CASINO_BALANCES_CSV,
+    "users": lambda: users_repo.CSV_PATH,
+    "counter_anomalies": lambda: anomalies_repo.ANOMALIES_CSV,
+}
+
+
+def version_archivo(path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, tamaño) del archivo, o None si no existe."""
+    try:
+        st = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def version_tablas(*nombres: str) -> Tuple[Tuple[str, Optional[Tuple[int, int]]], ...]:
+    """Versión combinada de las tablas indicadas (ValueError si alguna no existe)."""
+    try:
+        return tuple((n, version_archivo(TABLAS[n]())) for n in nombres)
+    except KeyError as e:
+        raise ValueError(f"Tabla desconocida: {e.args[0]}")
@@ -0,0 +1,53 @@
+# -------------------------------------------
+# back/tests/conftest.py
+# Dobles de prueba y fixtures compartidos por las pruebas de cuadres.
+# -------------------------------------------
+import pandas as pd
+import pytest
+
+from back.storage import counters_repo
+from back.storage.counters_repo import CountersRepo, EXPECTED_COLUMNS
+
+
+class FakeMachines:
+    """Repositorio de máquinas en memoria (ids y casino_id como texto, igual que el CSV)."""
+
+    def __init__(self, machines):
+        self.machines = machines
+
+    def listar(self, only_active=None, casino_id=None):
+        result = [m for m in self.machines if casino_id is None or m["casino_id"] == str(casino_id)]
+        if only_active is True:
+            result = [m for m in result if m["estado"] == "True"]
+        return result
+
+    def get_by_id(self, machine_id):
+        return next((m for m in self.machines if int(m["id"]) == machine_id), None)
+
+
+class FakePlaces:
+    """Repositorio de casinos en memoria; `casinos` mapea id -> nombre (None = cualquier id existe)."""
+
+    def __init__(self, casinos=None):
+        self.casinos = casinos
+
+    def obtener_por_id(self, casino_id):
+        if self.casinos is not None and casino_id not in self.casinos:
+            return None
+        nombre = self.casinos[casino_id] if self.casinos is not None else f"Casino {casino_id}"
+        return {"id": casino_id, "nombre": nombre, "estado": "True"}
+
+    get_by_id = obtener_por_id
+
+
+@pytest.fixture
+def counters_csv(tmp_path, monkeypatch):
+    """Escribe `rows` como counters.csv temporal (columnas de EXPECTED_COLUMNS) y devuelve un CountersRepo."""
+    monkeypatch.setattr(counters_repo, "CSV_PATH", tmp_path / "counters.csv")
+
+    def _crear(rows):
+        rows = [{"id": i, **row} for i, row in enumerate(rows, start=1)]
+        pd.DataFrame(rows).reindex(columns=EXPECTED_COLUMNS).to_csv(counters_repo.CSV_PATH, index=False)
+        return CountersRepo()
+
+    return _crear
@@ -0,0 +1,89 @@
+# -------------------------------------------
+# back/tests/test_audit_log.py
+# Pruebas de la bitácora de auditoría segmentada (data/audit/*.jsonl).
+# Usan un directorio temporal para no tocar data/.
+# -------------------------------------------
+import csv
+
+import pytest
+
+from back.storage.audit_log import AuditLog
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _entry(machine_id, serial, day="2025-11-23", action="inactivate_machine", actor="system"):
+    return {
+        "timestamp": f"{day} 08:00:00",
+        "action": action,
+        "machine_id": machine_id,
+        "serial": serial,
+        "actor": actor,
+    }
+
+
+def test_anexa_y_pagina_del_mas_nuevo_al_mas_viejo(tmp_path):
+    log = AuditLog(directory=tmp_path, legacy_csv=None)
+    for i in range(1, 8):
+        log.append(_entry(i, f"SN{i}"))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = log.query(limit=3, cursor=cursor)
+        seen.extend(e["seq"] for e in page)
+        if cursor is None:
+            break
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_rotacion_e_indice_descartan_segmentos(tmp_path, monkeypatch):
+    clock = FakeClock()
+    log = AuditLog(directory=tmp_path, legacy_csv=None, max_segment_age_seconds=60, clock=clock)
+    log.append(_entry(1, "SN1", day="2025-11-01"))
+    clock.now += 120  # el segmento venció: se abre otro
+    log.append(_entry(2, "SN2", day="2025-11-02"))
+    log.append(_entry(2, "SN2", day="2025-11-02", action="activate_machine"))
+
+    assert len(list(tmp_path.glob("audit-*.jsonl"))) == 2
+
+    read = []
+    original = log._read_segment
+    monkeypatch.setattr(log, "_read_segment", lambda name: (read.append(name), original(name))[1])
+    page, _ = log.query(serial="SN2")
+    assert [e["action"] for e in page] == ["activate_machine", "inactivate_machine"]
+    assert read == ["audit-0000000002.jsonl"]
+
+    read.clear()
+    page, _ = log.query(date_from="2025-11-01", date_to="2025-11-01")
+    assert [e["machine_id"] for e in page] == [1]
+    assert read == ["audit-0000000001.jsonl"]
+
+
+def test_recarga_e_importa_logs_csv_historico(tmp_path):
+    legacy = tmp_path / "logs.csv"
+    with open(legacy, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["timestamp", "action", "machine_id", "serial", "actor"])
+        w.writeheader()
+        w.writerow(_entry("1", "SN1"))
+        w.writerow(_entry("3", "SN3"))
+
+    AuditLog(directory=tmp_path / "audit", legacy_csv=legacy).append(_entry(3, "SN3", action="activate_machine"))
+
+    # Nueva instancia (reinicio): continúa la secuencia sin reimportar
+    reloaded = AuditLog(directory=tmp_path / "audit", legacy_csv=legacy)
+    stored = reloaded.append(_entry(1, "SN1"))
+    assert stored["seq"] == 4
+
+    page, _ = reloaded.query(machine_id=3)
+    assert [e["seq"] for e in page] == [3, 2]
+
+
+def test_cursor_invalido(tmp_path):
+    with pytest.raises(ValueError):
+        AuditLog(directory=tmp_path, legacy_csv=None).query(cursor="%%%")
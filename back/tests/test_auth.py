@@ -159,3 +159,22 @@ def test_login_case_sensitivity(temp_users_csv):
     # Si el login es case-sensitive debe fallar
     # Ajustar según decisión de negocio
     assert r.status_code in (200, 401, 404, 400)
+
+
+def test_login_corre_en_pool_acotado(temp_users_csv, monkeypatch):
+    import threading
+    import back.api.v1.auth as auth_api
+    hilos = []
+    real_login = auth_api.login_user
+    monkeypatch.setattr(auth_api, "login_user", lambda u, p: hilos.append(threading.current_thread().name) or real_login(u, p))
+    r = _post_login({"username": "alice", "password": "alice-pass"})
+    assert r.status_code == 200
+    assert hilos and hilos[0].startswith("login")
+
+
+def test_login_saturado_responde_503(temp_users_csv, monkeypatch):
+    from back.core.executors import login_executor
+    monkeypatch.setattr(login_executor, "max_pending", 0)
+    r = _post_login({"username": "alice", "password": "alice-pass"})
+    assert r.status_code == 503
+    assert r.headers.get("retry-after") == "1"
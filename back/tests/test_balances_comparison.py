@@ -0,0 +1,76 @@
+# -------------------------------------------
+# back/tests/test_balances_comparison.py
+# Pruebas del reporte comparativo entre periodos (una sola carga de contadores).
+# -------------------------------------------
+from datetime import datetime
+import io
+
+import openpyxl
+import pytest
+
+from back.domain.balances.comparison import generar_reporte_comparativo, periodos_de_comparacion
+from back.domain.balances.export import generar_excel_reporte
+from back.domain.balances.machine_balance import calcular_cuadre_maquina
+from back.tests.conftest import FakeMachines, FakePlaces
+
+MACHINES = FakeMachines([
+    {"id": "1", "marca": "IGT", "modelo": "S2000", "serial": "A1", "asset": "X1",
+     "denominacion": "10.0", "estado": "True", "casino_id": "1"},
+    {"id": "2", "marca": "Aristocrat", "modelo": "MK6", "serial": "A2", "asset": "X2",
+     "denominacion": "1.0", "estado": "True", "casino_id": "1"},
+])
+PLACES = FakePlaces({1: "Casino Uno"})
+
+
+@pytest.fixture
+def repo(counters_csv):
+    rows = []
+    for machine_id in (1, 2):
+        # Octubre y noviembre: la máquina 1 sube el doble en noviembre; la 2 no tiene datos en octubre
+        for at, in_amount in (("2025-10-01 08:00:00", 1000), ("2025-10-31 20:00:00", 1100),
+                              ("2025-11-01 08:00:00", 1100), ("2025-11-30 20:00:00", 1300)):
+            if machine_id == 2 and at.startswith("2025-10"):
+                continue
+            rows.append({"machine_id": machine_id, "casino_id": 1, "at": at,
+                         "in_amount": in_amount, "out_amount": in_amount / 2,
+                         "jackpot_amount": 0, "billetero_amount": in_amount})
+    return counters_csv(rows)
+
+
+def test_periodos_predefinidos():
+    assert periodos_de_comparacion("2025-03-01", "2025-03-31", ["anterior", "anio_anterior"]) == [
+        ("2025-03-01", "2025-03-31"), ("2025-02-01", "2025-02-28"), ("2024-03-01", "2024-03-31"),
+    ]
+    assert periodos_de_comparacion("2025-03-10", "2025-03-16", ["anterior"])[1] == ("2025-03-03", "2025-03-09")
+    with pytest.raises(ValueError):
+        periodos_de_comparacion("2025-03-01", "2025-03-31", ["semana"])
+
+
+def test_comparativo_casino_mes_contra_mes(repo):
+    periodos = periodos_de_comparacion("2025-11-01", "2025-11-30", ["anterior"])
+    report = generar_reporte_comparativo(periodos, repo, MACHINES, PLACES,
+                                         datetime.now, "test", casino_id=1)
+
+    m1, m2 = report["machines_comparison"]
+    # Cada periodo coincide con el cuadre individual de la máquina
+    cuadre = calcular_cuadre_maquina(1, "2025-11-01", "2025-11-30", repo, MACHINES, None,
+                                     clock=datetime.now, actor="test", persist=False)
+    assert m1["periodos"][0]["utilidad"] == cuadre["utilidad_total"]
+    assert m1["periodos"][0]["in_total"] == 2000.0 and m1["periodos"][1]["in_total"] == 1000.0
+    assert m1["variaciones"][0]["in_total"] == {"delta": 1000.0, "pct": 100.0}
+    # Sin datos en el periodo comparado: delta sin porcentaje
+    assert m2["periodos"][1]["has_data"] is False
+    assert m2["variaciones"][0]["in_total"]["pct"] is None
+
+    assert report["periodos"][0]["category_totals"]["in_total"] == 2200.0
+    assert report["category_deltas"][0]["in_total"]["delta"] == 1200.0
+
+
+def test_comparativo_exporta_a_excel(repo):
+    periodos = periodos_de_comparacion("2025-11-01", "2025-11-30", ["anterior"])
+    report = generar_reporte_comparativo(periodos, repo, MACHINES, PLACES,
+                                         datetime.now, "test", machine_id=1)
+    wb = openpyxl.load_workbook(io.BytesIO(generar_excel_reporte(report)))
+    valores = [c for row in wb.active.iter_rows(values_only=True) for c in row if c is not None]
+    assert "COMPARATIVO ENTRE PERIODOS" in valores
+    assert "VARIACIÓN DE UTILIDAD POR MÁQUINA" in valores
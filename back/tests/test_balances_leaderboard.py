@@ -0,0 +1,70 @@
+# -------------------------------------------
+# back/tests/test_balances_leaderboard.py
+# Pruebas del ranking top/bottom N de máquinas.
+# -------------------------------------------
+import pytest
+
+from back.domain.balances.leaderboard import ranking_maquinas
+from back.tests.conftest import FakeMachines, FakePlaces
+
+MACHINES = FakeMachines([
+    {"id": str(i), "marca": "IGT" if i % 2 else "Aristocrat", "modelo": "S2000", "serial": f"S{i}",
+     "asset": f"A{i}", "denominacion": "1.0", "estado": "True", "casino_id": "1" if i <= 5 else "2"}
+    for i in range(1, 11)
+])
+PLACES = FakePlaces()
+
+
+# IN crece 100 × machine_id en el periodo; OUT crece 50 fijo
+ROWS = [
+    {"machine_id": machine_id, "casino_id": 1, "at": at,
+     "in_amount": 1000 + 100 * machine_id * factor, "out_amount": 500 + 50 * factor,
+     "jackpot_amount": 0, "billetero_amount": 0}
+    for machine_id in range(1, 11)
+    for at, factor in (("2025-11-01 08:00:00", 0), ("2025-11-02 20:00:00", 1))
+]
+
+
+@pytest.fixture
+def repo(counters_csv):
+    return counters_csv(ROWS)
+
+
+def test_top_y_bottom_desde_contadores(repo):
+    top = ranking_maquinas("2025-11-01", "2025-11-02", repo, MACHINES, PLACES, n=3, fuente="counters")
+    assert top["fuente"] == "counters"
+    assert [r["machine_id"] for r in top["rows"]] == [10, 9, 8]
+    assert top["rows"][0]["utilidad_total"] == 1000 - 50
+    assert [r["rank"] for r in top["rows"]] == [1, 2, 3]
+
+    bottom = ranking_maquinas("2025-11-01", "2025-11-02", repo, MACHINES, PLACES,
+                              n=2, orden="bottom", casino_id=2, marca="igt", fuente="counters")
+    # Casino 2 (máquinas 6-10) y marca IGT (impares): 7 y 9
+    assert [r["machine_id"] for r in bottom["rows"]] == [7, 9]
+    assert bottom["machines_considered"] == 2
+
+
+def test_agregado_diario_coincide_con_contadores(counters_csv):
+    # Una lectura por día (el caso en que sumar cuadres diarios daría 0) y
+    # además varias lecturas el mismo día con empate de 'at'
+    repo = counters_csv(ROWS + [
+        {"machine_id": 3, "casino_id": 1, "at": "2025-11-03 09:00:00", "in_amount": 5000,
+         "out_amount": 900, "jackpot_amount": 40, "billetero_amount": 10},
+        {"machine_id": 3, "casino_id": 1, "at": "2025-11-03 09:00:00", "in_amount": 5100,
+         "out_amount": 950, "jackpot_amount": 40, "billetero_amount": 10},
+        {"machine_id": 4, "casino_id": 1, "at": "2025-11-04 10:00:00", "in_amount": 9000,
+         "out_amount": 600, "jackpot_amount": 0, "billetero_amount": 0},
+    ])
+
+    for periodo in (("2025-11-01", "2025-11-04"), ("2025-11-02", "2025-11-03"), ("2025-11-01", "2025-11-01")):
+        for metrica in ("utilidad", "in", "jackpot"):
+            desde_contadores = ranking_maquinas(*periodo, repo, MACHINES, PLACES, metrica=metrica,
+                                                n=10, fuente="counters")
+            diario = ranking_maquinas(*periodo, repo, MACHINES, PLACES, metrica=metrica,
+                                      n=10, fuente="daily")
+            assert diario["fuente"] == "daily" and desde_contadores["fuente"] == "counters"
+            assert diario["rows"] == desde_contadores["rows"]
+
+    # Entre el día 1 y el día 2 la máquina 10 sube IN 1000: el agregado lo cuenta
+    top = ranking_maquinas("2025-11-01", "2025-11-02", repo, MACHINES, PLACES, n=1)
+    assert top["fuente"] == "daily" and top["rows"][0]["in_total"] == 1000
@@ -0,0 +1,73 @@
+# -------------------------------------------
+# back/tests/test_balances_timeseries.py
+# Pruebas de la serie de tiempo de cuadres (una pasada por counters.csv).
+# -------------------------------------------
+from datetime import datetime
+
+import pytest
+
+from back.domain.balances.machine_balance import NotFoundError, calcular_cuadre_maquina
+from back.domain.balances.timeseries import serie_utilidad
+from back.tests.conftest import FakeMachines, FakePlaces
+
+PLACES = FakePlaces({1: "Casino 1", 2: "Casino 2"})
+MACHINES = FakeMachines([
+    {"id": "1", "marca": "IGT", "modelo": "S2000", "denominacion": "10.0", "estado": "True", "casino_id": "1"},
+    {"id": "2", "marca": "Aristocrat", "modelo": "MK6", "denominacion": "0", "estado": "True", "casino_id": "1"},
+    {"id": "3", "marca": "IGT", "modelo": "S2000", "denominacion": "5.0", "estado": "False", "casino_id": "1"},
+    {"id": "4", "marca": "IGT", "modelo": "S2000", "denominacion": "2.0", "estado": "True", "casino_id": "2"},
+])
+
+
+@pytest.fixture
+def repo(counters_csv):
+    rows = []
+    for machine_id in (1, 2, 3, 4):
+        for i, day in enumerate(("2025-11-03", "2025-11-04", "2025-11-12")):
+            for hour, extra in (("08:00:00", 0), ("20:00:00", 7)):
+                base = 100 * (i + 1) * machine_id + extra
+                rows.append({
+                    "machine_id": machine_id, "casino_id": 1 if machine_id < 4 else 2,
+                    "at": f"{day} {hour}", "in_amount": base * 3, "out_amount": base,
+                    "jackpot_amount": extra, "billetero_amount": base * 2,
+                })
+    return counters_csv(rows)
+
+
+def test_punto_diario_coincide_con_cuadre_de_maquina(repo):
+    serie = serie_utilidad("2025-11-03", "2025-11-05", repo, MACHINES, PLACES, machine_id=1)
+    assert [p["period_start"] for p in serie["points"]] == ["2025-11-03", "2025-11-04", "2025-11-05"]
+    assert serie["points"][2]["machines_with_data"] == 0
+
+    cuadre = calcular_cuadre_maquina(1, "2025-11-04", "2025-11-04", repo, MACHINES, None,
+                                     clock=datetime.now, actor="test", persist=False)
+    punto = serie["points"][1]
+    for campo in ("in_total", "out_total", "jackpot_total", "billetero_total", "utilidad_total"):
+        assert punto[campo] == cuadre[campo]
+
+
+def test_casino_semanal_y_grupo_marca(repo):
+    # Casino 1: máquinas activas 1 (denominación 10) y 2 (denominación 0 -> 1); la 3 está inactiva
+    serie = serie_utilidad("2025-11-01", "2025-11-16", repo, MACHINES, PLACES,
+                           casino_id=1, granularidad="week")
+    assert serie["machines"] == 2
+    # Semanas lunes-domingo recortadas al periodo pedido
+    assert [(p["period_start"], p["period_end"]) for p in serie["points"]] == [
+        ("2025-11-01", "2025-11-02"), ("2025-11-03", "2025-11-09"), ("2025-11-10", "2025-11-16"),
+    ]
+    # Semana del 3 al 9: IN = ((200*m + 7)*3 - (100*m)*3) × denominación, por máquina
+    assert serie["points"][1]["in_total"] == (207 * 3 - 100 * 3) * 10 + (407 * 3 - 200 * 3) * 1
+
+    grupo = serie_utilidad("2025-11-01", "2025-11-30", repo, MACHINES, PLACES,
+                           marca="igt", modelo="s2000", granularidad="month")
+    assert grupo["machines"] == 2  # máquinas 1 y 4 (la 3 está inactiva)
+    assert len(grupo["points"]) == 1 and grupo["points"][0]["machines_with_data"] == 2
+
+
+def test_validaciones(repo):
+    with pytest.raises(ValueError):
+        serie_utilidad("2025-11-01", "2025-11-30", repo, MACHINES, PLACES)
+    with pytest.raises(ValueError):
+        serie_utilidad("2025-11-30", "2025-11-01", repo, MACHINES, PLACES, casino_id=1)
+    with pytest.raises(NotFoundError):
+        serie_utilidad("2025-11-01", "2025-11-30", repo, MACHINES, PLACES, machine_id=3)
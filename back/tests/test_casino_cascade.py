@@ -0,0 +1,123 @@
+# -------------------------------------------
+# back/tests/test_casino_cascade.py
+# Pruebas de la inactivación en cascada de un casino y su reversa.
+# Usan archivos temporales para no tocar data/.
+# -------------------------------------------
+import pandas as pd
+import pytest
+
+from back.domain.machines import inativation
+from back.domain.places.management import CasinoManagement, CASCADE_INACTIVATION
+from back.storage import places_repo
+from back.storage.audit_log import AuditLog
+
+
+@pytest.fixture
+def archivos(tmp_path, monkeypatch):
+    places = tmp_path / "places.csv"
+    machines = tmp_path / "machines.csv"
+    pd.DataFrame([
+        {"id": 1, "nombre": "A", "direccion": "x", "codigo_casino": "A1", "estado": True,
+         "created_at": "", "created_by": "", "updated_at": "", "updated_by": ""},
+        {"id": 2, "nombre": "B", "direccion": "y", "codigo_casino": "B1", "estado": True,
+         "created_at": "", "created_by": "", "updated_at": "", "updated_by": ""},
+    ]).to_csv(places, index=False)
+    pd.DataFrame([
+        {"id": "1", "serial": "SN1", "casino_id": "1", "estado": "True", "is_active": "True"},
+        {"id": "2", "serial": "SN2", "casino_id": "1", "estado": "False", "is_active": "False"},
+        {"id": "3", "serial": "SN3", "casino_id": "1", "estado": "True", "is_active": "True"},
+        {"id": "4", "serial": "SN4", "casino_id": "2", "estado": "True", "is_active": "True"},
+    ]).to_csv(machines, index=False)
+    monkeypatch.setattr(places_repo, "PLACES_CSV", places)
+    monkeypatch.setattr(inativation, "MACHINES_CSV", str(machines))
+    monkeypatch.setattr(inativation, "MACHINES_STATUS_CSV", str(tmp_path / "machines_status.csv"))
+    monkeypatch.setattr(inativation, "LOGS_CSV", str(tmp_path / "logs.csv"))
+    monkeypatch.setattr(inativation, "audit_log", AuditLog(directory=tmp_path / "audit", legacy_csv=None))
+    monkeypatch.setattr(inativation, "_status_cache", {"text": None, "sig": None})
+    return places, machines
+
+
+def _estados(machines):
+    df = pd.read_csv(machines, dtype=str)
+    return dict(zip(df["serial"], df["is_active"]))
+
+
+def test_cascada_y_reversa(archivos):
+    places, machines = archivos
+
+    out = CasinoManagement.inactivar_casino_en_cascada(1, actor="tester")
+    assert out["machines_inactivated"] == 2 and out["machines_total"] == 3
+    assert _estados(machines) == {"SN1": "False", "SN2": "False", "SN3": "False", "SN4": "True"}
+    assert not bool(pd.read_csv(places).set_index("id").at[1, "estado"])
+
+    entries, _ = inativation.audit_log.query(action=CASCADE_INACTIVATION)
+    assert len(entries) == 1
+    assert {p["serial"]: p["is_active"] for p in entries[0]["prior_states"]} == {
+        "SN1": True, "SN2": False, "SN3": True,
+    }
+
+    back = CasinoManagement.revertir_inactivacion_en_cascada(1, actor="tester")
+    assert back["machines_restored"] == 2
+    # SN2 ya estaba inactiva antes de la cascada: sigue inactiva
+    assert _estados(machines) == {"SN1": "True", "SN2": "False", "SN3": "True", "SN4": "True"}
+    assert bool(pd.read_csv(places).set_index("id").at[1, "estado"])
+
+    with pytest.raises(ValueError):
+        CasinoManagement.revertir_inactivacion_en_cascada(1)
+
+
+def test_casino_inexistente(archivos):
+    with pytest.raises(KeyError):
+        CasinoManagement.inactivar_casino_en_cascada(99)
+    with pytest.raises(ValueError):
+        CasinoManagement.revertir_inactivacion_en_cascada(2)
+
+
+def test_is_active_vacio_usa_estado(archivos):
+    places, machines = archivos
+    df = pd.read_csv(machines, dtype=str)
+    # Máquina creada por POST /machines: solo `estado`
+    df.loc[df["serial"] == "SN3", "is_active"] = ""
+    df.to_csv(machines, index=False)
+
+    out = CasinoManagement.inactivar_casino_en_cascada(1, actor="tester")
+    assert out["machines_inactivated"] == 2
+    df = pd.read_csv(machines, dtype=str).set_index("serial")
+    assert (df.at["SN3", "is_active"], df.at["SN3", "estado"]) == ("False", "False")
+
+    entries, _ = inativation.audit_log.query(action=CASCADE_INACTIVATION)
+    assert {p["serial"]: p["is_active"] for p in entries[0]["prior_states"]}["SN3"] is True
+
+    back = CasinoManagement.revertir_inactivacion_en_cascada(1, actor="tester")
+    assert back["machines_restored"] == 2
+    df = pd.read_csv(machines, dtype=str).set_index("serial")
+    assert (df.at["SN3", "is_active"], df.at["SN3", "estado"]) == ("True", "True")
+
+
+def test_falla_places_restaura_maquinas(archivos, monkeypatch):
+    places, machines = archivos
+    antes = _estados(machines)
+
+    def _falla(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(places_repo.PlaceStorage, "inactivar", _falla)
+    with pytest.raises(OSError):
+        CasinoManagement.inactivar_casino_en_cascada(1, actor="tester")
+    assert _estados(machines) == antes
+    assert bool(pd.read_csv(places).set_index("id").at[1, "estado"])
+    assert inativation.audit_log.query(action=CASCADE_INACTIVATION)[0] == []
+
+
+def test_segunda_cascada_se_rechaza_y_la_reversa_restaura(archivos):
+    places, machines = archivos
+    CasinoManagement.inactivar_casino_en_cascada(1, actor="tester")
+    # Reintento / doble clic: no registra una segunda cascada
+    with pytest.raises(ValueError, match="ya está inactivo"):
+        CasinoManagement.inactivar_casino_en_cascada(1, actor="tester")
+    entries, _ = inativation.audit_log.query(action=CASCADE_INACTIVATION)
+    assert len(entries) == 1
+
+    back = CasinoManagement.revertir_inactivacion_en_cascada(1, actor="tester")
+    assert back["machines_restored"] == 2
+    assert _estados(machines) == {"SN1": "True", "SN2": "False", "SN3": "True", "SN4": "True"}
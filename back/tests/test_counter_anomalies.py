@@ -0,0 +1,81 @@
+# -------------------------------------------
+# back/tests/test_counter_anomalies.py
+# Pruebas del escaneo de anomalías de contadores (saltos negativos/atípicos).
+# Usan CSV temporales para no modificar data/.
+# -------------------------------------------
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from back.domain.counters.anomalies import escanear_anomalias
+from back.storage import counters_repo
+from back.storage.anomalies_repo import AnomaliesRepo
+from back.storage.counters_repo import CountersRepo, EXPECTED_COLUMNS
+
+
+def _clock():
+    return datetime(2025, 12, 1, 8, 0, 0)
+
+
+def _lecturas():
+    rows = []
+    next_id = 1
+    # Máquina 1: sube 10 por día y el día 8 se reinicia el medidor IN
+    # Máquina 2: sube 5 por día y el día 6 tiene un salto de 5000 en OUT
+    for machine_id, casino_id in ((1, 1), (2, 2)):
+        value = 1000.0
+        for day in range(1, 11):
+            value += 10 if machine_id == 1 else 5
+            in_amount = 3.0 if (machine_id == 1 and day == 8) else value
+            out_amount = value + (5000 if (machine_id == 2 and day >= 6) else 0)
+            rows.append({
+                "id": next_id,
+                "machine_id": machine_id,
+                "casino_id": casino_id,
+                "at": f"2025-11-{day:02d} 10:00:00",
+                "in_amount": in_amount,
+                "out_amount": out_amount,
+                "jackpot_amount": 0.0,
+                "billetero_amount": value,
+            })
+            next_id += 1
+    # Orden de llegada distinto al cronológico (cargas atrasadas)
+    return pd.DataFrame(rows).sample(frac=1, random_state=7).reindex(columns=EXPECTED_COLUMNS)
+
+
+@pytest.fixture
+def repos(tmp_path, monkeypatch):
+    monkeypatch.setattr(counters_repo, "CSV_PATH", tmp_path / "counters.csv")
+    _lecturas().to_csv(tmp_path / "counters.csv", index=False)
+    return CountersRepo(), AnomaliesRepo(path=tmp_path / "counter_anomalies.csv")
+
+
+def test_escaneo_detecta_reinicio_y_salto(repos):
+    counters, anomalies = repos
+    resumen = escanear_anomalias(counters, anomalies, _clock)
+
+    assert resumen["readings"] == 20
+    assert resumen["machines"] == 2
+    hallazgos = anomalies.listar()
+    pares = {(h["machine_id"], h["meter"], h["kind"], h["at"][:10]) for h in hallazgos}
+    # Reinicio: baja el día 8 y el día 9 vuelve a subir de golpe
+    assert ("1", "in_amount", "negative", "2025-11-08") in pares
+    assert ("1", "in_amount", "outlier", "2025-11-09") in pares
+    assert ("2", "out_amount", "outlier", "2025-11-06") in pares
+    assert resumen["findings"] == len(hallazgos) == 3
+
+    assert anomalies.contar_maquina(1, "2025-11-01", "2025-11-30") == 2
+    assert anomalies.contar_maquina(2, "2025-11-07", "2025-11-30") == 0
+
+
+def test_particiones_dan_el_mismo_resultado(repos):
+    counters, anomalies = repos
+    escanear_anomalias(counters, anomalies, _clock)
+    en_memoria = anomalies.listar()
+
+    # Bloques y particiones diminutos fuerzan el camino de memoria acotada
+    resumen = escanear_anomalias(counters, anomalies, _clock, chunksize=3, bucket_bytes=200)
+    assert resumen["partitions"] > 1
+    assert sorted(anomalies.listar(), key=lambda h: (h["machine_id"], h["at"], h["meter"])) == \
+        sorted(en_memoria, key=lambda h: (h["machine_id"], h["at"], h["meter"]))
@@ -0,0 +1,175 @@
+# -------------------------------------------
+# back/tests/test_counters_index.py
+# Pruebas del índice de unicidad (machine_id, at), de update_batch de CountersRepo
+# y de la última lectura por máquina.
+# Usan un CSV temporal para no modificar data/counters.csv.
+# -------------------------------------------
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import back.api.v1.counters as counters_api
+from back.domain.users.login import _create_access_token
+from back.main import app
+from back.storage import counters_repo
+from back.storage.counters_repo import CountersRepo
+
+
+def _row(machine_id, at, **extra):
+    row = {
+        "id": None,
+        "machine_id": machine_id,
+        "casino_id": 1,
+        "at": at,
+        "in_amount": 100.0,
+        "out_amount": 50.0,
+        "jackpot_amount": 0.0,
+        "billetero_amount": 10.0,
+    }
+    row.update(extra)
+    return row
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(counters_repo, "CSV_PATH", tmp_path / "counters.csv")
+    return CountersRepo()
+
+
+def test_insert_registra_clave_en_indice(repo):
+    assert not repo.has_reading(1, "2025-11-25 10:00:00")
+    repo.insert_counter(_row(1, "2025-11-25 10:00:00"))
+    assert repo.has_reading(1, "2025-11-25 10:00:00")
+    assert not repo.has_reading(2, "2025-11-25 10:00:00")
+
+
+def test_insert_many_valida_dentro_del_lote(repo):
+    repo.insert_counter(_row(1, "2025-11-25 10:00:00"))
+    with pytest.raises(ValueError):
+        repo.insert_many([_row(2, "2025-11-25 10:00:00"), _row(2, "2025-11-25 10:00:00")])
+    # Nada se escribió del lote fallido
+    assert not repo.has_reading(2, "2025-11-25 10:00:00")
+
+    inserted = repo.insert_many([_row(2, "2025-11-25 10:00:00"), _row(3, "2025-11-25 10:00:00")])
+    assert [r["id"] for r in inserted] == [2, 3]
+    assert repo.has_reading(3, "2025-11-25 10:00:00")
+
+
+def test_update_counter_mueve_clave(repo):
+    created = repo.insert_counter(_row(1, "2025-11-25 10:00:00"))
+    repo.insert_counter(_row(1, "2025-11-25 11:00:00"))
+
+    with pytest.raises(ValueError):
+        repo.update_counter(created["id"], {"at": "2025-11-25 11:00:00"})
+
+    repo.update_counter(created["id"], {"at": "2025-11-25 12:00:00"})
+    assert not repo.has_reading(1, "2025-11-25 10:00:00")
+    assert repo.has_reading(1, "2025-11-25 12:00:00")
+
+
+def test_indice_detecta_escritura_de_otra_instancia(repo):
+    otro = CountersRepo()
+    assert not repo.has_reading(5, "2025-11-25 10:00:00")
+    otro.insert_counter(_row(5, "2025-11-25 10:00:00"))
+    assert repo.has_reading(5, "2025-11-25 10:00:00")
+
+
+def test_update_batch_varios_dias_una_escritura(repo, monkeypatch):
+    from datetime import datetime
+
+    repo.insert_many([
+        _row(1, "2025-11-25 10:00:00"),
+        _row(1, "2025-11-25 18:00:00"),
+        _row(2, "2025-11-25 10:00:00"),
+        _row(1, "2025-11-26 10:00:00"),
+        _row(3, "2025-11-26 10:00:00", casino_id=2),
+    ])
+    writes = []
+    original = repo._write_df
+    monkeypatch.setattr(repo, "_write_df", lambda df: (writes.append(1), original(df)))
+
+    updated = repo.update_batch(
+        casino_id=1,
+        fecha_filtro="2025-11-25",
+        updates=[
+            {"machine_id": 1, "at": "2025-11-25 18:00:00", "in_amount": 999.0},
+            {"machine_id": 1, "fecha": "2025-11-26", "out_amount": 7.0},
+            {"machine_id": 3, "fecha": "2025-11-26", "out_amount": 7.0},
+        ],
+        actor="tester",
+        timestamp=datetime(2025, 11, 27, 8, 0, 0),
+    )
+
+    assert len(writes) == 1
+    assert [(r["id"], r["machine_id"], r["casino_id"]) for r in updated] == [("2", 1, 1), ("4", 1, 1)]
+    assert updated[0]["in_amount"] == "999.0"
+    assert updated[1]["out_amount"] == "7.0"
+    assert updated[1]["updated_by"] == "tester"
+
+    # La máquina 2 y el otro casino no se tocaron
+    assert pd.isna(repo.get_by_id(3)["updated_by"])
+    assert float(repo.get_by_id(5)["out_amount"]) == 50.0
+
+
+def test_ultima_lectura_se_mantiene_en_insert_y_update(repo):
+    repo.insert_counter(_row(1, "2025-11-25 10:00:00", in_amount=100.0))
+    repo.insert_counter(_row(1, "2025-11-24 10:00:00", in_amount=90.0))  # carga atrasada
+    repo.insert_many([_row(2, "2025-11-25 09:00:00"), _row(2, "2025-11-25 11:00:00", in_amount=300.0)])
+
+    assert repo.latest_reading(1)["at"] == "2025-11-25 10:00:00"
+    assert float(repo.latest_reading(2)["in_amount"]) == 300.0
+    assert repo.latest_reading(3) is None
+
+    # Mover la lectura más nueva hacia atrás cambia cuál es la última
+    repo.update_counter(1, {"at": "2025-11-23 10:00:00"})
+    assert repo.latest_reading(1)["at"] == "2025-11-24 10:00:00"
+
+    latest = repo.latest_by_machines([1, 2, 3])
+    assert set(latest) == {1, 2}
+
+    # Otra instancia (p. ej. tras reiniciar) reconstruye el mismo mapa desde el CSV
+    assert CountersRepo().latest_reading(2)["at"] == "2025-11-25 11:00:00"
+
+
+def test_verificar_monotonia():
+    from back.domain.counters.create import verificar_monotonia
+
+    ultima = {"at": "2025-11-25 10:00:00", "in_amount": "100.0", "out_amount": "50.0",
+              "jackpot_amount": "0.0", "billetero_amount": "10.0"}
+    assert verificar_monotonia(_row(1, "2025-11-26 10:00:00", in_amount=120.0), ultima) == []
+    avisos = verificar_monotonia(_row(1, "2025-11-26 10:00:00", in_amount=80.0), ultima)
+    assert len(avisos) == 1 and "in_amount" in avisos[0]
+    # Lecturas anteriores a la última no se juzgan
+    assert verificar_monotonia(_row(1, "2025-11-24 10:00:00", in_amount=80.0), ultima) == []
+    assert verificar_monotonia(_row(1, "2025-11-26 10:00:00"), None) == []
+
+
+def test_ultima_lectura_invalida_no_oculta_la_maquina(monkeypatch):
+    class Places:
+        @staticmethod
+        def obtener_por_id(casino_id):
+            return {"id": casino_id, "estado": True}
+
+    class Machines:
+        @staticmethod
+        def listar(only_active=None, casino_id=None):
+            return [{"id": "1", "serial": "SN1", "is_active": "True"},
+                    {"id": "2.0", "serial": "SN2", "estado": "True"}]
+
+    class Counters:
+        @staticmethod
+        def latest_by_machines(ids):
+            lectura = {"id": 10, "machine_id": 1, "casino_id": 1, "at": "2025-11-25 10:00:00",
+                       "in_amount": 1.0, "out_amount": 0.0, "jackpot_amount": 0.0, "billetero_amount": 0.0}
+            return {1: lectura, 2: {**lectura, "id": "no-numerico", "machine_id": 2}}
+
+    monkeypatch.setattr(counters_api, "repo_places", Places())
+    monkeypatch.setattr(counters_api, "repo_machines", Machines())
+    monkeypatch.setattr(counters_api, "repo_counters", Counters())
+    token = _create_access_token({"sub": "1", "username": "admin", "role": "admin"})
+    r = TestClient(app).get("/api/v1/counters/machines-by-casino/1/latest",
+                            headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+    body = r.json()
+    assert [(m["id"], m["serial"]) for m in body] == [(1, "SN1"), (2, "SN2")]
+    assert body[0]["latest"]["id"] == 10 and body[1]["latest"] is None
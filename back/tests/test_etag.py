@@ -0,0 +1,57 @@
+# -------------------------------------------
+# back/tests/test_etag.py
+# Pruebas de ETag / GET condicional (304 sin ejecutar el endpoint).
+# -------------------------------------------
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+from back.api.v1 import places as places_api
+from back.domain.users.login import _create_access_token
+from back.main import app
+from back.storage import places_repo
+
+
+@pytest.fixture
+def places_csv(tmp_path, monkeypatch):
+    path = tmp_path / "places.csv"
+    shutil.copy(places_repo.PLACES_CSV, path)
+    monkeypatch.setattr(places_repo, "PLACES_CSV", path)
+    return path
+
+
+def test_304_sin_ejecutar_y_etag_nuevo_al_cambiar_datos(places_csv, monkeypatch):
+    client = TestClient(app)
+    llamadas = []
+    real_listar = places_api.PlaceStorage.listar
+    monkeypatch.setattr(places_api.PlaceStorage, "listar",
+                        staticmethod(lambda **kw: llamadas.append(kw) or real_listar(**kw)))
+
+    r1 = client.get("/api/v1/places/casino")
+    etag = r1.headers["etag"]
+    assert r1.status_code == 200 and len(llamadas) == 1
+
+    r2 = client.get("/api/v1/places/casino", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.headers["etag"] == etag and r2.content == b""
+    assert len(llamadas) == 1
+
+    # Otra query -> otro ETag
+    assert client.get("/api/v1/places/casino?only_active=false").headers["etag"] != etag
+
+    # Cambia la tabla -> el ETag anterior ya no sirve
+    with open(places_csv, "a") as f:
+        f.write("\n")
+    r3 = client.get("/api/v1/places/casino", headers={"If-None-Match": etag})
+    assert r3.status_code == 200 and r3.headers["etag"] != etag
+
+
+def test_autenticacion_antes_del_304():
+    client = TestClient(app)
+    token = _create_access_token({"sub": "1", "username": "admin", "role": "admin"})
+    url = "/api/v1/balances/anomalies"
+    etag = client.get(url, headers={"Authorization": f"Bearer {token}"}).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 401
+    r = client.get(url, headers={"Authorization": f"Bearer {token}", "If-None-Match": f'W/{etag}'})
+    assert r.status_code == 304
@@ -0,0 +1,135 @@
+# -------------------------------------------
+# back/tests/test_executors.py
+# Pruebas de los ejecutores acotados (reportes / consultas livianas).
+# -------------------------------------------
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from back.core.executors import BoundedExecutor, ExecutorSaturatedError, lookups_executor
+from back.main import app
+
+
+def test_tope_por_ruta_y_profundidad_de_cola():
+    executor = BoundedExecutor("t", max_workers=1, max_pending=3)
+    liberar = threading.Event()
+
+    async def escenario():
+        lentos = [asyncio.ensure_future(executor.run_limited("pdf", 2, liberar.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        # Un hilo: un trabajo corriendo y otro en cola
+        stats = executor.stats()
+        assert (stats["running"], stats["queued"]) == (1, 1)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run_limited("pdf", 2, lambda: None)
+        # Otra ruta todavía entra (queda un cupo en el pool)
+        otra = asyncio.ensure_future(executor.run_limited("excel", 2, lambda: "ok"))
+        await asyncio.sleep(0.05)
+        liberar.set()
+        await asyncio.gather(*lentos)
+        return await otra
+
+    assert asyncio.run(escenario()) == "ok"
+    stats = executor.stats()
+    assert stats["routes"]["pdf"]["rejected"] == 1
+    assert stats["routes"]["pdf"]["max_in_flight"] == 2
+    assert stats["in_flight"] == 0 and stats["completed"] == 3
+
+
+def test_consultas_livianas_corren_en_su_pool(monkeypatch):
+    client = TestClient(app)
+    assert client.get("/health").status_code == 200
+
+    import back.api.v1.machines as machines_api
+    hilos = []
+    real_get = machines_api.repo.get_by_id
+    monkeypatch.setattr(machines_api.repo, "get_by_id", lambda mid: hilos.append(threading.current_thread().name) or real_get(mid))
+    client.get("/api/v1/machines/1")
+    assert hilos and hilos[0].startswith("lookups")
+
+    monkeypatch.setattr(lookups_executor, "max_pending", 0)
+    r = client.get("/api/v1/machines/1")
+    assert r.status_code == 503
+    assert r.headers.get("retry-after") == "2"
+
+
+def test_cancelar_no_libera_hasta_que_termina_el_hilo():
+    executor = BoundedExecutor("t", max_workers=1, max_pending=1)
+    liberar = threading.Event()
+
+    async def escenario():
+        tarea = asyncio.ensure_future(executor.run_limited("pdf", 1, liberar.wait, 5))
+        await asyncio.sleep(0.05)
+        tarea.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarea
+        # El hilo sigue ocupado: el lugar también
+        assert executor.stats()["in_flight"] == 1
+        with pytest.raises(ExecutorSaturatedError):
+            executor.reservar("pdf", 1)
+        liberar.set()
+        for _ in range(50):
+            if executor.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(escenario())
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_iterar_retiene_el_lugar_hasta_el_ultimo_bloque():
+    executor = BoundedExecutor("t", max_workers=1, max_pending=5)
+    hilos = []
+
+    def generador():
+        for i in range(3):
+            hilos.append(threading.current_thread().name)
+            yield i
+
+    async def recorrer(n=None):
+        reserva = executor.reservar("export", 1)
+        vistos = []
+        async for bloque in reserva.iterar(generador()):
+            vistos.append(bloque)
+            assert executor.stats()["routes"]["export"]["in_flight"] == 1
+            if n is not None and len(vistos) == n:
+                break
+        return vistos
+
+    assert asyncio.run(recorrer()) == [0, 1, 2]
+    assert hilos and all(h.startswith("t") for h in hilos)
+    assert executor.stats()["routes"]["export"]["in_flight"] == 0
+
+    # Corte a mitad de la descarga: también se libera
+    assert asyncio.run(recorrer(1)) == [0]
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_exportacion_lee_en_el_ejecutor_de_reportes(monkeypatch):
+    from back.core.executors import reports_executor
+    import back.api.v1.counters as counters_api
+    from back.core import settings
+    from back.domain.users.login import _create_access_token
+
+    hilos = []
+    real_iter = counters_api.repo_counters.iter_by_casino_date
+
+    def iter_medido(*args, **kwargs):
+        for bloque in real_iter(*args, **kwargs):
+            hilos.append(threading.current_thread().name)
+            yield bloque
+
+    monkeypatch.setattr(counters_api.repo_counters, "iter_by_casino_date", iter_medido)
+    token = _create_access_token({"sub": "1", "username": "admin", "role": "admin"})
+    client = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+    url = "/api/v1/counters/reportes/exportar?casino_id=1&start_date=2025-01-01&end_date=2026-12-31&fields=id"
+
+    r = client.get(url)
+    assert r.status_code == 200
+    assert hilos and all(h.startswith("reports") for h in hilos)
+    assert reports_executor.stats()["routes"]["exportar_reportes"]["in_flight"] == 0
+
+    monkeypatch.setattr(settings, "REPORTS_EXPORT_MAX_CONCURRENCY", 0)
+    assert client.get(url).status_code == 503
@@ -0,0 +1,93 @@
+# -------------------------------------------
+# back/tests/test_idempotency.py
+# Pruebas del almacén de Idempotency-Key (memoria acotada + sidecar JSONL).
+# -------------------------------------------
+import pytest
+
+from back.storage.idempotency_repo import (
+    IdempotencyStore,
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    fingerprint,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_replay_devuelve_respuesta_guardada(tmp_path):
+    store = IdempotencyStore(path=tmp_path / "idem.jsonl", max_entries=10, ttl_seconds=60)
+    fp = fingerprint({"machine_id": 1, "in_amount": 10.0})
+
+    assert store.get("POST /counters:1", "k1", fp) is None
+    store.put("POST /counters:1", "k1", fp, 201, {"id": 7})
+
+    cached = store.get("POST /counters:1", "k1", fp)
+    assert cached == {"status_code": 201, "body": {"id": 7}}
+    # Otro usuario con la misma key no ve la respuesta
+    assert store.get("POST /counters:2", "k1", fp) is None
+
+
+def test_misma_key_con_otro_cuerpo_es_conflicto(tmp_path):
+    store = IdempotencyStore(path=tmp_path / "idem.jsonl", max_entries=10, ttl_seconds=60)
+    store.put("s", "k1", fingerprint({"a": 1}), 201, {})
+    with pytest.raises(IdempotencyConflictError):
+        store.get("s", "k1", fingerprint({"a": 2}))
+
+
+def test_ttl_y_tope_de_entradas(tmp_path):
+    clock = FakeClock()
+    store = IdempotencyStore(path=tmp_path / "idem.jsonl", max_entries=2, ttl_seconds=60, clock=clock)
+    fp = fingerprint({})
+    store.put("s", "k1", fp, 201, {})
+    store.put("s", "k2", fp, 201, {})
+    store.put("s", "k3", fp, 201, {})
+    # k1 fue expulsada por el tope
+    assert store.get("s", "k1", fp) is None
+    assert store.get("s", "k3", fp) is not None
+
+    clock.now += 61
+    assert store.get("s", "k3", fp) is None
+
+
+def test_sidecar_sobrevive_reinicio(tmp_path):
+    path = tmp_path / "idem.jsonl"
+    clock = FakeClock()
+    fp = fingerprint({"x": 1})
+    IdempotencyStore(path=path, max_entries=10, ttl_seconds=60, clock=clock).put("s", "k1", fp, 201, {"id": 1})
+
+    reloaded = IdempotencyStore(path=path, max_entries=10, ttl_seconds=60, clock=clock)
+    assert reloaded.get("s", "k1", fp) == {"status_code": 201, "body": {"id": 1}}
+
+    clock.now += 120
+    expired = IdempotencyStore(path=path, max_entries=10, ttl_seconds=60, clock=clock)
+    assert len(expired) == 0
+
+
+def test_reserva_bloquea_duplicados_en_curso(tmp_path):
+    store = IdempotencyStore(path=tmp_path / "idem.jsonl", max_entries=10, ttl_seconds=60)
+    fp = fingerprint({"machine_id": 1})
+
+    assert store.reserve("s", "k1", fp) is None
+    # Reintento mientras la primera sigue corriendo
+    with pytest.raises(IdempotencyInProgressError):
+        store.reserve("s", "k1", fp)
+    with pytest.raises(IdempotencyConflictError):
+        store.reserve("s", "k1", fingerprint({"machine_id": 2}))
+
+    store.put("s", "k1", fp, 201, {"id": 1})
+    assert store.reserve("s", "k1", fp) == {"status_code": 201, "body": {"id": 1}}
+
+
+def test_release_permite_reintentar_tras_un_fallo(tmp_path):
+    store = IdempotencyStore(path=tmp_path / "idem.jsonl", max_entries=10, ttl_seconds=60)
+    fp = fingerprint({})
+    assert store.reserve("s", "k1", fp) is None
+    store.release("s", "k1")
+    assert store.reserve("s", "k1", fp) is None
+    assert not (tmp_path / "idem.jsonl").exists()
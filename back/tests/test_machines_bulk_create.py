@@ -0,0 +1,95 @@
+# -------------------------------------------
+# back/tests/test_machines_bulk_create.py
+# Pruebas del alta masiva de máquinas (JSON y CSV/XLSX).
+# Usan un machines.csv temporal para no tocar data/.
+# -------------------------------------------
+import io
+
+import pandas as pd
+import pytest
+
+from back.domain.machines.bulk_create import (
+    registrar_maquinas_masivo,
+    leer_lote_maquinas,
+    CargaMasivaError,
+)
+from back.storage.machines_repo import MachinesRepo
+
+
+class FakePlaces:
+    @staticmethod
+    def listar(only_active=None):
+        return [{"id": 1, "estado": True}, {"id": 2, "estado": False}]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    r = MachinesRepo(filepath=str(tmp_path / "machines.csv"))
+    r.add({"id": 1, "marca": "A", "modelo": "X", "serial": "SN1", "asset": "AS1",
+           "denominacion": "1.0", "estado": "True", "casino_id": 1}, "seed")
+    return r
+
+
+def _m(serial, asset, place_id=1, **extra):
+    return {"marca": "M", "modelo": "Z", "serial": serial, "asset": asset,
+            "place_id": place_id, "denominacion": 0.5, **extra}
+
+
+def test_lote_con_resultados_por_fila(repo, monkeypatch):
+    saves = []
+    original = repo._save
+    monkeypatch.setattr(repo, "_save", lambda: (saves.append(1), original())[1])
+
+    out = registrar_maquinas_masivo([
+        _m("SN2", "AS2"),
+        _m("sn1", "AS3"),             # serial existente (sin distinguir mayúsculas)
+        _m("SN3", "AS2"),             # asset repetido en el lote
+        _m("SN4", "AS4", place_id=2),  # casino inactivo
+        _m("SN5", "AS5", place_id=9),  # casino inexistente
+        {"serial": "SN6"},            # inválida
+        _m("SN7", "AS7"),
+    ], machines_repo=repo, places_repo=FakePlaces(), actor="tester")
+
+    assert [(r["serial"], r["status"], r["id"]) for r in out["results"]] == [
+        ("SN2", "created", 2),
+        ("sn1", "duplicate", None),
+        ("SN3", "duplicate", None),
+        ("SN4", "casino_error", None),
+        ("SN5", "casino_error", None),
+        ("SN6", "invalid", None),
+        ("SN7", "created", 3),
+    ]
+    assert out["created"] == 2 and out["rejected"] == 5
+    assert saves == [1]
+
+    df = pd.read_csv(repo.filepath, dtype=str)
+    assert df["serial"].tolist() == ["SN1", "SN2", "SN7"]
+    assert df["created_by"].tolist()[1:] == ["tester", "tester"]
+
+
+def test_leer_csv_y_xlsx():
+    df = pd.DataFrame([{"marca": "M", "modelo": "Z", "serial": "S1", "asset": "A1",
+                        "casino_id": "1", "denominacion": "0.5", "is_active": ""}])
+    rows = leer_lote_maquinas(df.to_csv(index=False).encode(), "text/csv; charset=utf-8")
+    assert rows == [{"marca": "M", "modelo": "Z", "serial": "S1", "asset": "A1",
+                     "place_id": "1", "denominacion": "0.5"}]
+
+    buf = io.BytesIO()
+    df.to_excel(buf, index=False)
+    assert leer_lote_maquinas(buf.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet") == rows
+
+    with pytest.raises(CargaMasivaError):
+        leer_lote_maquinas(b"x", "application/pdf")
+
+
+def test_casino_sin_estado_se_acepta_como_en_el_alta_individual(repo):
+    class PlacesSinEstado:
+        @staticmethod
+        def listar(only_active=None):
+            return [{"id": 3, "estado": None}, {"id": 4, "estado": float("nan")}, {"id": 5, "estado": "false"}]
+
+    out = registrar_maquinas_masivo(
+        [_m("SN8", "AS8", place_id=3), _m("SN9", "AS9", place_id=4), _m("SN10", "AS10", place_id=5)],
+        machines_repo=repo, places_repo=PlacesSinEstado(), actor="tester",
+    )
+    assert [r["status"] for r in out["results"]] == ["created", "created", "casino_error"]
@@ -0,0 +1,126 @@
+# -------------------------------------------
+# back/tests/test_machines_status.py
+# Pruebas de machines_status.csv y de la activación/inactivación masiva.
+# Usan archivos temporales para no tocar data/.
+# -------------------------------------------
+import pandas as pd
+import pytest
+
+from back.domain.machines import activation, inativation
+from back.domain.machines.bulk_status import cambiar_estado_masivo
+from back.storage.audit_log import AuditLog
+
+
+@pytest.fixture
+def archivos(tmp_path, monkeypatch):
+    machines = tmp_path / "machines.csv"
+    status = tmp_path / "machines_status.csv"
+    pd.DataFrame([
+        {"id": "1", "marca": "A", "modelo": "X", "serial": "SN1", "asset": "A1", "denominacion": "0.01",
+         "casino_id": "1", "is_active": "True", "updated_at": "", "updated_by": ""},
+        {"id": "2", "marca": "B", "modelo": "Y", "serial": "SN2", "asset": "A2", "denominacion": "0.05",
+         "casino_id": "1", "is_active": "True", "updated_at": "", "updated_by": ""},
+    ]).to_csv(machines, index=False)
+    for module in (inativation, activation):
+        monkeypatch.setattr(module, "MACHINES_CSV", str(machines))
+        monkeypatch.setattr(module, "MACHINES_STATUS_CSV", str(status))
+    monkeypatch.setattr(inativation, "LOGS_CSV", str(tmp_path / "logs.csv"))
+    monkeypatch.setattr(inativation, "audit_log", AuditLog(directory=tmp_path / "audit", legacy_csv=None))
+    monkeypatch.setattr(inativation, "_status_cache", {"text": None, "sig": None})
+    return machines, status
+
+
+def _proyeccion(machines):
+    df = pd.read_csv(machines, dtype=str)
+    return df[["id", "serial", "is_active"]].to_csv(index=False)
+
+
+def test_status_igual_a_proyeccion_de_machines(archivos):
+    machines, status = archivos
+    inativation.inactivar_maquina_por_serial("SN2", actor="tester")
+    assert status.read_text() == _proyeccion(machines)
+    assert "2,SN2,False" in status.read_text()
+
+    activation.activar_maquina_por_serial("SN2", actor="tester")
+    assert status.read_text() == _proyeccion(machines)
+    assert "2,SN2,True" in status.read_text()
+
+
+def test_status_no_se_reescribe_sin_cambios(archivos):
+    machines, status = archivos
+    df = pd.read_csv(machines, dtype=str)
+    inativation.update_status_csv(df)
+    mtime = status.stat().st_mtime_ns
+
+    inativation.update_status_csv(df)
+    assert status.stat().st_mtime_ns == mtime
+
+
+def test_inactivacion_masiva_por_seriales(archivos, monkeypatch):
+    machines, status = archivos
+    inativation.inactivar_maquina_por_serial("SN1")
+
+    writes = []
+    original = inativation.save_machines_df
+    monkeypatch.setattr(inativation, "save_machines_df", lambda df: (writes.append(1), original(df)))
+
+    out = cambiar_estado_masivo(False, serials=["SN1", "SN2", "NOPE", "SN2"], actor="tester")
+    assert out["changed"] == 1
+    assert [(r["serial"], r["status"]) for r in out["results"]] == [
+        ("SN1", "unchanged"), ("SN2", "changed"), ("NOPE", "not_found"),
+    ]
+    assert writes == [1]
+    assert status.read_text() == _proyeccion(machines)
+
+    # Una entrada de bitácora por máquina encontrada, con el mismo lote
+    entries, _ = inativation.audit_log.query(limit=10)
+    lote = [e for e in entries if e.get("batch_token") == out["batch_token"]]
+    assert sorted(e["action"] for e in lote) == [
+        "inactivate_machine", "inactivation_attempt_on_already_inactive",
+    ]
+
+
+def test_activacion_masiva_por_casino(archivos):
+    machines, _ = archivos
+    cambiar_estado_masivo(False, casino_id=1)
+    out = cambiar_estado_masivo(True, casino_id=1)
+    assert out["changed"] == 2
+    assert set(pd.read_csv(machines, dtype=str)["is_active"]) == {"True"}
+
+    with pytest.raises(ValueError):
+        cambiar_estado_masivo(True, casino_id=99)
+
+
+def test_masivo_con_is_active_vacio_usa_estado(archivos):
+    machines, status = archivos
+    # Máquinas creadas por POST /machines: solo `estado`, is_active vacío
+    pd.DataFrame([
+        {"id": "7", "serial": "SN7", "casino_id": "5", "estado": "True", "is_active": ""},
+        {"id": "8", "serial": "SN8", "casino_id": "5", "estado": "True", "is_active": ""},
+        {"id": "6", "serial": "SN6", "casino_id": "5", "estado": "False", "is_active": "False"},
+    ]).to_csv(machines, index=False)
+
+    out = cambiar_estado_masivo(False, casino_id=5, actor="tester")
+    assert out["changed"] == 2
+    assert [(r["serial"], r["status"]) for r in out["results"]] == [
+        ("SN7", "changed"), ("SN8", "changed"), ("SN6", "unchanged"),
+    ]
+    df = pd.read_csv(machines, dtype=str)
+    assert set(df["is_active"]) == {"False"} and set(df["estado"]) == {"False"}
+    assert status.read_text() == _proyeccion(machines)
+
+
+def test_activacion_individual_y_masiva_coinciden(archivos):
+    machines, _ = archivos
+    # is_active vacío y estado=True (POST /machines, alta masiva): ya activa
+    pd.DataFrame([
+        {"id": "7", "serial": "SN7", "casino_id": "5", "estado": "True", "is_active": ""},
+    ]).to_csv(machines, index=False)
+
+    out = cambiar_estado_masivo(True, serials=["SN7"], actor="tester")
+    assert [(r["serial"], r["status"]) for r in out["results"]] == [("SN7", "unchanged")]
+    with pytest.raises(ValueError, match="ya se encuentra activa"):
+        activation.activar_maquina_por_serial("SN7", actor="tester")
+
+    entries, _ = inativation.audit_log.query(limit=10)
+    assert "activate_machine" not in {e["action"] for e in entries}
@@ -0,0 +1,83 @@
+# -------------------------------------------
+# back/tests/test_metrics.py
+# Pruebas de las métricas en proceso y del endpoint /metrics.
+# -------------------------------------------
+import threading
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from back.core import metrics
+from back.core.metrics import Counter, Gauge, Histogram, Registry
+from back.main import app
+from back.storage import csv_io
+
+
+def test_formato_prometheus():
+    reg = Registry()
+    c = reg.register(Counter("demo_total", "Demo.", ("route",)))
+    g = reg.register(Gauge("demo_en_vuelo", "En vuelo."))
+    h = reg.register(Histogram("demo_seconds", "Latencia.", ("route",), buckets=(0.1, 1.0)))
+    c.inc(route='/a"b')
+    c.inc(2, route='/a"b')
+    g.inc()
+    g.dec()
+    for v in (0.05, 0.5, 3.0):
+        h.observe(v, route="/x")
+    reg.add_collector(lambda: [("demo_ext", "gauge", "Externa.", [({"k": "v"}, 7)])])
+
+    texto = reg.render()
+    assert "# TYPE demo_total counter" in texto
+    assert 'demo_total{route="/a\\"b"} 3' in texto
+    assert "demo_en_vuelo 0" in texto
+    # Buckets acumulados + suma + conteo
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 1' in texto
+    assert 'demo_seconds_bucket{route="/x",le="1"} 2' in texto
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 3' in texto
+    assert 'demo_seconds_sum{route="/x"} 3.55' in texto
+    assert 'demo_seconds_count{route="/x"} 3' in texto
+    assert 'demo_ext{k="v"} 7' in texto
+
+
+def test_csv_io_registra_lecturas_escrituras_y_bloques(tmp_path):
+    path = tmp_path / "tabla_demo.csv"
+    antes = metrics.storage_reads.value(table="tabla_demo")
+    csv_io.write_csv(pd.DataFrame({"a": range(10)}), path, index=False)
+    assert metrics.storage_writes.value(table="tabla_demo") >= 1
+    assert metrics.storage_bytes_written.value(table="tabla_demo") >= path.stat().st_size
+
+    assert len(csv_io.read_csv(path)) == 10
+    assert sum(len(b) for b in csv_io.read_csv(path, chunksize=3)) == 10
+    assert metrics.storage_reads.value(table="tabla_demo") == antes + 2
+    assert metrics.storage_parse_seconds.value(table="tabla_demo") == antes + 2
+
+
+def test_lock_medido_y_cache():
+    lock = threading.Lock()
+    with metrics.lock_medido(lock, "demo"):
+        assert lock.locked()
+    assert not lock.locked()
+    assert metrics.storage_lock_wait.value(lock="demo") >= 1
+
+    metrics.registrar_cache("demo", True)
+    metrics.registrar_cache("demo", False)
+    assert metrics.storage_cache.value(cache="demo", result="hit") >= 1
+    assert metrics.storage_cache.value(cache="demo", result="miss") >= 1
+
+
+def test_endpoint_metrics_por_plantilla_de_ruta():
+    client = TestClient(app)
+    client.get("/health")
+    client.get("/api/v1/machines/999999")
+    client.get("/no-existe")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    texto = r.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in texto
+    assert 'route="/api/v1/machines/{machine_id}",status="404"' in texto
+    assert "/api/v1/machines/999999" not in texto
+    assert 'route="unmatched",status="404"' in texto
+    assert 'http_requests_in_flight{method="GET",route="/metrics"} 1' in texto
+    assert "jwt_cache_requests_total" in texto and 'executor_submitted_total{executor="reports"}' in texto
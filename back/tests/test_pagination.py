@@ -0,0 +1,131 @@
+# -------------------------------------------
+# back/tests/test_pagination.py
+# Pruebas de la paginación por cursor (keyset) y de la exportación por bloques.
+# -------------------------------------------
+import pytest
+
+from back.storage import balances_repo, counters_repo
+from back.storage.balances_repo import BalancesRepo
+from back.storage.counters_repo import CountersRepo
+from back.storage.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(counters_repo, "CSV_PATH", tmp_path / "counters.csv")
+    r = CountersRepo()
+    rows = []
+    for day in range(1, 6):
+        for machine_id in (1, 2, 3):
+            rows.append({
+                "machine_id": machine_id,
+                "casino_id": 1 if machine_id < 3 else 2,
+                "at": f"2025-11-0{day} 10:00:00",
+                "in_amount": 100.0,
+                "out_amount": 50.0,
+                "jackpot_amount": 0.0,
+                "billetero_amount": 10.0,
+            })
+    r.insert_many(rows)
+    return r
+
+
+def _all_pages(repo, limit, **filters):
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = repo.list_counters_page(cursor=cursor, limit=limit, **filters)
+        seen.extend(rows)
+        pages += 1
+        if cursor is None:
+            return seen, pages
+
+
+def test_paginas_cubren_todo_sin_repetir(repo):
+    rows, pages = _all_pages(repo, limit=4)
+    ids = [int(r["id"]) for r in rows]
+    assert len(ids) == 15 and len(set(ids)) == 15
+    assert pages == 4
+    # Orden (at, id)
+    assert [(r["at"], int(r["id"])) for r in rows] == sorted((r["at"], int(r["id"])) for r in rows)
+
+
+def test_paginas_con_filtros(repo):
+    rows, _ = _all_pages(repo, limit=2, casino_id=1, date_from="2025-11-02", date_to="2025-11-03 23:59:59")
+    assert len(rows) == 4
+    assert {r["machine_id"] for r in rows} == {"1", "2"}
+
+
+def test_nuevas_filas_no_desplazan_el_cursor(repo):
+    first, cursor = repo.list_counters_page(limit=3)
+    # Una lectura anterior al cursor no debe repetir ni saltar filas
+    repo.insert_counter({"machine_id": 9, "casino_id": 1, "at": "2025-10-01 10:00:00"})
+    second, _ = repo.list_counters_page(cursor=cursor, limit=3)
+    assert {r["id"] for r in first}.isdisjoint({r["id"] for r in second})
+    assert second[0]["at"] >= first[-1]["at"]
+
+
+def test_cursor_invalido():
+    assert decode_cursor(encode_cursor("2025-11-01 10:00:00", 7)) == ("2025-11-01 10:00:00", 7)
+    with pytest.raises(ValueError):
+        decode_cursor("no-es-un-cursor")
+
+
+def test_exportacion_por_bloques(repo):
+    from datetime import date
+    from back.domain.counters.read import exportar_contadores_stream
+
+    chunks = list(repo.iter_by_casino_date(1, "2025-11-01", "2025-11-05", fields=["id", "at"], chunksize=4))
+    assert len(chunks) > 1
+    assert all(list(c.columns) == ["id", "at"] for c in chunks)
+    assert sum(len(c) for c in chunks) == 10
+
+    lines = "".join(exportar_contadores_stream(
+        1, date(2025, 11, 1), date(2025, 11, 5), repo, formato="csv", fields=["id", "in_amount"]
+    )).splitlines()
+    assert lines[0] == "id,in_amount"
+    assert len(lines) == 11
+
+
+def test_consulta_y_exportacion_filtran_igual(tmp_path, monkeypatch):
+    path = tmp_path / "counters.csv"
+    monkeypatch.setattr(counters_repo, "CSV_PATH", path)
+    filas = [
+        ("1", "1", "2025-11-02 10:00:00"),
+        ("2", "1.0", "2025-11-02 11:00:00"),
+        ("3", "1.7", "2025-11-02 12:00:00"),  # int(float("1.7")) == 1
+        ("4", "1", "2025-11"),                 # fecha incompleta
+        ("5", "x", "2025-11-02 13:00:00"),
+        ("6", "1", ""),
+    ]
+    path.write_text(
+        ",".join(counters_repo.EXPECTED_COLUMNS) + "\n"
+        + "".join(f"{i},9,{c},{at},1,0,0,0,,,,\n" for i, c, at in filas)
+    )
+    repo = CountersRepo()
+    consulta = [r["id"] for r in repo.list_by_casino_date(1, "2025-11", "2025-11-30", fields=["id"])]
+    exportados = [i for c in repo.iter_by_casino_date(1, "2025-11", "2025-11-30", fields=["id"]) for i in c["id"]]
+    assert consulta == exportados == ["1", "2", "3"]
+
+
+def test_offset_y_cursor_mismo_orden_con_empates(tmp_path, monkeypatch):
+    monkeypatch.setattr(balances_repo, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(balances_repo, "MACHINE_BALANCES_CSV", tmp_path / "machine_balances.csv")
+    monkeypatch.setattr(balances_repo, "CASINO_BALANCES_CSV", tmp_path / "casino_balances.csv")
+    repo = BalancesRepo()
+    # Mismo generated_at para todos (cuadres generados en lote); ids > 9 para
+    # que el orden de texto y el numérico difieran
+    for i in (3, 11, 2, 10, 1):
+        repo.insertar_machine_balance({
+            "id": i, "machine_id": 7, "period_start": "2025-11-01", "period_end": "2025-11-30",
+            "in_total": 0, "out_total": 0, "jackpot_total": 0, "billetero_total": 0,
+            "utilidad_total": 0, "generated_at": "2025-12-01 08:00:00", "generated_by": "admin", "locked": False,
+        })
+
+    por_offset = [r["id"] for off in range(0, 5, 2) for r in repo.listar_machine_balances(limit=2, offset=off)]
+    por_cursor, cursor = [], None
+    while True:
+        pagina, cursor = repo.listar_machine_balances_page(limit=2, cursor=cursor)
+        por_cursor += [r["id"] for r in pagina]
+        if cursor is None:
+            break
+    assert por_offset == por_cursor == [11, 10, 3, 2, 1]
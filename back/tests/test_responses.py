@@ -0,0 +1,72 @@
+# -------------------------------------------
+# back/tests/test_responses.py
+# Pruebas de respuestas JSON rápidas y compresión gzip.
+# -------------------------------------------
+import json
+from typing import List
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from back.api.responses import CompresionMiddleware, respuesta_json
+from back.benchmarks.bench_respuestas import reporte_sintetico
+from back.models.balances import CasinoDetailedReport
+from back.models.counters import CounterOut
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompresionMiddleware, minimum_size=1024, compresslevel=6)
+
+    @app.get("/reporte")
+    def reporte(response: Response, maquinas: int = 50):
+        response.headers["ETag"] = '"abc"'
+        return respuesta_json(reporte_sintetico(maquinas), CasinoDetailedReport, response)
+
+    @app.get("/pdf")
+    def pdf():
+        return Response(content=b"%PDF-" + b"x" * 5000, media_type="application/pdf")
+
+    return app
+
+
+def test_mismo_json_que_el_modelo_y_cabeceras_conservadas():
+    data = reporte_sintetico(3)
+    esperado = CasinoDetailedReport(**data).model_dump(mode="json")
+    assert json.loads(respuesta_json(data, CasinoDetailedReport).body) == esperado
+
+    filas = [CounterOut(id=1, machine_id=2, casino_id=3, at="2025-11-01 10:00:00",
+                        in_amount=1, out_amount=2, jackpot_amount=0, billetero_amount=0)]
+    assert json.loads(respuesta_json(filas, List[CounterOut]).body)[0]["machine_id"] == 2
+    assert json.loads(respuesta_json({"n": float("nan")}).body) == {"n": None}
+
+
+def test_gzip_por_umbral_y_sin_recomprimir_pdf():
+    client = TestClient(_app())
+    grande = client.get("/reporte")
+    assert grande.headers["content-encoding"] == "gzip"
+    assert grande.headers["etag"] == 'W/"abc"'  # gzip no es idéntico byte a byte
+    assert grande.json()["total_machines"] == 50
+
+    chico = client.get("/reporte?maquinas=1")
+    assert "content-encoding" not in chico.headers
+    assert chico.headers["etag"] == '"abc"'
+
+    pdf = client.get("/pdf")
+    assert "content-encoding" not in pdf.headers
+    assert pdf.content.startswith(b"%PDF-")
+
+
+def test_validar_lista_en_una_pasada_y_omite_filas_invalidas():
+    import pytest
+    from pydantic import ValidationError
+    from back.api.responses import validar_lista
+    from back.models.counters import MachineSimple
+
+    filas = [{"id": "1", "marca": "a"}, {"id": "x", "marca": "b"}, {"id": 3}]
+    validas = validar_lista(MachineSimple, filas, omitir_invalidos=True)
+    assert [m.id for m in validas] == [1, 3]
+    assert all(isinstance(m, MachineSimple) for m in validas)
+
+    with pytest.raises(ValidationError):
+        validar_lista(MachineSimple, filas)
@@ -0,0 +1,73 @@
+# -------------------------------------------
+# back/tests/test_singleflight.py
+# Pruebas del single-flight de reportes (peticiones idénticas concurrentes).
+# -------------------------------------------
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from back.api.v1 import balances as balances_api
+from back.core.singleflight import SingleFlight, clave_peticion
+
+
+def test_llamadas_concurrentes_comparten_un_calculo(monkeypatch):
+    flights = SingleFlight()
+    monkeypatch.setattr(balances_api, "report_flights", flights)
+    ejecuciones = []
+
+    def reporte_lento(place_id, period_start, period_end, counters_repo, clock, actor):
+        ejecuciones.append(place_id)
+        time.sleep(0.2)
+        return {"place_id": place_id, "generated_by": actor}
+
+    def pedir(actor):
+        return balances_api._reporte_compartido(
+            reporte_lento, place_id=1, period_start="2025-11-01", period_end="2025-11-30",
+            counters_repo=object(), clock=object(), actor=actor,
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        resultados = list(pool.map(pedir, ["ana", "beto", "carla", "dani"]))
+
+    assert ejecuciones == [1]
+    assert [r["generated_by"] for r in resultados] == ["ana", "beto", "carla", "dani"]
+    assert flights.stats() == {"calls": 4, "executions": 1, "deduplicated": 3, "in_flight": 0}
+
+    # Terminado el cálculo no queda nada guardado: la siguiente petición recalcula
+    pedir("ana")
+    assert len(ejecuciones) == 2
+
+
+def test_async_y_errores_compartidos():
+    flights = SingleFlight()
+    clave = clave_peticion("ruta", {"b": 2, "a": 1, "c": None})
+    assert clave == clave_peticion("ruta", {"a": 1, "b": 2})
+    liberar = threading.Event()
+
+    async def falla():
+        await asyncio.sleep(0.05)
+        raise ValueError("periodo inválido")
+
+    async def escenario():
+        tareas = [flights.do_async(clave, falla) for _ in range(3)]
+        return await asyncio.gather(*tareas, return_exceptions=True)
+
+    errores = asyncio.run(escenario())
+    assert all(isinstance(e, ValueError) for e in errores)
+    assert flights.stats()["executions"] == 1
+
+    # Un hilo sync espera el cálculo iniciado por otro hilo
+    def lento():
+        liberar.wait(5)
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        primero = pool.submit(flights.do, "k", lento)
+        time.sleep(0.05)
+        segundo = pool.submit(flights.do, "k", lambda: pytest.fail("no debe recalcular"))
+        time.sleep(0.05)
+        liberar.set()
+        assert primero.result() == segundo.result() == "ok"
@@ -0,0 +1,77 @@
+# -------------------------------------------
+# back/tests/test_sparse_fields.py
+# Pruebas de ?fields= (sparse fieldsets) y de la proyección en los repos.
+# -------------------------------------------
+from typing import List, Optional
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from back.api.deps import campos_param
+from back.models.balances import MachineBalanceOut
+from back.models.parciales import modelo_parcial
+from back.storage import balances_repo, counters_repo
+from back.storage.balances_repo import BalancesRepo
+from back.storage.counters_repo import CountersRepo
+
+
+def test_campos_param_valida_y_conserva_orden():
+    app = FastAPI()
+
+    @app.get("/x")
+    def x(fields: Optional[List[str]] = Depends(campos_param("id", "serial", "casino_id"))):
+        return {"fields": fields}
+
+    client = TestClient(app)
+    assert client.get("/x").json() == {"fields": None}
+    assert client.get("/x?fields=serial, id,serial").json() == {"fields": ["serial", "id"]}
+    r = client.get("/x?fields=id,password")
+    assert r.status_code == 400 and "password" in r.json()["detail"]
+
+
+def test_modelo_parcial_mantiene_tipos_y_validaciones():
+    modelo = modelo_parcial(MachineBalanceOut, ["utilidad_total", "in_total"])
+    assert modelo is modelo_parcial(MachineBalanceOut, ("utilidad_total", "in_total"))
+    assert modelo_parcial(MachineBalanceOut, None) is MachineBalanceOut
+    assert modelo(utilidad_total="-5", in_total="2").model_dump() == {"utilidad_total": -5.0, "in_total": 2.0}
+    with pytest.raises(ValidationError):
+        modelo(utilidad_total=1, in_total=-1)  # in_total >= 0
+
+
+def test_contadores_solo_columnas_pedidas(tmp_path, monkeypatch):
+    monkeypatch.setattr(counters_repo, "CSV_PATH", tmp_path / "counters.csv")
+    repo = CountersRepo()
+    repo.insert_many([
+        {"machine_id": casino, "casino_id": casino, "at": f"2025-11-0{d} 10:00:00", "in_amount": 10.0 * d,
+         "out_amount": 0.0, "jackpot_amount": 0.0, "billetero_amount": 0.0}
+        for d in (1, 2, 3) for casino in (1, 2)
+    ])
+    filas = repo.list_by_casino_date(1, "2025-11-02", "2025-11-03", fields=["at", "in_amount"])
+    assert filas == [{"at": "2025-11-02 10:00:00", "in_amount": "20.0"},
+                     {"at": "2025-11-03 10:00:00", "in_amount": "30.0"}]
+    completas = repo.list_by_casino_date(1, "2025-11-02", "2025-11-03")
+    assert len(completas) == 2 and set(completas[0]) == set(counters_repo.EXPECTED_COLUMNS)
+
+    pagina, _ = repo.list_counters_page(casino_id=2, limit=1, fields=["id", "at"])
+    assert list(pagina[0]) == ["id", "at"]
+
+
+def test_balances_solo_normaliza_columnas_pedidas(tmp_path, monkeypatch):
+    monkeypatch.setattr(balances_repo, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(balances_repo, "MACHINE_BALANCES_CSV", tmp_path / "machine_balances.csv")
+    monkeypatch.setattr(balances_repo, "CASINO_BALANCES_CSV", tmp_path / "casino_balances.csv")
+    repo = BalancesRepo()
+    for i, machine_id in enumerate((7, 8), start=1):
+        repo.insertar_machine_balance({
+            "id": i, "machine_id": machine_id, "period_start": "2025-11-01", "period_end": "2025-11-30",
+            "in_total": 100, "out_total": 40, "jackpot_total": 0, "billetero_total": 5,
+            "utilidad_total": 60, "generated_at": f"2025-12-0{i} 08:00:00", "generated_by": "admin", "locked": False,
+        })
+
+    filas = repo.listar_machine_balances(machine_id=8, fields=["utilidad_total", "locked"], offset=0)
+    assert filas == [{"utilidad_total": 60.0, "locked": False}]
+
+    pagina, _ = repo.listar_machine_balances_page(fields=["id", "machine_id"], limit=10)
+    assert pagina == [{"id": 2, "machine_id": 8}, {"id": 1, "machine_id": 7}]
@@ -0,0 +1,54 @@
+# -------------------------------------------
+# back/tests/test_token_cache.py
+# Pruebas del caché de tokens JWT verificados (LRU + claim exp).
+# -------------------------------------------
+from fastapi.testclient import TestClient
+
+from back.api import deps
+from back.api.v1 import logs
+from back.core.token_cache import TokenCache, token_cache
+from back.domain.users.login import _create_access_token
+from back.main import app
+from back.storage.audit_log import AuditLog
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_acotado_y_exp():
+    clock = FakeClock()
+    cache = TokenCache(max_entries=2, clock=clock)
+    cache.put("t1", {"sub": "1", "exp": 1100})
+    cache.put("t2", {"sub": "2", "exp": 1100})
+    assert cache.get("t1")["sub"] == "1"  # t1 pasa a ser el más reciente
+    cache.put("t3", {"sub": "3", "exp": 1100})
+    assert cache.get("t2") is None  # expulsado por el tope
+    assert cache.get("t3") is not None
+
+    clock.now = 1100
+    assert cache.get("t1") is None  # vencido
+    assert cache.stats() == {"hits": 2, "misses": 2, "evictions": 1, "size": 1}
+
+
+def test_una_verificacion_por_token(tmp_path, monkeypatch):
+    # Bitácora temporal: el endpoint no debe crear data/audit/
+    monkeypatch.setattr(logs, "audit_log", AuditLog(directory=tmp_path / "audit", legacy_csv=None))
+    token_cache.clear()
+    token = _create_access_token({"sub": "1", "username": "admin", "role": "admin"})
+    calls = []
+    real_decode = deps.jwt.decode
+    monkeypatch.setattr(deps.jwt, "decode", lambda *a, **k: calls.append(1) or real_decode(*a, **k))
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(3):
+        assert client.get("/api/v1/logs?limit=1", headers=headers).status_code == 200
+    # Middleware + verificar_rol en tres peticiones: una sola verificación HS256
+    assert len(calls) == 1
+
+    assert client.get("/api/v1/logs", headers={"Authorization": "Bearer basura"}).status_code == 401
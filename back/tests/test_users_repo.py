@@ -0,0 +1,53 @@
+# -------------------------------------------
+# back/tests/test_users_repo.py
+# Pruebas del directorio de usuarios en memoria (users_repo).
+# Usan un CSV temporal para no modificar data/.
+# -------------------------------------------
+import pandas as pd
+import pytest
+
+from back.storage import users_repo
+
+
+@pytest.fixture
+def users_csv(tmp_path, monkeypatch):
+    csv_path = tmp_path / "users.csv"
+    pd.DataFrame([
+        {"id": 1, "username": " Alice ", "password": "a", "role": "admin", "is_active": True, "is_deleted": False},
+        {"id": 2, "username": "bob", "password": "b", "role": "operador", "is_active": False, "is_deleted": True},
+    ], columns=users_repo.EXPECTED_COLUMNS).to_csv(csv_path, index=False)
+    monkeypatch.setattr(users_repo, "CSV_PATH", csv_path)
+    return csv_path
+
+
+def test_busquedas_sin_releer_csv(users_csv, monkeypatch):
+    assert users_repo.get_user_by_username("ALICE")["id"] == 1
+
+    lecturas = []
+    real_read = pd.read_csv
+    monkeypatch.setattr(users_repo.pd, "read_csv", lambda *a, **k: lecturas.append(1) or real_read(*a, **k))
+    assert users_repo.get_user_by_id(1)["username"] == "alice"
+    assert users_repo.username_exists("alice")
+    assert not users_repo.username_exists("alice", exclude_id=1)
+    assert not users_repo.username_exists("bob")  # eliminado lógicamente
+    assert users_repo.get_user_by_username("nadie") is None
+    assert lecturas == []
+
+
+def test_escrituras_solo_si_hay_cambios(users_csv):
+    antes = users_csv.stat().st_mtime_ns
+    users_repo.update_user_row(1, {"role": "admin", "updated_at": "2025-12-01 10:00:00", "updated_by": "api"})
+    assert users_csv.stat().st_mtime_ns == antes
+
+    updated = users_repo.update_user_row(1, {"role": "soporte", "updated_by": "api"})
+    assert updated["role"] == "soporte"
+    assert users_repo.get_user_by_id(1)["role"] == "soporte"
+    assert pd.read_csv(users_csv).loc[0, "role"] == "soporte"
+
+
+def test_edicion_externa_invalida_el_directorio(users_csv):
+    assert users_repo.get_user_by_id(3) is None
+    df = pd.read_csv(users_csv)
+    df.loc[len(df)] = [3, "carla", "c", "soporte", True, False] + [None] * 6
+    df.to_csv(users_csv, index=False)
+    assert users_repo.get_user_by_username("carla")["id"] == 3